@@ -0,0 +1,96 @@
+"""Benchmark the columnar SPARQL result decoder against the legacy row-dict path.
+
+Builds a synthetic HPI payload shaped like a multi-region pull (every ``ukhpi:``
+column, with datatype annotations) and reports wall time and peak traced memory
+for both decoders.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from ukhpi.core.decoding import XSD
+from ukhpi.core.sparql import SparqlQuery
+from ukhpi.text import make_snake_from_camel
+
+
+def legacy_make_data_from_results(results: dict) -> pd.DataFrame:
+    """The pre-columnar implementation, kept here as the benchmark baseline."""
+    bindings = results.get("results", {}).get("bindings", [])
+    data = [{k: v.get("value") for k, v in result.items()} for result in bindings]
+    df = pd.DataFrame(data)
+    df.columns = [make_snake_from_camel(col) for col in df.columns]
+    date_cols = ["ref_period_start", "ref_period_end", "date"]
+    for col in date_cols:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    for col in df.columns:
+        if col not in date_cols:
+            try:
+                df[col] = pd.to_numeric(df[col], errors="raise")
+            except (ValueError, TypeError):
+                continue
+    return df
+
+
+def synthetic_results(n_regions: int, n_months: int) -> dict:
+    columns = SparqlQuery._COLUMNS
+    bindings = []
+    for r in range(n_regions):
+        region = f"http://landregistry.data.gov.uk/id/region/region-{r}"
+        for m in range(n_months):
+            year, month = 1995 + m // 12, m % 12 + 1
+            row = {}
+            for i, col in enumerate(columns):
+                kind = SparqlQuery._SCHEMA[col]
+                if kind == "uri":
+                    value = region if col == "refRegion" else f"{region}/month/{year}-{month:02d}/{col}"
+                    row[col] = {"type": "uri", "value": value}
+                elif kind == "date":
+                    row[col] = {"type": "literal", "datatype": f"{XSD}date", "value": f"{year}-{month:02d}-01"}
+                elif kind == "str":
+                    row[col] = {"type": "literal", "datatype": f"{XSD}gYearMonth", "value": f"{year}-{month:02d}"}
+                elif kind == "int":
+                    row[col] = {"type": "literal", "datatype": f"{XSD}integer", "value": str(100 + i + m)}
+                else:
+                    row[col] = {"type": "literal", "datatype": f"{XSD}decimal", "value": f"{1000.5 + i * m:.2f}"}
+            bindings.append(row)
+    return {"head": {"vars": list(columns)}, "results": {"bindings": bindings}}
+
+
+def measure(func, results: dict, repeat: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(results)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func(results)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak / 1024**2
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark SPARQL JSON result decoding.")
+    parser.add_argument("--regions", type=int, default=50, help="Synthetic regions (default: 50).")
+    parser.add_argument("--months", type=int, default=120, help="Months per region (default: 120).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per decoder (default: 3).")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    payload = synthetic_results(args.regions, args.months)
+    n_rows = len(payload["results"]["bindings"])
+    print(f"Decoding {n_rows} rows x {len(SparqlQuery._COLUMNS)} columns")
+    for label, func in (
+        ("legacy", legacy_make_data_from_results),
+        ("columnar", SparqlQuery.make_data_from_results),
+    ):
+        seconds, peak_mb = measure(func, payload, args.repeat)
+        print(f"{label:>9}: {seconds * 1000:8.1f} ms  peak {peak_mb:7.1f} MiB")
@@ -0,0 +1,59 @@
+"""Compare SPARQL result formats (JSON, CSV, TSV) for an HPI region pull and a postcode pull.
+
+For each format the script reports the bytes received on the wire (after transport
+compression), the decoded body size, and the time taken to turn the body into the
+project's DataFrame contract. The query cache is bypassed so every format is fetched.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+
+from ukhpi.core.decoding import decode_delimited_results
+from ukhpi.core.sparql import SparqlQuery
+from ukhpi.core.transport import HttpTransport
+
+
+def _parse(sq: SparqlQuery, result_format: str, body: bytes):
+    if result_format == "json":
+        return SparqlQuery.make_data_from_results(json.loads(body))
+    return decode_delimited_results(io.BytesIO(body), SparqlQuery._SCHEMA, tsv=result_format == "tsv")
+
+
+def run(sq: SparqlQuery, label: str, query: str, repeat: int) -> None:
+    query = sq._prepare_query(query)
+    for result_format in SparqlQuery.RESULT_FORMATS:
+        response = sq._post(query, result_format=result_format)
+        body = response.content
+        wire_bytes = HttpTransport.wire_bytes(response)
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = _parse(sq, result_format, body)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{label:>8} {result_format:>4}: {wire_bytes / 1024:9.1f} KiB wire  "
+            f"{len(body) / 1024:9.1f} KiB body  {min(timings) * 1000:8.1f} ms parse  {len(df):6d} rows"
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark SPARQL JSON vs CSV vs TSV result sets.")
+    parser.add_argument("--endpoint", default="http://landregistry.data.gov.uk/landregistry/query")
+    parser.add_argument("--region", default="united-kingdom", help="HPI region slug (default: united-kingdom).")
+    parser.add_argument("--start-year", type=int, default=2015)
+    parser.add_argument("--end-year", type=int, default=2024)
+    parser.add_argument("--postcode", default="HP20 1AA", help="Postcode for the price-paid pull.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed parse repetitions (default: 3).")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    sq = SparqlQuery(endpoint_url=args.endpoint, use_cache=False)
+    run(sq, "hpi", sq.build_query_for_region(args.region, args.start_year, args.end_year), args.repeat)
+    run(sq, "postcode", sq.build_query_for_postcode(args.postcode), args.repeat)
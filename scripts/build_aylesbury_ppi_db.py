@@ -40,6 +40,12 @@ def build_parser() -> argparse.ArgumentParser:
         default=DEFAULT_TABLE_NAME,
         help=f"Table name within the SQLite db (default: {DEFAULT_TABLE_NAME}).",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="Postcodes bound into each price-paid SPARQL query (default: 50).",
+    )
     return parser
 
 
@@ -50,6 +56,7 @@ if __name__ == "__main__":
         db_directory=args.db_directory,
         db_name=args.db_name,
         table_name=args.table_name,
+        batch_size=args.batch_size,
     )
     if db_path:
         print(f"SQLite database written to {db_path}")
@@ -0,0 +1,6 @@
+from __future__ import annotations
+
+from ukhpi.core.cube import main
+
+if __name__ == "__main__":
+    main()
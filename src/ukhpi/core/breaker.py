@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from ukhpi.core.transport import TransportError
+from ukhpi.loggers import BasicLogger
+
+
+class CircuitOpenError(TransportError):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Stops sending requests to an endpoint that keeps failing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and every
+    request is rejected immediately for ``cooldown`` seconds. The first request after
+    the cool-down is let through as a trial (half-open): success closes the circuit,
+    failure opens it for another cool-down.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    _shared: CircuitBreaker | None = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._rejected = 0
+        self._lock = threading.Lock()
+        self._logger = BasicLogger(logger_name="CIRCUIT_BREAKER", verbose=False, log_directory=None)
+
+    @classmethod
+    def shared(cls) -> CircuitBreaker:
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now; in the half-open state only one trial is let through."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def check(self) -> None:
+        """Raises ``CircuitOpenError`` unless a request may be sent now."""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit open after repeated failures; retrying in at most {self.cooldown:g}s")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                self._logger.info("Endpoint recovered; closing circuit")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._logger.warning(f"Opening circuit after {self._failures} consecutive failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    @property
+    def stats(self) -> dict[str, int | str]:
+        state = self.state
+        with self._lock:
+            return {"state": state, "consecutive_failures": self._failures, "rejected": self._rejected}
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import datetime
+import json
+import threading
+import time
+from argparse import ArgumentParser
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+
+from ukhpi.io.loader import Dataset
+from ukhpi.io.versioning import DatesNotFound, FileVersion
+from ukhpi.io.writer import WriteFile
+from ukhpi.loggers import BasicLogger
+
+_PACKAGE_DIR = Path(__file__).resolve().parent.parent
+SNAPSHOT_PATH = _PACKAGE_DIR / "data" / "hpi_regions_snapshot.json"
+REGION_CACHE_PATH = _PACKAGE_DIR / "cache" / "region_data"
+CATALOG_COLUMNS = ["ref_region", "region_label", "region_type", "ref_region_keyword", "ref_region_type_keyword"]
+
+
+def write_snapshot(df: pd.DataFrame, path: Path | str = SNAPSHOT_PATH, source: str = "") -> Path:
+    """Writes a region catalog as a versioned snapshot file that can ship with the package."""
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True, parents=True)
+    records = df.reindex(columns=CATALOG_COLUMNS).astype(object).where(df.notna(), None).to_dict("records")
+    payload = {
+        "version": datetime.date.today().isoformat(),
+        "source": source,
+        "complete": True,
+        "regions": records,
+    }
+    path.write_text(json.dumps(payload, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+class RegionCatalog:
+    """Versioned HPI region catalog served from local files.
+
+    Two sources are considered and the newer one wins: the snapshot bundled with the
+    package and the latest catalog refreshed from the endpoint into ``cache/region_data``.
+    Until it is regenerated with ``ukhpi-region-catalog``, the bundled snapshot is a
+    placeholder: a partial seed of the countries and English regions, without region types.
+    Loading either is a local file read, so nothing waits on the ``SELECT DISTINCT`` over
+    every HPI observation that builds the catalog. ``refresh`` runs that query and swaps
+    the result in; ``refresh_in_background`` does so off the caller's thread.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], pd.DataFrame],
+        snapshot_path: Path | str = SNAPSHOT_PATH,
+        cache_path: Path | str = REGION_CACHE_PATH,
+        max_age_days: int = 30,
+        retry_interval: float = 300.0,
+    ):
+        """
+        Args:
+            fetch (Callable[[], pd.DataFrame]): Builds a fresh catalog from the endpoint.
+            snapshot_path (Path | str): Bundled snapshot file.
+            cache_path (Path | str): Directory of refreshed catalogs (``hpi_regions_{MMDDYYYY}.csv``).
+            max_age_days (int): Age after which the catalog in use counts as stale.
+            retry_interval (float): Seconds before a background refresh is tried again after
+                one that left the catalog stale, such as while the endpoint is down.
+        """
+        self._fetch = fetch
+        self.snapshot_path = Path(snapshot_path)
+        self._file = FileVersion(base_path=Path(cache_path), file_name="hpi_regions_", extension="csv")
+        self.max_age_days = max_age_days
+        self.retry_interval = retry_interval
+        self._frame: pd.DataFrame | None = None
+        self._version: datetime.date | None = None
+        self._complete = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.RLock()
+        self._refresh_thread: threading.Thread | None = None
+        self._attempted_at: float | None = None
+        self._logger = BasicLogger(logger_name="REGION_CATALOG", verbose=False, log_directory=None)
+
+    def _load_snapshot(self) -> tuple[datetime.date, bool, pd.DataFrame] | None:
+        try:
+            payload = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            self._logger.debug(f"No usable region snapshot at '{self.snapshot_path}': {e}")
+            return None
+        df = pd.DataFrame(payload.get("regions", []), columns=CATALOG_COLUMNS)
+        return datetime.date.fromisoformat(payload["version"]), bool(payload.get("complete")), df
+
+    def _load_refreshed(self) -> tuple[datetime.date, bool, pd.DataFrame] | None:
+        try:
+            latest = self._file._fetch_dates_from_file_names()[-1].date()
+        except (DatesNotFound, FileNotFoundError):
+            return None
+        data = Dataset(file_path=self._file.latest_file_path).load_data()
+        if not data:
+            return None
+        return latest, True, pd.DataFrame(data)
+
+    def _load(self) -> None:
+        # On a tie the refreshed catalog wins over the bundled one.
+        candidates = [c for c in (self._load_refreshed(), self._load_snapshot()) if c is not None]
+        if not candidates:
+            self._version, self._complete, self._frame = None, False, pd.DataFrame(columns=CATALOG_COLUMNS)
+            return
+        # Prefer complete catalogs, then the newest.
+        self._version, self._complete, self._frame = max(candidates, key=lambda c: (c[1], c[0]))
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The catalog in use, loaded from local files on first access."""
+        with self._lock:
+            if self._frame is None:
+                self._load()
+            return self._frame
+
+    def _loaded(self) -> RegionCatalog:
+        _ = self.frame
+        return self
+
+    @property
+    def version(self) -> datetime.date | None:
+        return self._loaded()._version
+
+    @property
+    def complete(self) -> bool:
+        """False when only a partial seed catalog is available locally."""
+        return self._loaded()._complete
+
+    @property
+    def is_stale(self) -> bool:
+        version = self.version
+        if version is None or not self._complete:
+            return True
+        return (datetime.date.today() - version).days > self.max_age_days
+
+    def refresh(self) -> pd.DataFrame:
+        """Rebuilds the catalog from the endpoint, persists it and swaps it in.
+
+        The catalog in use is kept if the fetch fails or comes back empty.
+        """
+        with self._refresh_lock:
+            try:
+                df = self._fetch()
+            except Exception as e:
+                self._logger.warning(f"Region catalog refresh failed; keeping version {self._version}: {e}")
+                return self.frame
+            if df is None or df.empty:
+                return self.frame
+
+            WriteFile(
+                data_to_write=df,
+                base_path=self._file.base_path,
+                file_name=self._file.file_name,
+                extension=self._file.extension,
+            ).write_file_to_disk(check_version=True)
+            with self._lock:
+                self._load()
+                return self._frame
+
+    def ensure_complete(self) -> pd.DataFrame:
+        """Builds the full catalog in the caller's thread if only a partial seed is available.
+
+        Concurrent callers wait for a single refresh.
+        """
+        with self._refresh_lock:
+            if not self.complete:
+                return self.refresh()
+        return self.frame
+
+    def refresh_in_background(self, force: bool = False) -> threading.Thread | None:
+        """Starts a refresh on a daemon thread if the catalog is stale (or ``force``) and none is running.
+
+        Readers call this on every access, so after a refresh that left the catalog stale the
+        next one waits ``retry_interval`` seconds.
+        """
+        if not (force or self.is_stale):
+            return None
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return self._refresh_thread
+            now = time.monotonic()
+            if not force and self._attempted_at is not None and now - self._attempted_at < self.retry_interval:
+                return None
+            self._attempted_at = now
+            self._refresh_thread = threading.Thread(target=self.refresh, name="region-catalog-refresh", daemon=True)
+            self._refresh_thread.start()
+            return self._refresh_thread
+
+
+def build_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="ukhpi-region-catalog",
+        description="Rebuild the bundled HPI region catalog snapshot from the SPARQL endpoint.",
+    )
+    parser.add_argument(
+        "--endpoint",
+        default="http://landregistry.data.gov.uk/landregistry/query",
+        help="SPARQL endpoint to build the catalog from (default: the Land Registry endpoint).",
+    )
+    parser.add_argument(
+        "--output", type=Path, default=SNAPSHOT_PATH, help=f"Snapshot file to write (default: {SNAPSHOT_PATH})."
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    from ukhpi.core.sparql import SparqlQuery
+
+    args = build_parser().parse_args(argv)
+    df = SparqlQuery(endpoint_url=args.endpoint, use_cache=False)._fetch_hpi_regions()
+    if df.empty:
+        raise SystemExit("The endpoint returned no regions; the snapshot was left unchanged.")
+    path = write_snapshot(df, args.output, source=args.endpoint)
+    print(f"Wrote {len(df)} regions to {path}")
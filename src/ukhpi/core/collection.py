@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import datetime
+import json
+import os
+import threading
+import time
 from argparse import ArgumentParser
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
 from tqdm import tqdm
 
 import ukhpi
+from ukhpi.core.cube import DEFAULT_CUBE_PATH, HpiCube
 from ukhpi.core.hpi import HousePriceIndex
 from ukhpi.core.sparql import SparqlQuery
 from ukhpi.loggers import BasicLogger
@@ -15,6 +22,90 @@ from ukhpi.loggers import BasicLogger
 DEFAULT_DATA_PATH = Path(ukhpi.__file__).resolve().parent / "cache" / "hpi_data"
 
 
+class CollectionManifest:
+    """Per-region record of a collection run, checkpointed to JSON after every batch.
+
+    Each region entry holds its ``status`` (``pending``, ``ok`` or ``failed``), the ``rows``
+    collected, the ``watermark`` (newest ``ref_period_start``), the number of ``attempts``,
+    the last ``error`` and when it was ``updated``. A manifest written for a different
+    year window is discarded, since its row counts no longer apply. The window does not
+    limit what is fetched: every region's full history is, so a new window refetches nothing
+    that is already cached and fresh.
+    """
+
+    FILE_NAME = "collection_manifest.json"
+
+    def __init__(self, path: Path | str, start_year: int, end_year: int):
+        self.path = Path(path)
+        self.start_year = start_year
+        self.end_year = end_year
+        self._lock = threading.Lock()
+        self.regions: dict[str, dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                data = {}
+            if data.get("start_year") == start_year and data.get("end_year") == end_year:
+                self.regions = data.get("regions", {})
+
+    def status(self, region: str) -> str | None:
+        entry = self.regions.get(region)
+        return entry["status"] if entry else None
+
+    def is_fresh(self, region: str) -> bool:
+        """True when the region was collected successfully today."""
+        entry = self.regions.get(region)
+        if not entry or entry["status"] != "ok":
+            return False
+        return entry["updated"][:10] == datetime.date.today().isoformat()
+
+    def _update(self, region: str, **fields: Any) -> None:
+        entry = self.regions.setdefault(
+            region, {"status": "pending", "rows": 0, "watermark": None, "attempts": 0, "error": None}
+        )
+        entry.update(fields, updated=datetime.datetime.now().isoformat(timespec="seconds"))
+
+    def mark_pending(self, regions: list[str]) -> None:
+        with self._lock:
+            for region in regions:
+                self._update(region, status="pending", error=None)
+
+    def record_success(self, region: str, df: pd.DataFrame) -> None:
+        watermark = None
+        if "ref_period_start" in df.columns and not df.empty:
+            latest = pd.to_datetime(df["ref_period_start"], errors="coerce").max()
+            watermark = None if pd.isna(latest) else latest.strftime("%Y-%m-%d")
+        with self._lock:
+            attempts = self.regions.get(region, {}).get("attempts", 0) + 1
+            self._update(region, status="ok", rows=len(df), watermark=watermark, attempts=attempts, error=None)
+
+    def record_failure(self, region: str, error: str) -> None:
+        with self._lock:
+            attempts = self.regions.get(region, {}).get("attempts", 0) + 1
+            self._update(region, status="failed", attempts=attempts, error=error)
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            counts: dict[str, int] = {}
+            for entry in self.regions.values():
+                counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+            return counts
+
+    def save(self) -> None:
+        """Writes the manifest atomically, so an interrupted run leaves the last checkpoint intact."""
+        with self._lock:
+            data = {
+                "start_year": self.start_year,
+                "end_year": self.end_year,
+                "updated": datetime.datetime.now().isoformat(timespec="seconds"),
+                "regions": self.regions,
+            }
+            tmp = self.path.with_name(f"{self.path.name}.tmp")
+            tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+            os.replace(tmp, self.path)
+
+
 class DataCollection:
     def __init__(
         self,
@@ -22,39 +113,133 @@ class DataCollection:
         start_year: int = 1990,
         end_year: int = 2025,
         verbose: bool = True,
+        chunk_size: int = 25,
+        resume: bool = False,
+        only_failed: bool = False,
+        retries: int = 3,
+        backoff: float = 2.0,
     ):
+        """
+        Args:
+            data_path (Path | str): Directory of the per-region cache files and the manifest.
+            start_year (int): First year of the returned frame. Each region's full history is
+                fetched and cached whatever the window, so it only slices the output.
+            end_year (int): Last year of the returned frame.
+            verbose (bool): Log progress to the console.
+            chunk_size (int): Regions bound into each batched SPARQL query.
+            resume (bool): Skip every region the manifest already records as collected, however
+                long ago. By default only regions collected today are skipped.
+            only_failed (bool): Collect only the regions the manifest records as failed.
+            retries (int): Extra passes over the regions that failed, each after a backoff.
+            backoff (float): Seconds before the first retry pass; doubled for every later one.
+        """
         self.hpi = HousePriceIndex()
         self.sparql = SparqlQuery()
         self.data_path = Path(data_path)
         self.data_path.mkdir(exist_ok=True, parents=True)
+        self.hpi._data_path = self.data_path
         self.start_year = start_year
         self.end_year = end_year
+        self.chunk_size = max(int(chunk_size), 1)
+        self.resume = resume
+        self.only_failed = only_failed
+        self.retries = max(int(retries), 0)
+        self.backoff = backoff
+        self.manifest = CollectionManifest(self.data_path / CollectionManifest.FILE_NAME, start_year, end_year)
         self._log = BasicLogger(verbose=verbose, log_directory=None, logger_name="DATA_COLLECTION")
         self._log.info(f"Data directory: {self.data_path}")
         self._log.info(f"Collecting data for {self.start_year} to {self.end_year}")
 
-    def collect_data(self):
+    def _select_regions(self, regions: list[str]) -> list[str]:
+        """Regions this run still has to collect, according to the manifest and the cache."""
 
-        hpi_regions = self.sparql.HPI_REGIONS
+        def cached(region: str) -> bool:
+            return self.hpi._hpi_file(region).latest_file_path is not None
 
-        regions = sorted(list(set(hpi_regions["ref_region_keyword"].unique())))
-        n_regions = len(regions)
-        collected_data = []
-        failed = 0
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [
-                executor.submit(self.hpi.fetch_hpi, self.start_year, self.end_year, region) for region in regions
-            ]
-            progress = tqdm(as_completed(futures), total=n_regions, desc="Collecting data")
+        if self.only_failed:
+            return [r for r in regions if self.manifest.status(r) == "failed"]
+        if self.resume:
+            return [r for r in regions if not (self.manifest.status(r) == "ok" and cached(r))]
+        return [r for r in regions if not (self.manifest.is_fresh(r) and cached(r))]
+
+    def _collect_pass(self, regions: list[str], collected_data: list[pd.DataFrame], desc: str) -> list[str]:
+        """Collects ``regions`` in batches, checkpointing the manifest after each; returns the failures."""
+        chunks = [regions[i : i + self.chunk_size] for i in range(0, len(regions), self.chunk_size)]
+        failed: list[str] = []
+        # Upstream concurrency is governed by the shared adaptive limiter; the pool only needs
+        # enough workers to keep it saturated at its ceiling.
+        with ThreadPoolExecutor(max_workers=self.sparql.limiter.max_limit) as executor:
+            futures = {}
+            for chunk in chunks:
+                errors: dict[str, str] = {}
+                # Cached series are brought up to date, so a region recorded as collected
+                # really holds the latest release.
+                future = executor.submit(
+                    self.hpi.fetch_hpi_for_regions,
+                    self.start_year,
+                    self.end_year,
+                    chunk,
+                    self.chunk_size,
+                    refresh=True,
+                    errors=errors,
+                )
+                futures[future] = (chunk, errors)
+            progress = tqdm(as_completed(futures), total=len(futures), desc=desc)
             for future in progress:
+                chunk, errors = futures[future]
                 try:
-                    data = future.result()
-                    if isinstance(data, pd.DataFrame) and not data.empty:
-                        collected_data.append(data)
-                except Exception:
-                    failed += 1
-                    continue
-        self._log.info(f"Collected data for {n_regions - failed} regions ({failed} failed)")
+                    frames = future.result()
+                except Exception as e:
+                    frames = {}
+                    errors = dict.fromkeys(chunk, f"{type(e).__name__}: {e}")
+                for region in chunk:
+                    data = frames.get(region)
+                    if isinstance(data, pd.DataFrame):
+                        self.manifest.record_success(region, data)
+                        if not data.empty:
+                            collected_data.append(data)
+                    else:
+                        self.manifest.record_failure(region, errors.get(region, "no data returned"))
+                        failed.append(region)
+                self.manifest.save()
+        return failed
+
+    def collect_data(self) -> pd.DataFrame:
+        """Collects every HPI region not yet collected, recording each in the collection manifest.
+
+        Regions are skipped when the manifest and the cache show them already collected
+        (see ``resume`` and ``only_failed``). The manifest is checkpointed after every batch,
+        so an interrupted run can be picked up with ``resume``. Regions that fail are retried
+        in further passes with exponential backoff.
+
+        Returns:
+            pd.DataFrame: The rows collected by this run.
+        """
+        hpi_regions = self.sparql.hpi_regions(complete=True)
+
+        regions = sorted(list(set(hpi_regions["ref_region_keyword"].unique())))
+        todo = self._select_regions(regions)
+        self._log.info(f"{len(regions) - len(todo)} of {len(regions)} regions already collected; skipping them")
+        self.manifest.mark_pending(todo)
+        self.manifest.save()
+
+        collected_data: list[pd.DataFrame] = []
+        pending = todo
+        for attempt in range(self.retries + 1):
+            if not pending:
+                break
+            if attempt:
+                delay = self.backoff * 2 ** (attempt - 1)
+                self._log.info(f"Retrying {len(pending)} failed regions in {delay:.1f}s (retry {attempt})")
+                time.sleep(delay)
+            desc = "Collecting data" if not attempt else f"Retry {attempt}"
+            pending = self._collect_pass(pending, collected_data, desc)
+
+        succeeded = len(todo) - len(pending)
+        self._log.info(f"Collected data for {succeeded} regions ({len(pending)} failed)")
+        if pending:
+            self._log.info(f"Rerun with --only-failed to retry: {', '.join(pending)}")
+        self._log.info(f"Endpoint limiter: {self.sparql.limiter_stats}")
 
         if collected_data:
             return pd.concat(collected_data, ignore_index=True)
@@ -64,16 +249,58 @@ class DataCollection:
 def build_parser() -> ArgumentParser:
     parser = ArgumentParser(
         prog="ukhpi-collect",
-        description="Collect UK House Price Index data for all regions into a local CSV cache.",
+        description=(
+            "Collect the full UK House Price Index history of every region into the local series cache "
+            "(Parquet files, or CSV without pyarrow)."
+        ),
     )
     parser.add_argument(
         "--data-path",
         type=Path,
         default=DEFAULT_DATA_PATH,
-        help=f"Directory to write per-region CSVs (default: {DEFAULT_DATA_PATH})",
+        help=f"Directory of the per-region series files and the collection manifest (default: {DEFAULT_DATA_PATH}).",
+    )
+    parser.add_argument(
+        "--start-year",
+        type=int,
+        default=1990,
+        help="First year of the collected frame (default: 1990). The full history is always fetched and cached.",
+    )
+    parser.add_argument(
+        "--end-year",
+        type=int,
+        default=2025,
+        help="Last year of the collected frame (default: 2025). The full history is always fetched and cached.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=25,
+        help="Regions bound into each batched SPARQL query (default: 25).",
+    )
+    parser.add_argument("--retries", type=int, default=3, help="Retry passes over failed regions (default: 3).")
+    parser.add_argument(
+        "--backoff",
+        type=float,
+        default=2.0,
+        help="Seconds before the first retry pass, doubled for each later one (default: 2.0).",
+    )
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip every region the collection manifest records as collected, not only today's.",
+    )
+    selection.add_argument(
+        "--only-failed",
+        action="store_true",
+        help="Collect only the regions the collection manifest records as failed.",
+    )
+    parser.add_argument(
+        "--build-cube",
+        action="store_true",
+        help=f"Pack the collected series into the memory-mapped HPI cube at {DEFAULT_CUBE_PATH} afterwards.",
     )
-    parser.add_argument("--start-year", type=int, default=1990, help="First year to fetch (default: 1990).")
-    parser.add_argument("--end-year", type=int, default=2025, help="Last year to fetch (default: 2025).")
     return parser
 
 
@@ -83,4 +310,11 @@ def main(argv: list[str] | None = None) -> None:
         data_path=args.data_path,
         start_year=args.start_year,
         end_year=args.end_year,
+        chunk_size=args.chunk_size,
+        resume=args.resume,
+        only_failed=args.only_failed,
+        retries=args.retries,
+        backoff=args.backoff,
     ).collect_data()
+    if args.build_cube:
+        HpiCube.build(hpi_path=args.data_path)
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import tempfile
+from argparse import ArgumentParser
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ukhpi.core.decoding import hpi_column_kind
+from ukhpi.core.hpi import HousePriceIndex
+from ukhpi.core.sparql import SparqlQuery
+from ukhpi.io.loader import Dataset
+from ukhpi.loggers import BasicLogger
+from ukhpi.text import make_snake_from_camel
+
+_PACKAGE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_HPI_PATH = _PACKAGE_DIR / "cache" / "hpi_data"
+DEFAULT_CUBE_PATH = _PACKAGE_DIR / "cache" / "cube"
+
+# Every numeric ukhpi: property, in query column order.
+METRICS = [
+    make_snake_from_camel(col)
+    for col in SparqlQuery._COLUMNS
+    if hpi_column_kind(col) in ("float", "int") and col != "refPeriodDuration"
+]
+
+_SERIES_FILE = re.compile(r"^(?P<key>.+)_hpi_\d{8}\.(?:parquet|feather|csv)$")
+
+
+def source_version(hpi_path: Path | str) -> str:
+    """Fingerprint of the series files under ``hpi_path``; it changes whenever a series is written or removed."""
+    entries = []
+    for p in Path(hpi_path).glob("*_hpi_*"):
+        if not _SERIES_FILE.match(p.name):
+            continue
+        try:
+            stat = p.stat()
+        except FileNotFoundError:
+            continue
+        entries.append(f"{p.name}:{stat.st_mtime_ns}:{stat.st_size}")
+    return hashlib.sha256("\n".join(sorted(entries)).encode("utf-8")).hexdigest()
+
+
+class HpiCube:
+    """Dense region × month × metric float32 array of HPI values, memory-mapped read-only.
+
+    The cube lives in two files under ``path``: ``hpi_cube.json``, its index (the region,
+    month and metric labels of each axis), and the raw C-ordered array it names,
+    ``hpi_cube_{version}.f32``. Label lookups are dictionary reads and every slice is a strided view of the
+    mapping, so processes opening the same cube share one copy through the page cache.
+    Missing observations are NaN. The index also records the series directory the cube was
+    packed from and its ``source_version``, so readers can tell when the series moved on.
+    """
+
+    INDEX_FILE = "hpi_cube.json"
+
+    def __init__(self, path: Path | str = DEFAULT_CUBE_PATH):
+        self.path = Path(path)
+        with (self.path / self.INDEX_FILE).open() as f:
+            index = json.load(f)
+        self.version: str = index["version"]
+        self.regions: list[str] = index["regions"]
+        self.months: list[str] = index["months"]
+        self.metrics: list[str] = index["metrics"]
+        # Cubes built before sources were recorded cannot be checked for staleness.
+        self.hpi_path: Path | None = Path(index["hpi_path"]) if index.get("hpi_path") else None
+        self.source_version: str | None = index.get("source_version")
+        self._region_index = {r: i for i, r in enumerate(self.regions)}
+        self._month_index = {m: i for i, m in enumerate(self.months)}
+        self._metric_index = {m: i for i, m in enumerate(self.metrics)}
+        shape = (len(self.regions), len(self.months), len(self.metrics))
+        # An empty file cannot be mapped; an empty cube is an empty array.
+        self.data = (
+            np.memmap(self.path / index["data_file"], dtype=np.float32, mode="r", shape=shape)
+            if all(shape)
+            else np.empty(shape, dtype=np.float32)
+        )
+
+    @staticmethod
+    def _lookup(index: dict[str, int], label: str, axis: str) -> int:
+        try:
+            return index[label]
+        except KeyError:
+            raise KeyError(f"Unknown {axis} '{label}'") from None
+
+    def _region(self, region: str) -> int:
+        return self._lookup(self._region_index, SparqlQuery.region_slug(region), "region")
+
+    def _month(self, month: str | pd.Timestamp | datetime.date) -> int:
+        label = month if isinstance(month, str) else pd.Timestamp(month).strftime("%Y-%m")
+        return self._lookup(self._month_index, label[:7], "month")
+
+    def _metric(self, metric: str) -> int:
+        return self._lookup(self._metric_index, metric, "metric")
+
+    def value(self, region: str, month: str, metric: str) -> float:
+        return float(self.data[self._region(region), self._month(month), self._metric(metric)])
+
+    def cross_section(self, metric: str, month: str) -> pd.Series:
+        """``metric`` for every region at ``month``, indexed by region slug."""
+        values = self.data[:, self._month(month), self._metric(metric)]
+        return pd.Series(values, index=pd.Index(self.regions, name="region"), name=metric)
+
+    def series(self, region: str, metric: str) -> pd.Series:
+        """``metric`` for ``region`` over every month, indexed by ``YYYY-MM``."""
+        values = self.data[self._region(region), :, self._metric(metric)]
+        return pd.Series(values, index=pd.Index(self.months, name="month"), name=metric)
+
+    def snapshot(self, region: str, month: str) -> pd.Series:
+        """Every metric for ``region`` at ``month``, indexed by metric name."""
+        values = self.data[self._region(region), self._month(month), :]
+        return pd.Series(values, index=pd.Index(self.metrics, name="metric"), name=month)
+
+    def panel(self, metric: str) -> pd.DataFrame:
+        """Region × month frame of one metric."""
+        values = self.data[:, :, self._metric(metric)]
+        return pd.DataFrame(values, index=pd.Index(self.regions, name="region"), columns=self.months)
+
+    @classmethod
+    def build(
+        cls,
+        hpi_path: Path | str = DEFAULT_HPI_PATH,
+        path: Path | str = DEFAULT_CUBE_PATH,
+        metrics: list[str] | None = None,
+    ) -> HpiCube:
+        """Packs the latest canonical series of every cached region into a cube at ``path``.
+
+        Each build writes a new data file and then atomically replaces the index that names
+        it, so a reader always pairs an index with its own data file. Readers that already
+        mapped the previous file keep it until they close it.
+        """
+        logger = BasicLogger(logger_name="HPI_CUBE", verbose=False, log_directory=None)
+        hpi_path = Path(hpi_path)
+        hpi = HousePriceIndex(data_path=hpi_path)
+        metrics = list(metrics or METRICS)
+        # Fingerprinted before reading, so a series written mid-build marks the cube stale.
+        sources = source_version(hpi_path)
+
+        keys = sorted({m["key"] for p in hpi_path.glob("*_hpi_*") if (m := _SERIES_FILE.match(p.name))})
+        frames: dict[str, pd.DataFrame] = {}
+        for key in keys:
+            file_path = hpi._hpi_file(key).latest_file_path
+            if file_path is None:
+                continue
+            df = Dataset(file_path=file_path).load_frame()
+            if df.empty or "ref_period_start" not in df.columns:
+                continue
+            slug = key.replace("_", "-")
+            if "ref_region" in df.columns and df["ref_region"].notna().any():
+                slug = str(df["ref_region"].dropna().iloc[0]).rsplit("/", 1)[-1]
+            months = pd.to_datetime(df["ref_period_start"], errors="coerce").dt.strftime("%Y-%m")
+            frames[slug] = df.assign(_month=months).dropna(subset=["_month"])
+
+        if frames:
+            periods = pd.PeriodIndex(pd.concat([f["_month"] for f in frames.values()]).unique(), freq="M")
+            months = [str(p) for p in pd.period_range(periods.min(), periods.max(), freq="M")]
+        else:
+            months = []
+        regions = sorted(frames)
+        month_index = {m: i for i, m in enumerate(months)}
+
+        path = Path(path)
+        path.mkdir(exist_ok=True, parents=True)
+        shape = (len(regions), len(months), len(metrics))
+        fd, tmp_name = tempfile.mkstemp(dir=path, suffix=".tmp")
+        os.close(fd)
+        try:
+            if all(shape):
+                cube = np.memmap(tmp_name, dtype=np.float32, mode="w+", shape=shape)
+                cube[:] = np.nan
+                for i, region in enumerate(regions):
+                    df = frames[region].drop_duplicates("_month", keep="last")
+                    rows = df["_month"].map(month_index).to_numpy()
+                    for k, metric in enumerate(metrics):
+                        if metric in df.columns:
+                            cube[i, rows, k] = pd.to_numeric(df[metric], errors="coerce").to_numpy(np.float32)
+                cube.flush()
+                del cube
+            version = datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+            data_file = f"hpi_cube_{version}.f32"
+            os.replace(tmp_name, path / data_file)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        index = {
+            "version": version,
+            "data_file": data_file,
+            "shape": list(shape),
+            "dtype": "float32",
+            "regions": regions,
+            "months": months,
+            "metrics": metrics,
+            "hpi_path": str(hpi_path.resolve()),
+            "source_version": sources,
+        }
+        tmp_index = path / f"{cls.INDEX_FILE}.tmp"
+        tmp_index.write_text(json.dumps(index))
+        os.replace(tmp_index, path / cls.INDEX_FILE)
+        for stale in path.glob("hpi_cube_*.f32"):
+            if stale.name != data_file:
+                stale.unlink(missing_ok=True)
+        logger.info(f"Built HPI cube {shape} at {path}")
+        return cls(path)
+
+
+def build_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="ukhpi-cube",
+        description="Pack the cached per-region HPI series into a memory-mapped region × month × metric cube.",
+    )
+    parser.add_argument(
+        "--hpi-path",
+        type=Path,
+        default=DEFAULT_HPI_PATH,
+        help=f"Directory of cached per-region series (default: {DEFAULT_HPI_PATH}).",
+    )
+    parser.add_argument(
+        "--output", type=Path, default=DEFAULT_CUBE_PATH, help=f"Cube directory (default: {DEFAULT_CUBE_PATH})."
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    cube = HpiCube.build(hpi_path=args.hpi_path, path=args.output)
+    print(f"Built cube of {len(cube.regions)} regions × {len(cube.months)} months × {len(cube.metrics)} metrics")
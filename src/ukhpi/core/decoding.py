@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import csv
+import importlib.util
+from collections.abc import Iterable, Iterator
+from typing import IO, Any
+
+import numpy as np
+import pandas as pd
+
+from ukhpi.text import make_snake_from_camel
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+_INTEGER_TYPES = {
+    f"{XSD}{t}"
+    for t in (
+        "integer",
+        "int",
+        "long",
+        "short",
+        "nonNegativeInteger",
+        "positiveInteger",
+        "unsignedInt",
+        "unsignedLong",
+    )
+}
+_FLOAT_TYPES = {f"{XSD}{t}" for t in ("decimal", "double", "float")}
+_DATE_TYPES = {f"{XSD}date", f"{XSD}dateTime"}
+_STRING_TYPES = {f"{XSD}string", f"{XSD}gYearMonth"}
+
+# String escapes of TSV literals (Turtle ECHAR), keyed by the character after the backslash.
+_ECHARS = {"t": "\t", "b": "\b", "n": "\n", "r": "\r", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+
+# The pyarrow CSV reader is used when installed; pandas' C parser otherwise.
+_CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+# Columns without a declared kind or datatype annotation get the legacy treatment:
+# known date names are parsed as dates, everything else is tried as numeric.
+_UNTYPED_DATE_COLUMNS = {"ref_period_start", "ref_period_end", "date"}
+
+
+def hpi_column_kind(variable: str) -> str:
+    """Declared kind of a ``ukhpi:`` property, derived from its name."""
+    if variable in {"_about", "dataSet", "refRegion", "type"}:
+        return "uri"
+    if variable == "refPeriodStart":
+        return "date"
+    if variable == "refMonth":
+        return "str"
+    if variable.startswith("salesVolume") or variable == "refPeriodDuration":
+        return "int"
+    return "float"
+
+
+def _kind_from_cell(cell: dict[str, Any] | None) -> str | None:
+    if cell is None:
+        return None
+    if cell.get("type") == "uri":
+        return "uri"
+    datatype = cell.get("datatype")
+    if datatype in _INTEGER_TYPES:
+        return "int"
+    if datatype in _FLOAT_TYPES:
+        return "float"
+    if datatype in _DATE_TYPES:
+        return "date"
+    if datatype in _STRING_TYPES:
+        return "str"
+    return None
+
+
+def _to_float(values: list) -> np.ndarray:
+    if None in values:
+        values = [v if v is not None else "nan" for v in values]
+    return np.array(values, dtype=np.float64)
+
+
+def decode_column(name: str, values: list, kind: str | None) -> Any:
+    """Converts one buffered column of SPARQL lexical values into a typed array."""
+    try:
+        if kind == "float":
+            return _to_float(values)
+        if kind == "int":
+            # Missing values force float64, matching what pandas would infer.
+            return _to_float(values) if None in values else np.array(values, dtype=np.int64)
+        if kind == "date":
+            return pd.to_datetime(values, format="ISO8601")
+        if kind == "uri":
+            return pd.Categorical(values)
+        if kind == "str":
+            return np.array(values, dtype=object)
+    except (ValueError, TypeError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy()
+
+    if name in _UNTYPED_DATE_COLUMNS:
+        return pd.to_datetime(values)
+    series = pd.Series(values, dtype=object)
+    try:
+        return pd.to_numeric(series, errors="raise").to_numpy()
+    except (ValueError, TypeError):
+        return series.to_numpy()
+
+
+class ColumnarDecoder:
+    """Decodes SPARQL JSON bindings straight into typed per-variable columns.
+
+    Rows are appended to one list per variable; types come from the declared
+    ``schema`` first and the bindings' datatype annotations second, so no
+    per-column trial conversion is needed.
+    """
+
+    def __init__(self, variables: Iterable[str], schema: dict[str, str] | None = None):
+        self.variables = list(variables)
+        self.schema = schema or {}
+        self._buffers: dict[str, list] = {v: [] for v in self.variables}
+        self._first_cells: dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._buffers[self.variables[0]]) if self.variables else 0
+
+    def extend(self, bindings: Iterable[dict[str, dict]]) -> None:
+        buffers = list(self._buffers.items())
+        first_cells = self._first_cells
+        for binding in bindings:
+            for var, buf in buffers:
+                cell = binding.get(var)
+                if cell is None:
+                    buf.append(None)
+                    continue
+                buf.append(cell["value"])
+                if var not in first_cells:
+                    first_cells[var] = cell
+
+    def to_frame(self) -> pd.DataFrame:
+        columns = {}
+        for var, values in self._buffers.items():
+            name = make_snake_from_camel(var)
+            kind = self.schema.get(var) or _kind_from_cell(self._first_cells.get(var))
+            columns[name] = decode_column(name, values, kind) if values else pd.Series(dtype=object)
+        return pd.DataFrame(columns)
+
+    def clear(self) -> None:
+        for buf in self._buffers.values():
+            buf.clear()
+
+
+def _type_delimited_column(name: str, series: pd.Series, kind: str | None) -> Any:
+    if kind == "uri":
+        return series.astype("category")
+    if kind == "date":
+        return pd.to_datetime(series, format="ISO8601")
+    if kind == "str":
+        return series.astype(object)
+    if kind in ("float", "int"):
+        values = pd.to_numeric(series, errors="coerce").astype(np.float64)
+        if kind == "int" and not values.isna().any():
+            return values.astype(np.int64)
+        return values
+    if name in _UNTYPED_DATE_COLUMNS:
+        return pd.to_datetime(series)
+    if series.dtype == object:
+        try:
+            return pd.to_numeric(series, errors="raise")
+        except (ValueError, TypeError):
+            return series
+    return series
+
+
+def _strip_rdf_terms(series: pd.Series) -> pd.Series:
+    """Reduces TSV RDF terms (``<uri>``, ``"lex"^^<dt>``, ``"lex"@en``) to their lexical form."""
+    if series.dtype != object:
+        return series
+    out = series.str.replace(r'^"(.*)"(?:\^\^<[^>]*>|@[A-Za-z-]+)?$', r"\1", regex=True)
+    out = out.str.replace(r"^<(.*)>$", r"\1", regex=True)
+    return out.str.replace(r"\\([tbnrf\"'\\])", lambda m: _ECHARS[m.group(1)], regex=True)
+
+
+def type_delimited_frame(df: pd.DataFrame, schema: dict[str, str], tsv: bool = False) -> pd.DataFrame:
+    """Applies the declared schema to a raw CSV/TSV result chunk and snake-cases its columns."""
+    columns = {}
+    for var in df.columns:
+        series = df[var]
+        var = var.lstrip("?")
+        if tsv:
+            series = _strip_rdf_terms(series)
+        name = make_snake_from_camel(var)
+        columns[name] = _type_delimited_column(name, series, schema.get(var))
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _read_delimited(source: IO[bytes], tsv: bool, schema: dict[str, str], chunk_size: int | None = None):
+    if tsv:
+        # TSV terms are N-Triples encoded and may contain quote characters, so read them verbatim.
+        return pd.read_csv(
+            source,
+            sep="\t",
+            dtype=str,
+            quoting=csv.QUOTE_NONE,
+            keep_default_na=False,
+            na_values=[""],
+            chunksize=chunk_size,
+        )
+
+    # Read text kinds as strings; numeric kinds go straight to float64 in the parser.
+    dtype = {var: (str if kind in ("uri", "str", "date") else np.float64) for var, kind in schema.items()}
+    engine = _CSV_ENGINE if chunk_size is None else "c"
+    return pd.read_csv(
+        source,
+        dtype=dtype,
+        keep_default_na=False,
+        na_values=[""],
+        engine=engine,
+        chunksize=chunk_size,
+    )
+
+
+def decode_delimited_results(source: IO[bytes], schema: dict[str, str], tsv: bool = False) -> pd.DataFrame:
+    """Decodes a SPARQL CSV or TSV result set into the same frame contract as the JSON path."""
+    return type_delimited_frame(_read_delimited(source, tsv, schema), schema, tsv=tsv)
+
+
+def iter_delimited_results(
+    source: IO[bytes], schema: dict[str, str], chunk_size: int, tsv: bool = False
+) -> Iterator[pd.DataFrame]:
+    """Chunked variant of ``decode_delimited_results`` for streamed responses."""
+    with _read_delimited(source, tsv, schema, chunk_size=chunk_size) as reader:
+        for chunk in reader:
+            yield type_delimited_frame(chunk.reset_index(drop=True), schema, tsv=tsv)
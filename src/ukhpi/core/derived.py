@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import datetime
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ukhpi.core.cube import DEFAULT_CUBE_PATH, HpiCube, source_version
+from ukhpi.io.frame_cache import FrameCache
+
+Month = str | pd.Timestamp | pd.Period | datetime.date
+
+
+def rebase(values: np.ndarray, base: int) -> np.ndarray:
+    """Scales each row of a region × month array so the ``base`` month is 100."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return values / values[:, [base]] * 100.0
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` months; NaN until a full window of observations is available."""
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    valid = ~np.isnan(values)
+    zeros = np.zeros((values.shape[0], 1))
+    sums = np.concatenate([zeros, np.cumsum(np.where(valid, values, 0.0), axis=1)], axis=1)
+    counts = np.concatenate([zeros, np.cumsum(valid, axis=1)], axis=1)
+    out = np.full(values.shape, np.nan)
+    if window <= values.shape[1]:
+        total = sums[:, window:] - sums[:, :-window]
+        full = (counts[:, window:] - counts[:, :-window]) == window
+        out[:, window - 1 :] = np.where(full, total / window, np.nan)
+    return out
+
+
+def change(values: np.ndarray, periods: int = 1, relative: bool = True) -> np.ndarray:
+    """Change over ``periods`` months: a percentage when ``relative``, a difference otherwise."""
+    if periods < 1:
+        raise ValueError("periods must be at least 1")
+    out = np.full(values.shape, np.nan)
+    current, previous = values[:, periods:], values[:, :-periods]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, periods:] = (current / previous - 1.0) * 100.0 if relative else current - previous
+    return out
+
+
+def cumulative_change(values: np.ndarray, start: int) -> np.ndarray:
+    """Percentage change of every month since the ``start`` month."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (values / values[:, [start]] - 1.0) * 100.0
+
+
+class DerivedMetrics:
+    """Derived HPI metrics computed across every region of the HPI cube at once.
+
+    Each metric is one vectorised NumPy pass over a region × month panel of the cube, so a
+    new view costs no SPARQL fetch. Results are region × month frames, like
+    ``HpiCube.panel``, kept in the shared frame cache and tagged with the version of the
+    cube they were computed from. A rebuilt cube is picked up on the next call and its
+    stale results are recomputed. When the series the cube was packed from have been
+    written since, by ``fetch_hpi`` or a delta refresh, the cube is rebuilt from them first.
+    """
+
+    def __init__(self, cube_path: Path | str = DEFAULT_CUBE_PATH, source_check_interval: float = 1.0):
+        """
+        Args:
+            cube_path (Path | str): Directory of the cube.
+            source_check_interval (float): Seconds between fingerprints of the series directory
+                while its mtime stays the same; a changed mtime is checked at once.
+        """
+        self.cube_path = Path(cube_path)
+        self.source_check_interval = source_check_interval
+        self._cube: HpiCube | None = None
+        self._stamp: tuple[int, int, int] | None = None
+        # mtime of the series directory at the last fingerprint, and when it was taken.
+        self._sources_checked: tuple[int, float] | None = None
+        self._lock = threading.Lock()
+
+    def _index_stamp(self) -> tuple[int, int, int]:
+        stat = (self.cube_path / HpiCube.INDEX_FILE).stat()
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _sources_changed(self, cube: HpiCube) -> bool:
+        """Whether the series ``cube`` was packed from have been written or removed since.
+
+        Each access costs one stat of the series directory; the directory is listed only when
+        its mtime moved or ``source_check_interval`` has passed since the last listing.
+        """
+        if cube.hpi_path is None:
+            return False
+        try:
+            mtime = cube.hpi_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        now = time.monotonic()
+        if self._sources_checked is not None:
+            checked_mtime, checked_at = self._sources_checked
+            if mtime == checked_mtime and now - checked_at < self.source_check_interval:
+                return False
+        self._sources_checked = (mtime, now)
+        return source_version(cube.hpi_path) != cube.source_version
+
+    @property
+    def cube(self) -> HpiCube:
+        """The cube at ``cube_path``, reopened whenever its index file has been replaced.
+
+        The cube is rebuilt first when the series it was packed from have changed.
+        """
+        stamp = self._index_stamp()
+        with self._lock:
+            if self._cube is None or stamp != self._stamp:
+                self._cube = HpiCube(self.cube_path)
+                self._stamp = stamp
+            cube = self._cube
+            if self._sources_changed(cube):
+                self._cube = HpiCube.build(hpi_path=cube.hpi_path, path=self.cube_path, metrics=cube.metrics)
+                self._stamp = self._index_stamp()
+            return self._cube
+
+    def _cached(self, name: str, params: tuple, compute: Callable[[HpiCube], pd.DataFrame]) -> pd.DataFrame:
+        cube = self.cube
+        cache = FrameCache.shared()
+        key = ("derived", str(self.cube_path), name, params)
+        hit = cache.lookup(key)
+        if hit is not None and hit[1] == cube.version:
+            return hit[0].copy()
+        frame = compute(cube)
+        cache.put(key, frame, version=cube.version)
+        return frame.copy()
+
+    @staticmethod
+    def _values(cube: HpiCube, metric: str) -> np.ndarray:
+        return np.asarray(cube.data[:, :, cube._metric(metric)], dtype=np.float64)
+
+    @staticmethod
+    def _frame(cube: HpiCube, values: np.ndarray, months: slice = slice(None)) -> pd.DataFrame:
+        return pd.DataFrame(
+            values[:, months].astype(np.float32),
+            index=pd.Index(cube.regions, name="region"),
+            columns=cube.months[months],
+        )
+
+    @staticmethod
+    def _label(month: Month) -> str:
+        if isinstance(month, str):
+            return month[:7]
+        if isinstance(month, pd.Period):
+            return month.strftime("%Y-%m")
+        return pd.Timestamp(month).strftime("%Y-%m")
+
+    def rebased(self, metric: str, base_month: Month) -> pd.DataFrame:
+        """``metric`` for every region with ``base_month`` = 100."""
+
+        def compute(cube: HpiCube) -> pd.DataFrame:
+            return self._frame(cube, rebase(self._values(cube, metric), cube._month(self._label(base_month))))
+
+        return self._cached("rebased", (metric, self._label(base_month)), compute)
+
+    def rolling_mean(self, metric: str, window: int = 12) -> pd.DataFrame:
+        """Trailing ``window``-month average of ``metric``, such as 3 or 12 months."""
+
+        def compute(cube: HpiCube) -> pd.DataFrame:
+            return self._frame(cube, rolling_mean(self._values(cube, metric), window))
+
+        return self._cached("rolling_mean", (metric, window), compute)
+
+    def change(self, metric: str, periods: int = 1, relative: bool = True) -> pd.DataFrame:
+        """Period-over-period change of any metric: month on month by default, 12 for year on year.
+
+        Args:
+            metric (str): Cube metric.
+            periods (int): Months between the two observations compared.
+            relative (bool): Percentage change when True, difference in the metric's units otherwise.
+        """
+
+        def compute(cube: HpiCube) -> pd.DataFrame:
+            return self._frame(cube, change(self._values(cube, metric), periods, relative))
+
+        return self._cached("change", (metric, periods, relative), compute)
+
+    def cumulative_change(self, metric: str, start_month: Month, end_month: Month | None = None) -> pd.DataFrame:
+        """Percentage change of ``metric`` since ``start_month``, for every month up to ``end_month``."""
+
+        def compute(cube: HpiCube) -> pd.DataFrame:
+            start = cube._month(self._label(start_month))
+            end = cube._month(self._label(end_month)) if end_month is not None else len(cube.months) - 1
+            return self._frame(cube, cumulative_change(self._values(cube, metric), start), slice(start, end + 1))
+
+        end_label = self._label(end_month) if end_month is not None else None
+        return self._cached("cumulative_change", (metric, self._label(start_month), end_label), compute)
+
+    def real_terms(self, metric: str, deflator: pd.Series, base_month: Month | None = None) -> pd.DataFrame:
+        """``metric`` in constant prices of ``base_month``.
+
+        Args:
+            metric (str): Cube metric in nominal terms, such as ``average_price``.
+            deflator (pd.Series): Price level, such as CPI, indexed by month (``YYYY-MM``
+                labels, dates or periods). Months it does not cover are NaN.
+            base_month (Month | None): Month whose prices the result is expressed in; the latest
+                month the deflator covers when None.
+
+        Raises:
+            ValueError: If the deflator has no value for ``base_month``.
+        """
+        deflator = deflator.rename(index=self._label).groupby(level=0).last().astype(np.float64)
+        covered = deflator.dropna().index
+        if covered.empty:
+            raise ValueError("deflator has no values")
+        base = self._label(base_month) if base_month is not None else covered.max()
+        if base not in covered:
+            raise ValueError(
+                f"deflator has no value for base_month '{base}'; it covers {covered.min()} to {covered.max()}"
+            )
+        fingerprint = int(pd.util.hash_pandas_object(deflator).sum())
+
+        def compute(cube: HpiCube) -> pd.DataFrame:
+            level = deflator.reindex(cube.months).to_numpy() / deflator[base]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return self._frame(cube, self._values(cube, metric) / level)
+
+        return self._cached("real_terms", (metric, base, fingerprint), compute)
@@ -1,29 +1,85 @@
 from __future__ import annotations
 
+import datetime
+import sqlite3
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+from ukhpi.core.rollups import GRANULARITIES, ROLLUP_SCHEMA, period_start, roll_up, rollup_table
+from ukhpi.core.schema import HPI_SCHEMA, apply_schema
+from ukhpi.core.singleflight import SingleFlight
 from ukhpi.core.sparql import SparqlQuery
+from ukhpi.io.formats import CACHE_EXTENSION
+from ukhpi.io.frame_cache import FrameCache
+from ukhpi.io.hpi_store import HpiStore
 from ukhpi.io.loader import Dataset
 from ukhpi.io.versioning import FileVersion
+from ukhpi.io.writer import WriteFile
+from ukhpi.loggers import BasicLogger
+from ukhpi.text import make_snake_from_camel
 
+_PACKAGE_DIR = Path(__file__).resolve().parent.parent
 sparqlquery = SparqlQuery()
+_flights = SingleFlight()
+
+# First year of the canonical per-region series. Only the UK as a whole is back-calculated to
+# January 1968; every other series starts in 1995 or later, so fetching their history from 1968
+# would only add empty year shards.
+HISTORY_START_YEAR = 1968
+SERIES_START_YEAR = 1995
+BACK_SERIES_REGIONS = frozenset({"united-kingdom"})
+
+
+def history_start(region: str) -> int:
+    """First year of a region's canonical series."""
+    return HISTORY_START_YEAR if sparqlquery.region_slug(region) in BACK_SERIES_REGIONS else SERIES_START_YEAR
+
+
+def _series_key(file: FileVersion) -> tuple[str, str]:
+    return (str(file.base_path), file.file_name)
+
+
+def _full_precision(file: FileVersion, cached: pd.DataFrame) -> pd.DataFrame:
+    """The series on disk with float64 values, to merge into before writing it back.
+
+    In-memory series are float32, so rewriting one would round the rows it keeps. ``cached``
+    is used when there is no file to reread.
+    """
+    file_path = file.latest_file_path
+    if file_path is None:
+        return cached
+    return apply_schema(Dataset(file_path=file_path).load_frame(), HPI_SCHEMA, float_dtype=np.float64)
+
+
+def _read_series(file: FileVersion, file_path: Path) -> pd.DataFrame:
+    """Parses a canonical series file into the shared frame cache, tagged with the year it was written.
+
+    Columns are cast to the compact HPI schema, so series written as CSV by older versions
+    take the same memory as columnar ones.
+    """
+    df = apply_schema(Dataset(file_path=file_path).load_frame(), HPI_SCHEMA, label=file.file_name)
+    FrameCache.shared().put(_series_key(file), df, version=file.date_of(file_path).year)
+    return df
 
 
 class HousePriceIndex:
     COUNTRIES = ["england", "wales", "scotland", "northern-ireland"]
 
-    def __init__(self):
+    def __init__(self, data_path: Path | str | None = None):
+        """
+        Args:
+            data_path (Path | str | None): Directory of the per-region series files; the
+                package cache by default.
+        """
         self._base_url = "http://landregistry.data.gov.uk/data/ukhpi/region"
-        self._data_path = Path(__file__).resolve().parent.parent / "cache" / "hpi_data"
-        self._hpi_regions: pd.DataFrame | None = None
+        self._data_path = Path(data_path) if data_path is not None else _PACKAGE_DIR / "cache" / "hpi_data"
+        self._logger = BasicLogger(logger_name="HPI", verbose=False, log_directory=None)
 
     @property
     def hpi_regions(self) -> pd.DataFrame:
-        if self._hpi_regions is None:
-            self._hpi_regions = sparqlquery.HPI_REGIONS
-        return self._hpi_regions
+        return sparqlquery.HPI_REGIONS
 
     @property
     def REGION_TYPES(self) -> list[str]:
@@ -37,36 +93,416 @@ class HousePriceIndex:
         start_year: str | int,
         end_year: str | int | None = None,
         region: str = "united-kingdom",
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        end_year = end_year if end_year else start_year
+        return sparqlquery.fetch_hpi_for_region(region, int(start_year), int(end_year), columns=columns)
+
+    def _hpi_file(self, region: str) -> FileVersion:
+        region_key = region.replace(" ", "-").replace("-", "_").lower()
+        # Typed columnar files when pyarrow is available; CSV series from older versions are
+        # migrated on first read.
+        return FileVersion(
+            base_path=self._data_path,
+            file_name=f"{region_key}_hpi",
+            extension=CACHE_EXTENSION,
+            legacy_extensions=("csv",),
+        )
+
+    def _write_series(
+        self,
+        file: FileVersion,
+        df: pd.DataFrame,
+        region: str,
+        check_version: bool = False,
+        changed: pd.DataFrame | None = None,
+        date: datetime.datetime | None = None,
     ) -> pd.DataFrame:
-        query = sparqlquery.build_query_for_region(region, start_year, end_year)
-        results = sparqlquery.fetch_sparql_query(query)
-        return sparqlquery.make_data_from_results(results)
+        """Writes a canonical series file and upserts the rows that changed into the HPI store.
+
+        The file is stamped with ``date``, today by default. The quarterly and annual roll-ups
+        are refreshed from the first period the changed rows touch.
+
+        Returns:
+            pd.DataFrame: The series as read back from the new file, or the in-memory series
+            when the write failed, so rows fetched successfully are never lost.
+        """
+        # The canonical file keeps full float precision; only frames held in memory are float32.
+        df = apply_schema(df, HPI_SCHEMA, float_dtype=np.float64)
+        written = WriteFile(
+            data_to_write=df,
+            base_path=file.base_path,
+            file_name=file.file_name,
+            extension=file.extension,
+        ).write_file_to_disk(check_version=check_version, date=date)
+        store = HpiStore.shared()
+        slug = sparqlquery.region_slug(region)
+        since = None
+        if changed is not None and not changed.empty:
+            since = pd.to_datetime(changed["ref_period_start"], errors="coerce").min()
+        try:
+            store.upsert(df if changed is None else changed, region=slug)
+            self._refresh_rollups(store, slug, df, None if pd.isna(since) else since)
+        except sqlite3.Error as e:
+            # The file is the source of truth; the store is backfilled on its next read.
+            self._logger.warning(f"Failed to upsert '{region}' into the HPI store: {e}")
+        return _read_series(file, written) if written else apply_schema(df, HPI_SCHEMA)
+
+    @staticmethod
+    def _refresh_rollups(store: HpiStore, slug: str, series: pd.DataFrame, since: pd.Timestamp | None = None) -> None:
+        """Materialises the coarse roll-ups of a series, from the period containing ``since`` onward."""
+        for granularity, freq in GRANULARITIES.items():
+            if freq is not None:
+                store.upsert(roll_up(series, granularity, since=since), region=slug, table=rollup_table(granularity))
+
+    def _rolled_up(self, region: str, series: pd.DataFrame, granularity: str) -> pd.DataFrame:
+        """The materialised roll-up of a region's series, topped up first if months landed since."""
+        if series.empty or "ref_period_start" not in series.columns:
+            return series
+        store = HpiStore.shared()
+        slug = sparqlquery.region_slug(region)
+        table = rollup_table(granularity)
+        try:
+            rolled = store.query(regions=[slug], table=table)
+            # Series cached before roll-ups were materialised, or whose store write failed,
+            # are rolled up here from their newest materialised period.
+            months = pd.to_datetime(series["ref_period_start"], errors="coerce")
+            if pd.isna(months.max()):
+                return series.iloc[0:0]
+            latest = period_start(months.max(), granularity)
+            if rolled.empty:
+                stale, since = True, None
+            else:
+                last = rolled.iloc[-1]
+                since = last["ref_period_start"]
+                stale = latest > since or int((months >= since).sum()) != int(last["period_months"])
+            if stale:
+                store.upsert(roll_up(series, granularity, since=since), region=slug, table=table)
+                rolled = store.query(regions=[slug], table=table)
+        except sqlite3.Error as e:
+            self._logger.warning(f"Failed to read the {granularity} roll-up of '{region}' from the HPI store: {e}")
+            rolled = roll_up(series, granularity)
+        return apply_schema(rolled.drop(columns="region", errors="ignore"), ROLLUP_SCHEMA)
+
+    @staticmethod
+    def _history_end() -> int:
+        return datetime.date.today().year
+
+    @staticmethod
+    def _slice(df: pd.DataFrame, start_year: str | int, end_year: str | int) -> pd.DataFrame:
+        """Rows of a canonical series whose reference month falls within the window."""
+        if df.empty or "ref_period_start" not in df.columns:
+            return df
+        period = df["ref_period_start"]
+        if pd.api.types.is_datetime64_any_dtype(period):
+            years = period.dt.year
+        else:
+            years = pd.to_numeric(period.astype(str).str[:4], errors="coerce")
+        return df[years.between(int(start_year), int(end_year))].reset_index(drop=True)
+
+    @staticmethod
+    def _project(df: pd.DataFrame, columns: list[str] | None) -> pd.DataFrame:
+        if columns is None or df.empty:
+            return df
+        wanted = [make_snake_from_camel(col) for col in sparqlquery.resolve_columns(columns)]
+        return df[[col for col in wanted if col in df.columns]]
+
+    def _merge_missing_columns(
+        self,
+        file: FileVersion,
+        cached: pd.DataFrame,
+        missing: list[str],
+        region: str,
+    ) -> pd.DataFrame:
+        """Fetches only the columns absent from a cached file and merges them in on the observation URI.
+
+        The merged file keeps the date stamp of the one it replaces: no new months were
+        fetched, so it is exactly as fresh as before.
+        """
+        file_path = file.latest_file_path
+        fetched = self._fetch_hpi(history_start(region), self._history_end(), region, columns=missing)
+        if fetched.empty:
+            return cached
+
+        new_cols = [make_snake_from_camel(col) for col in missing if col != "_about"]
+        fetched = fetched[["_about"] + [col for col in new_cols if col in fetched.columns]]
+        merged = _full_precision(file, cached).merge(
+            fetched.assign(_about=fetched["_about"].astype(str)), on="_about", how="left"
+        )
+
+        return self._write_series(file, merged, region, date=file.date_of(file_path) if file_path else None)
+
+    def _delta_refresh(
+        self,
+        file: FileVersion,
+        cached: pd.DataFrame,
+        region: str,
+        lookback_months: int,
+    ) -> pd.DataFrame:
+        """Refetches only the months from ``lookback_months`` before the newest cached month onward.
+
+        The refetched months replace the cached rows for the same months, and the result
+        is written back as today's version of the file.
+        """
+        latest = pd.to_datetime(cached["ref_period_start"], errors="coerce").max()
+        if pd.isna(latest):
+            return cached
+        since = (latest.to_period("M") - lookback_months).to_timestamp().strftime("%Y-%m-%d")
+
+        known = {make_snake_from_camel(col) for col in sparqlquery.resolve_columns()}
+        columns = [col for col in cached.columns if col in known]
+        query = sparqlquery.build_query_for_region(
+            region, history_start(region), self._history_end(), columns=columns, since=since
+        )
+        fetched = sparqlquery.fetch_sparql_frame(query)
+        if fetched.empty:
+            return cached
+
+        # Legacy CSV series hold the month as text; compare and concatenate as datetimes.
+        cached = _full_precision(file, cached)
+        cached = cached.assign(ref_period_start=pd.to_datetime(cached["ref_period_start"], errors="coerce"))
+        kept = cached[cached["ref_period_start"] < pd.Timestamp(since)]
+        # pandas is deprecating empty frames taking part in a concat's result dtypes.
+        parts = [part for part in (kept, fetched) if not part.empty]
+        merged = pd.concat(parts, ignore_index=True).sort_values("ref_period_start", kind="stable")
+
+        return self._write_series(file, merged, region, check_version=True, changed=fetched)
 
     def fetch_hpi(
         self,
         start_year: str | int,
         end_year: str | int | None = None,
         region: str = "united-kingdom",
+        columns: list[str] | None = None,
+        refresh: bool = False,
+        lookback_months: int = 3,
+        granularity: str = "month",
     ) -> pd.DataFrame:
+        """Returns the HPI series for a region and window.
+
+        Each region is cached once as its full history (see ``history_start``); any
+        window is an in-memory slice of that series, so moving or resizing a window within
+        the cached history never goes back to the endpoint.
+
+        Args:
+            start_year (str | int): First year of the window.
+            end_year (str | int | None): Last year of the window; defaults to ``start_year``.
+            region (str): Region name or slug.
+            columns (list[str] | None): Column subset (snake_case or camelCase). Only those
+                columns, plus the observation keys, are queried and returned. A cached file that
+                lacks some of them is topped up with a partial fetch rather than refetched.
+            refresh (bool): Bring a cached file written before today up to date with a delta
+                query instead of serving it as is. Only months from ``lookback_months`` before the
+                newest cached month onward are refetched and upserted, which also picks up the
+                revisions each monthly release makes to recent figures. A window reaching past the
+                year the file was written triggers the same delta query.
+            lookback_months (int): Months of revision window refetched by a delta refresh.
+            granularity (str): ``"month"`` for the published series, or ``"quarter"`` or
+                ``"year"`` for its roll-up (see ``ukhpi.core.rollups``): mean prices, summed
+                sales volumes and end-of-period indices, one row per period. Roll-ups are
+                materialised in the HPI store and refreshed whenever new months are written.
+
+        Concurrent calls for the same region share a single load, so a cold cache is fetched
+        and written once however many callers race on it.
+
+        Columns come back in the compact dtypes of ``HPI_SCHEMA``: categorical URIs and labels,
+        float32 metrics and int32 sales volumes.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity '{granularity}'; use one of {list(GRANULARITIES)}")
         end_year = end_year if end_year else start_year
-        region_key = region.replace(" ", "-").replace("-", "_").lower()
-        file = FileVersion(
-            base_path=self._data_path,
-            file_name=f"{region_key}_{start_year}_{end_year}_hpi",
-            extension="csv",
+        key = (
+            str(self._data_path),
+            sparqlquery.region_slug(region),
+            int(end_year),
+            tuple(columns) if columns is not None else None,
+            refresh,
+            lookback_months,
         )
+        series = _flights.do(key, self._load_series, region, int(end_year), columns, refresh, lookback_months)
+        if granularity != "month":
+            series = self._rolled_up(region, series, granularity)
+        # The series is shared across callers, so each gets its own copy to mutate.
+        return self._project(self._slice(series, start_year, end_year), columns).copy()
+
+    def _load_series(
+        self,
+        region: str,
+        end_year: int,
+        columns: list[str] | None,
+        refresh: bool,
+        lookback_months: int,
+    ) -> pd.DataFrame:
+        file = self._hpi_file(region)
+
+        # Repeat loads are served from memory without touching disk, unless a refresh is asked
+        # for or the window reaches past the year the cached file was written.
+        hit = FrameCache.shared().lookup(_series_key(file))
+        if hit is not None and not refresh and end_year <= hit[1]:
+            return self._top_up_columns(file, hit[0], region, columns)
 
         file_path = file.latest_file_path
-        if file_path:
-            data = Dataset(file_path=file_path).load_data()
-        else:
-            data = file.load_latest_file(
-                self,
-                "_fetch_hpi",
-                start_year=start_year,
-                end_year=end_year,
-                region=region,
-                check_version=False,
+        if not file_path:
+            fetched = self._fetch_hpi(history_start(region), self._history_end(), region, columns=columns)
+            return self._write_series(file, fetched, region)
+
+        data = _read_series(file, file_path)
+        if not data.empty and "ref_period_start" in data.columns and file.check_version():
+            if refresh or end_year > file.date_of(file_path).year:
+                data = self._delta_refresh(file, data, region, lookback_months)
+        return self._top_up_columns(file, data, region, columns)
+
+    def _top_up_columns(
+        self,
+        file: FileVersion,
+        data: pd.DataFrame,
+        region: str,
+        columns: list[str] | None,
+    ) -> pd.DataFrame:
+        missing = [
+            col
+            for col in sparqlquery.resolve_columns(columns)
+            if col not in sparqlquery.KEY_COLUMNS and make_snake_from_camel(col) not in data.columns
+        ]
+        if missing and not data.empty and "_about" in data.columns:
+            data = self._merge_missing_columns(file, data, missing, region)
+        return data
+
+    def _cached_series(self, region: str) -> pd.DataFrame | None:
+        """A region's canonical series from memory or its cache file, without fetching."""
+        file = self._hpi_file(region)
+        cached = FrameCache.shared().get(_series_key(file))
+        if cached is None and (file_path := file.latest_file_path):
+            cached = _read_series(file, file_path)
+        return cached
+
+    def fetch_hpi_for_regions(
+        self,
+        start_year: str | int,
+        end_year: str | int | None = None,
+        regions: list[str] | None = None,
+        chunk_size: int = 25,
+        refresh: bool = False,
+        lookback_months: int = 3,
+        errors: dict[str, str] | None = None,
+    ) -> dict[str, pd.DataFrame]:
+        """Batched counterpart of ``fetch_hpi``.
+
+        Regions already cached are sliced from their canonical series; the full history of
+        the rest is fetched with one SPARQL query per ``chunk_size`` regions and written to
+        the same per-region cache files ``fetch_hpi`` uses. Regions whose batch failed are
+        missing from the result.
+
+        Args:
+            start_year (str | int): First year of the window.
+            end_year (str | int | None): Last year of the window; defaults to ``start_year``.
+            regions (list[str] | None): Region names or slugs.
+            chunk_size (int): Maximum number of regions bound into a single query.
+            refresh (bool): Bring cached series written before today up to date with a delta
+                query first, as ``fetch_hpi(refresh=True)`` does.
+            lookback_months (int): Months of revision window refetched by a delta refresh.
+            errors (dict[str, str] | None): Filled with the error of each region left out.
+        """
+        end_year = end_year if end_year else start_year
+        frames: dict[str, pd.DataFrame] = {}
+        missing: list[str] = []
+        for region in dict.fromkeys(sparqlquery.region_slug(r) for r in regions or []):
+            cached = self._cached_series(region)
+            if cached is None:
+                missing.append(region)
+                continue
+            if refresh:
+                file = self._hpi_file(region)
+                try:
+                    if not cached.empty and "ref_period_start" in cached.columns and file.check_version():
+                        cached = self._delta_refresh(file, cached, region, lookback_months)
+                except Exception as e:
+                    self._logger.error(f"Delta refresh failed for '{region}': {e}")
+                    if errors is not None:
+                        errors[region] = f"{type(e).__name__}: {e}"
+                    continue
+            frames[region] = self._slice(cached, start_year, end_year)
+
+        # Regions are batched with others whose history starts in the same year.
+        by_start: dict[int, list[str]] = {}
+        for region in missing:
+            by_start.setdefault(history_start(region), []).append(region)
+        for history_from, group in by_start.items():
+            fetched = sparqlquery.fetch_hpi_for_regions(
+                group, history_from, self._history_end(), chunk_size=chunk_size, errors=errors
             )
+            for region, df in fetched.items():
+                series = self._write_series(self._hpi_file(region), df, region)
+                frames[region] = self._slice(series, start_year, end_year)
+        return frames
+
+    def fetch_hpi_frame(
+        self,
+        start_year: str | int,
+        end_year: str | int | None = None,
+        regions: list[str] | None = None,
+        columns: list[str] | None = None,
+        granularity: str = "month",
+    ) -> pd.DataFrame:
+        """The window for many regions as one long frame, read from the HPI store.
+
+        The slice is a single indexed query, whatever the number of regions. Regions the
+        store does not hold yet are upserted first, together with their roll-ups: from their
+        cached series when there is one, otherwise fetched in batches. Stored regions lacking
+        some of the requested columns are topped up as ``fetch_hpi`` does.
+
+        Args:
+            start_year (str | int): First year of the window.
+            end_year (str | int | None): Last year of the window; defaults to ``start_year``.
+            regions (list[str] | None): Region names or slugs.
+            columns (list[str] | None): Column subset (snake_case); all stored columns when None.
+            granularity (str): ``"month"``, ``"quarter"`` or ``"year"``, as for ``fetch_hpi``.
+
+        Returns:
+            pd.DataFrame: One row per region and period, with a ``region`` slug column, in the
+            compact dtypes of ``HPI_SCHEMA``.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity '{granularity}'; use one of {list(GRANULARITIES)}")
+        end_year = end_year if end_year else start_year
+        store = HpiStore.shared()
+        table = HpiStore.TABLE if granularity == "month" else rollup_table(granularity)
+        slugs = list(dict.fromkeys(sparqlquery.region_slug(r) for r in regions or []))
+        hpi_columns = None if columns is None else [c for c in columns if c in HPI_SCHEMA and c != "region"]
+        wanted = {
+            make_snake_from_camel(col)
+            for col in sparqlquery.resolve_columns(hpi_columns)
+            if col not in sparqlquery.KEY_COLUMNS
+        }
+
+        filled = store.filled_columns(slugs, columns=sorted(wanted))
+        cold = []
+        for region in (r for r in slugs if r not in filled):
+            series = self._cached_series(region)
+            if series is None:
+                cold.append(region)
+                continue
+            # Series cached before the store existed are backfilled from their files.
+            store.upsert(series, region=region)
+            self._refresh_rollups(store, region, series)
+            filled[region] = set(series.columns)
+        if cold:
+            # _write_series upserts the fetched series and their roll-ups.
+            for region, df in self.fetch_hpi_for_regions(HISTORY_START_YEAR, self._history_end(), cold).items():
+                filled[region] = set(df.columns)
+
+        # A region first fetched with a column subset only holds those columns; the ones it lacks
+        # are merged into its series, which writes them through to the store. Columns the
+        # store holds no values for, but the series already carries, cost a lookup and no fetch.
+        incomplete = [region for region, stored in filled.items() if not wanted <= stored]
+        for region in incomplete:
+            self._load_series(region, int(end_year), hpi_columns, refresh=False, lookback_months=3)
+        if granularity != "month":
+            rolled = set(store.regions(table))
+            for region in (r for r in filled if r not in rolled):
+                if (series := self._cached_series(region)) is not None:
+                    self._refresh_rollups(store, region, series)
 
-        return pd.DataFrame(data)
+        frame = store.query(regions=slugs, start=start_year, end=end_year, columns=columns, table=table)
+        schema = HPI_SCHEMA if granularity == "month" else ROLLUP_SCHEMA
+        return apply_schema(frame, schema, label=f"{table}[{len(slugs)} regions]")
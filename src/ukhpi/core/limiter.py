@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from ukhpi.loggers import BasicLogger
+
+
+class AdaptiveLimiter:
+    """Process-wide token bucket plus AIMD concurrency limit for upstream requests.
+
+    Every request attempt takes a token (capping the sustained request rate) and an
+    in-flight slot (capping concurrency). The concurrency limit grows by roughly one
+    slot per round of healthy responses and halves on throttling (429/503), other 5xx
+    or timeouts, at most once per ``decrease_cooldown`` seconds so one burst of errors
+    does not collapse it. Responses much slower than the best latency seen hold the
+    limit steady instead of growing it.
+    """
+
+    OUTCOMES = ("ok", "throttled", "error")
+
+    _shared: AdaptiveLimiter | None = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        rate: float = 20.0,
+        burst: int = 20,
+        latency_tolerance: float = 3.0,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.rate = rate
+        self.burst = burst
+        self.latency_tolerance = latency_tolerance
+        self.decrease_cooldown = decrease_cooldown
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._decreased_at = float("-inf")
+        self._in_flight = 0
+        self._waiting = 0
+        self._min_latency: float | None = None
+        self._ewma_latency: float | None = None
+        self._counts = dict.fromkeys(self.OUTCOMES, 0)
+        self._cond = threading.Condition()
+        self._logger = BasicLogger(logger_name="ADAPTIVE_LIMITER", verbose=False, log_directory=None)
+
+    @classmethod
+    def shared(cls) -> AdaptiveLimiter:
+        """Process-wide limiter, so collection runs, PPI pipelines and the dashboard pace each other."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def acquire(self) -> float:
+        """Blocks until a token and an in-flight slot are available.
+
+        Returns:
+            float: The start time to hand back to ``release``.
+        """
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._in_flight < int(self._limit) and self._tokens >= 1:
+                        self._tokens -= 1
+                        self._in_flight += 1
+                        return now
+                    # Wake when the next token is due; releases notify earlier.
+                    wait = (1 - self._tokens) / self.rate if self._tokens < 1 else None
+                    self._cond.wait(wait)
+            finally:
+                self._waiting -= 1
+
+    def release(self, started: float, outcome: str = "ok") -> None:
+        """Frees the slot taken by ``acquire`` and adapts the limit to the attempt's ``outcome``."""
+        if outcome not in self.OUTCOMES:
+            raise ValueError(f"outcome must be one of {self.OUTCOMES}. Got '{outcome}'.")
+        now = time.monotonic()
+        latency = now - started
+        with self._cond:
+            self._in_flight -= 1
+            self._counts[outcome] += 1
+            if outcome == "ok":
+                self._min_latency = latency if self._min_latency is None else min(self._min_latency, latency)
+                self._ewma_latency = latency if self._ewma_latency is None else 0.8 * self._ewma_latency + 0.2 * latency
+                if self._ewma_latency <= self.latency_tolerance * max(self._min_latency, 1e-3):
+                    self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            elif now - self._decreased_at >= self.decrease_cooldown:
+                self._limit = max(self.min_limit, self._limit / 2)
+                self._decreased_at = now
+                self._logger.debug(f"Backing off after '{outcome}'; concurrency limit is now {int(self._limit)}")
+            self._cond.notify_all()
+
+    @property
+    def limit(self) -> int:
+        with self._cond:
+            return int(self._limit)
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Current limit, in-flight requests, queue depth and outcome counters."""
+        with self._cond:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "queue_depth": self._waiting,
+                "ok": self._counts["ok"],
+                "throttled": self._counts["throttled"],
+                "errors": self._counts["error"],
+                "latency_ewma": round(self._ewma_latency or 0.0, 4),
+            }
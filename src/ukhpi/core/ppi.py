@@ -3,6 +3,7 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from ukhpi.core.schema import PPI_SCHEMA, apply_schema
 from ukhpi.core.sparql import SparqlQuery
 from ukhpi.plotting.categories import cat_plots, go
 from ukhpi.plotting.theme import make_subplots, px
@@ -12,15 +13,28 @@ sparq = SparqlQuery()
 
 class PricePaidData:
     def __init__(self, postcode: str):
+        """
+        Args:
+            postcode (str): A unit postcode ("HP20 1AA"), a postcode sector ("HP20 1") or a
+                postcode district ("HP20").
+        """
         self._postcode = postcode
         self._postcode_df = pd.DataFrame()
         self._cleaned_df = pd.DataFrame()
-        pass
 
     @property
     def data_for_postcode(self):
         if self._postcode_df.empty:
-            self._postcode_df = sparq.get_price_paid_data_for_postcode(self._postcode)
+            try:
+                scope, _ = sparq.postcode_scope(self._postcode)
+            except ValueError:
+                scope = "unit"
+            if scope == "unit":
+                df = sparq.get_price_paid_data_for_postcode(self._postcode)
+            else:
+                df = sparq.get_price_paid_data_for_scope(self._postcode)
+            # Cached rows are read back as text; labels become categoricals, prices int32.
+            self._postcode_df = apply_schema(df, PPI_SCHEMA, label=f"price_paid[{self._postcode}]")
         return self._postcode_df
 
     def clean_df(self) -> pd.DataFrame:
@@ -132,6 +146,7 @@ class PricePaidDataPlots(PricePaidData):
             .drop_duplicates(subset="address")["property_type"]
             # .groupby("address")["property_type"]
             .value_counts()
+            .loc[lambda counts: counts > 0]
             .reset_index()
         )
 
@@ -218,7 +233,7 @@ class PricePaidDataPlots(PricePaidData):
 
         grouped = (
             df.dropna(subset=["amount", "property_type"])
-            .groupby("property_type")["amount"]
+            .groupby("property_type", observed=True)["amount"]
             .agg(median="median", count="count")
             .reset_index()
             .sort_values("median", ascending=False)
@@ -248,7 +263,9 @@ class PricePaidDataPlots(PricePaidData):
             return fig.update_layout(title=dict(text="<b>TENURE MIX</b>", x=0.5))
 
         tenure = df.dropna(subset=["estate_type"])
-        grouped = tenure.groupby("estate_type")["amount"].agg(count="count", median="median").reset_index()
+        grouped = (
+            tenure.groupby("estate_type", observed=True)["amount"].agg(count="count", median="median").reset_index()
+        )
         fig = make_subplots(
             rows=1,
             cols=2,
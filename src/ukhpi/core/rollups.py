@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from ukhpi.core.schema import HPI_SCHEMA
+
+# Period frequency of each coarse granularity; "month" is the published series itself.
+GRANULARITIES = {"month": None, "quarter": "Q", "year": "Y"}
+
+# How each metric family aggregates over a period, matched on column prefix: prices are
+# averaged, sales volumes summed, and indices and annual changes taken at the end of the
+# period. Monthly percentage changes compound into the change over the period.
+ROLLUP_RULES = {
+    "average_price": "mean",
+    "sales_volume": "sum",
+    "house_price_index": "last",
+    "percentage_annual_change": "last",
+    "percentage_change": "compound",
+}
+
+# Columns describing the region, carried over from the period's first month.
+_LABEL_COLUMNS = ["ref_region", "region", "data_set", "type"]
+
+ROLLUP_SCHEMA = HPI_SCHEMA | {"period_months": "int"}
+
+
+def rollup_table(granularity: str) -> str:
+    """HPI store table holding the materialised roll-ups of ``granularity``."""
+    if GRANULARITIES.get(granularity) is None:
+        raise ValueError(f"Unsupported roll-up granularity '{granularity}'; use one of 'quarter', 'year'")
+    return f"hpi_{granularity}"
+
+
+def rollup_rule(column: str) -> str | None:
+    return next((rule for prefix, rule in ROLLUP_RULES.items() if column.startswith(prefix)), None)
+
+
+def period_start(month: pd.Timestamp, granularity: str) -> pd.Timestamp:
+    """First day of the ``granularity`` period containing ``month``."""
+    rollup_table(granularity)
+    return month.to_period(GRANULARITIES[granularity]).start_time
+
+
+def roll_up(df: pd.DataFrame, granularity: str, since: pd.Timestamp | None = None) -> pd.DataFrame:
+    """Aggregates a region's monthly series into quarterly or annual rows.
+
+    Every column with a ``ROLLUP_RULES`` prefix is aggregated by its rule; other metrics
+    and the observation URIs are dropped. Each row is keyed by the first day of its period
+    in ``ref_period_start``, labelled ``2024Q1`` or ``2024`` in ``ref_month``, and counts
+    the months it covers in ``period_months``, so a period still in progress can be told
+    apart.
+
+    Args:
+        df (pd.DataFrame): Monthly rows of one region.
+        granularity (str): ``"quarter"`` or ``"year"``.
+        since (pd.Timestamp | None): Only roll up the periods from the one containing this
+            month onward, for an incremental refresh after new months land.
+
+    Returns:
+        pd.DataFrame: One row per period, in period order.
+    """
+    freq = GRANULARITIES.get(granularity)
+    if freq is None:
+        raise ValueError(f"Unsupported roll-up granularity '{granularity}'; use one of 'quarter', 'year'")
+    if df.empty or "ref_period_start" not in df.columns:
+        return pd.DataFrame(columns=["ref_period_start", "ref_month", "period_months"])
+
+    months = pd.to_datetime(df["ref_period_start"], errors="coerce")
+    keep = months.notna()
+    if since is not None:
+        keep &= months >= period_start(pd.Timestamp(since), granularity)
+    df, months = df[keep], months[keep]
+    periods = months.dt.to_period(freq).rename("period")
+
+    by_rule: dict[str, list[str]] = {}
+    for col in df.columns:
+        if (rule := rollup_rule(col)) is not None and pd.api.types.is_numeric_dtype(df[col]):
+            by_rule.setdefault(rule, []).append(col)
+
+    # Ordered by month so "last" is the end of the period.
+    order = np.argsort(months.to_numpy(), kind="stable")
+    df, periods = df.iloc[order], periods.iloc[order]
+    grouped = df.groupby(periods, sort=True)
+    parts = [grouped.size().rename("period_months")]
+    labels = [col for col in _LABEL_COLUMNS if col in df.columns]
+    if labels:
+        parts.append(grouped[labels].first())
+    if cols := by_rule.get("mean"):
+        parts.append(grouped[cols].mean())
+    if cols := by_rule.get("sum"):
+        parts.append(grouped[cols].sum(min_count=1))
+    if cols := by_rule.get("last"):
+        parts.append(grouped[cols].last())
+    if cols := by_rule.get("compound"):
+        growth = np.log1p(df[cols].astype(np.float64) / 100.0).groupby(periods, sort=True).sum(min_count=1)
+        parts.append(np.expm1(growth) * 100.0)
+
+    out = pd.concat(parts, axis=1)
+    index = out.index
+    out = out.reset_index(drop=True)
+    out.insert(0, "ref_month", [str(p) for p in index])
+    out.insert(0, "ref_period_start", index.start_time)
+    return out
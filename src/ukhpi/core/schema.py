@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from ukhpi.core.decoding import hpi_column_kind
+from ukhpi.core.sparql import SparqlQuery
+from ukhpi.loggers import BasicLogger
+from ukhpi.text import make_snake_from_camel
+
+# Declared kinds of the columns of HPI frames, keyed by their snake_case names. ``region`` is
+# the slug column of frames read from the HPI store. Observation URIs (``_about``) are unique
+# per row, where categorical codes cost more than they save, so they are left as loaded.
+HPI_SCHEMA = {make_snake_from_camel(col): hpi_column_kind(col) for col in SparqlQuery._COLUMNS if col != "_about"}
+HPI_SCHEMA["region"] = "uri"
+
+# Price paid frames. House numbers (``paon``/``saon``) are left as they are: cleaning tries
+# them as integers and falls back to text. Transaction URIs and ids are unique per row, so
+# categorical codes would not save anything on them.
+PPI_SCHEMA = {
+    "addr": "uri",
+    "postcode": "label",
+    "street": "label",
+    "town": "label",
+    "county": "label",
+    "category": "label",
+    "record_status": "label",
+    "property_type": "label",
+    "estate_type": "label",
+    "amount": "int",
+    "date": "date",
+}
+
+_INT32 = np.iinfo(np.int32)
+# float32 holds every integer up to this magnitude exactly.
+_FLOAT32_EXACT = 2**24
+
+_logger = BasicLogger(logger_name="FRAME_SCHEMA", verbose=False, log_directory=None)
+
+
+def _compact_int(values: pd.Series) -> pd.Series:
+    """int32 when every value is present and fits; counts with gaps become float32."""
+    finite = values.dropna()
+    largest = float(finite.abs().max()) if not finite.empty else 0.0
+    if len(finite) < len(values):
+        return values.astype(np.float32 if largest < _FLOAT32_EXACT else np.float64)
+    if largest <= _INT32.max and (finite % 1 == 0).all():
+        return values.astype(np.int32)
+    return values
+
+
+def compact_column(series: pd.Series, kind: str | None, float_dtype: type = np.float32) -> pd.Series:
+    """Casts one column to the compact dtype of its declared kind.
+
+    URIs and labels become categoricals, dates ``datetime64``, floats ``float_dtype`` and
+    counts int32. Unknown kinds are returned unchanged.
+    """
+    if kind in ("uri", "label", "str"):
+        return series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype("category")
+    if kind == "date":
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        return pd.to_datetime(series, errors="coerce", format="ISO8601")
+    if kind not in ("float", "int"):
+        return series
+
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series
+    else:
+        values = pd.to_numeric(series, errors="coerce")
+    if kind == "float":
+        return values.astype(float_dtype)
+    return _compact_int(values)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Per-column dtypes and deep byte sizes of a frame before and after compaction.
+
+    Returns:
+        pd.DataFrame: One row per column of ``after`` plus a ``total`` row, with ``dtype_before``,
+        ``dtype_after``, ``bytes_before``, ``bytes_after`` and ``bytes_saved`` columns.
+    """
+    bytes_before = before.memory_usage(deep=True, index=False)
+    bytes_after = after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame(
+        {
+            "dtype_before": before.dtypes.astype(str),
+            "dtype_after": after.dtypes.astype(str),
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+        }
+    ).reindex(after.columns)
+    report.loc["total"] = ["", "", bytes_before.sum(), bytes_after.sum()]
+    report[["bytes_before", "bytes_after"]] = report[["bytes_before", "bytes_after"]].fillna(0).astype(np.int64)
+    return report.assign(bytes_saved=report["bytes_before"] - report["bytes_after"])
+
+
+def apply_schema(
+    df: pd.DataFrame, schema: dict[str, str], label: str | None = None, float_dtype: type = np.float32
+) -> pd.DataFrame:
+    """Casts the columns of ``df`` declared in ``schema`` to their compact dtypes.
+
+    Columns the schema does not name are left untouched. When debug logging is enabled
+    for the ``FRAME_SCHEMA`` logger, the bytes saved on each ``label``-ed frame are logged.
+
+    Args:
+        df (pd.DataFrame): Frame as loaded or fetched.
+        schema (dict[str, str]): Column kinds, such as ``HPI_SCHEMA`` or ``PPI_SCHEMA``.
+        label (str | None): Name of the frame in the log.
+        float_dtype (type): dtype of float columns. float32 halves them in memory but keeps
+            only about seven significant digits, so frames written to disk pass ``np.float64``.
+
+    Returns:
+        pd.DataFrame: A new frame; ``df`` itself is not modified.
+    """
+    columns = {col: compact_column(df[col], schema[col], float_dtype) for col in df.columns if col in schema}
+    if not columns:
+        return df
+    compacted = df.assign(**columns)
+    if label and _logger.logger.isEnabledFor(logging.DEBUG):
+        total = memory_report(df, compacted).loc["total"]
+        _logger.debug(
+            f"{label}: {total['bytes_before']:,} -> {total['bytes_after']:,} bytes ({total['bytes_saved']:,} saved)"
+        )
+    return compacted
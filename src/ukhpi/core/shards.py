@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+
+from ukhpi.core.breaker import CircuitOpenError
+from ukhpi.core.transport import TransportError
+from ukhpi.loggers import BasicLogger
+
+# Failures worth retrying shard by shard; anything else (bad query, decode error) fails fast,
+# as does an open circuit, which would only reject the retries too.
+TRANSIENT_ERRORS = (TransportError, requests.RequestException)
+
+Shard = tuple[int, int]
+
+
+class ShardFetchError(Exception):
+    """Raised when one or more shards still fail after their retries."""
+
+    def __init__(self, failed: dict[Shard, Exception]):
+        self.failed = failed
+        spans = ", ".join(f"{start}-{end}" for start, end in failed)
+        super().__init__(f"{len(failed)} shard(s) failed: {spans}")
+
+
+def plan_year_shards(start_year: int, end_year: int, years_per_shard: int | None = 5) -> list[Shard]:
+    """Splits an inclusive year window into consecutive ``(start, end)`` shards.
+
+    Args:
+        start_year (int): First year of the window.
+        end_year (int): Last year of the window.
+        years_per_shard (int | None): Years covered by each shard; the whole window is a
+            single shard when None.
+
+    Returns:
+        list[Shard]: Shards in chronological order; the last one may be shorter.
+    """
+    start_year, end_year = int(start_year), int(end_year)
+    if end_year < start_year:
+        raise ValueError(f"end_year ({end_year}) is before start_year ({start_year})")
+    if not years_per_shard or years_per_shard < 1:
+        return [(start_year, end_year)]
+    return [
+        (year, min(year + years_per_shard - 1, end_year)) for year in range(start_year, end_year + 1, years_per_shard)
+    ]
+
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenates partial result frames, restoring one categorical per URI column."""
+    if len(frames) == 1:
+        return frames[0]
+    df = pd.concat(frames, ignore_index=True)
+    # Each frame carries its own categories, which pandas widens to object on concat.
+    for col in frames[0].select_dtypes("category").columns:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def fetch_shards(
+    fetch: Callable[[int, int], pd.DataFrame],
+    shards: list[Shard],
+    max_workers: int = 4,
+    max_retries: int = 2,
+    backoff_factor: float = 1.0,
+    logger: BasicLogger | None = None,
+) -> pd.DataFrame:
+    """Fetches every shard concurrently and reassembles them in shard order.
+
+    Each shard is retried on its own after a transient failure, so a timeout costs one
+    shard rather than the whole window. An open circuit is not retried. Every shard is
+    attempted before any error is raised, which lets the successful ones land in the query
+    cache for the next run.
+
+    Args:
+        fetch (Callable[[int, int], pd.DataFrame]): Fetches one ``(start, end)`` shard.
+        shards (list[Shard]): Shards as returned by ``plan_year_shards``.
+        max_workers (int): Maximum number of shards in flight at once.
+        max_retries (int): Extra attempts per shard after a transient failure.
+        backoff_factor (float): Base of the exponential delay between attempts, in seconds.
+        logger (BasicLogger | None): Logger for retry and failure messages.
+
+    Returns:
+        pd.DataFrame: The shard frames concatenated in chronological order.
+
+    Raises:
+        ShardFetchError: If any shard still fails after its retries.
+    """
+
+    def run(shard: Shard) -> pd.DataFrame:
+        for attempt in range(max_retries + 1):
+            try:
+                return fetch(*shard)
+            except CircuitOpenError:
+                raise
+            except TRANSIENT_ERRORS as e:
+                if attempt == max_retries:
+                    raise
+                if logger:
+                    logger.debug(f"Shard {shard[0]}-{shard[1]} attempt {attempt + 1} failed: {e}")
+                time.sleep(backoff_factor * (2**attempt))
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    if len(shards) == 1:
+        try:
+            return run(shards[0])
+        except Exception as e:
+            raise ShardFetchError({shards[0]: e}) from e
+
+    results: dict[Shard, pd.DataFrame] = {}
+    failed: dict[Shard, Exception] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(shards)))) as executor:
+        futures = {shard: executor.submit(run, shard) for shard in shards}
+        for shard, future in futures.items():
+            try:
+                results[shard] = future.result()
+            except Exception as e:
+                if logger:
+                    logger.error(f"Shard {shard[0]}-{shard[1]} failed: {e}")
+                failed[shard] = e
+    if failed:
+        raise ShardFetchError(failed)
+    return concat_frames([results[shard] for shard in shards])
@@ -1,17 +1,41 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import json
+import re
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
 import pandas as pd
-from SPARQLWrapper import JSON, SPARQLWrapper
 
+from ukhpi.core.breaker import CircuitBreaker
+from ukhpi.core.catalog import REGION_CACHE_PATH, RegionCatalog
+from ukhpi.core.decoding import (
+    ColumnarDecoder,
+    decode_delimited_results,
+    hpi_column_kind,
+    iter_delimited_results,
+)
+from ukhpi.core.limiter import AdaptiveLimiter
+from ukhpi.core.shards import concat_frames, fetch_shards, plan_year_shards
+from ukhpi.core.singleflight import SingleFlight
+from ukhpi.core.streaming import iter_sparql_json, open_chunks
+from ukhpi.core.transport import HttpTransport
 from ukhpi.io.loader import Dataset
+from ukhpi.io.query_cache import QueryCache
 from ukhpi.io.versioning import FileVersion
+from ukhpi.io.writer import WriteFile
 from ukhpi.loggers import BasicLogger
 from ukhpi.text import make_snake_from_camel
 
 _PACKAGE_DIR = Path(__file__).resolve().parent.parent
+LIVE_ENDPOINT = "http://landregistry.data.gov.uk/landregistry/query"
 
 
 class SparqlQuery:
@@ -76,24 +100,164 @@ class SparqlQuery:
         "type",
     ]
 
+    # Declared value kinds for every variable the project queries; anything else falls
+    # back to the datatype annotations carried by the bindings.
+    _SCHEMA = {col: hpi_column_kind(col) for col in _COLUMNS} | {
+        "regionLabel": "str",
+        "regionType": "uri",
+        "transx": "uri",
+        "addr": "uri",
+        "amount": "int",
+        "date": "date",
+    }
+
+    # Accept headers for the supported result formats. CSV and TSV result sets are much
+    # smaller than SPARQL JSON and are parsed by pandas' native CSV reader.
+    RESULT_FORMATS = {
+        "json": "application/sparql-results+json",
+        "csv": "text/csv",
+        "tsv": "text/tab-separated-values",
+    }
+
+    _REGION_URI = "http://landregistry.data.gov.uk/id/region/"
+
     # SELECT line
     _SELECT_CLAUSE = "SELECT DISTINCT\n  " + "\n  ".join(f"?{col}" for col in _COLUMNS)
 
     # OPTIONAL lines
     _OPTIONAL_CLAUSE = "\n".join(f"  OPTIONAL {{ ?_about ukhpi:{col} ?{col} }}" for col in _COLUMNS if col != "_about")
 
-    def __init__(self, endpoint_url: str = "http://landregistry.data.gov.uk/landregistry/query", verbose: bool = False):
+    # Identify an observation; always selected, whatever column subset is requested.
+    KEY_COLUMNS = ["_about", "refMonth", "refPeriodStart", "refRegion"]
+
+    _SNAKE_TO_COLUMN = {make_snake_from_camel(col): col for col in _COLUMNS}
+
+    _POSTCODE_SCOPES = {
+        "unit": re.compile(r"[A-Z]{1,2}\d[A-Z\d]? \d[A-Z]{2}"),
+        "sector": re.compile(r"[A-Z]{1,2}\d[A-Z\d]? \d"),
+        "district": re.compile(r"[A-Z]{1,2}\d[A-Z\d]?"),
+    }
+
+    # Concurrent identical requests, across every instance, share one upstream round trip.
+    _flights = SingleFlight()
+
+    # Background refreshes of stale cache entries, deduplicated by cache key.
+    _revalidator: ThreadPoolExecutor | None = None
+    _revalidating: set[str] = set()
+    _revalidate_lock = threading.Lock()
+
+    # HPI regions are served from a local, versioned catalog shared by every instance.
+    # One region catalog per endpoint, shared by every instance that queries it.
+    _region_catalogs: dict[str, RegionCatalog] = {}
+    _region_catalog_lock = threading.Lock()
+
+    def __init__(
+        self,
+        endpoint_url: str = LIVE_ENDPOINT,
+        verbose: bool = False,
+        transport: HttpTransport | None = None,
+        timeout: float | tuple[float, float] | None = None,
+        stream_results: bool = False,
+        stream_chunk_size: int = 50_000,
+        cache: QueryCache | None = None,
+        use_cache: bool = True,
+        result_format: str = "json",
+        years_per_shard: int | None = 5,
+        shard_workers: int = 4,
+        shard_retries: int = 2,
+        limiter: AdaptiveLimiter | None = None,
+        breaker: CircuitBreaker | None = None,
+        stale_while_revalidate: bool = False,
+    ):
         """
         Initializes the SparqlQuery object.
 
+        Args:
+            endpoint_url (str): SPARQL endpoint to query.
+            verbose (bool): Log every query before it is sent.
+            transport (HttpTransport | None): HTTP transport to send queries through. Defaults to the
+                process-wide pooled transport so connections are reused across instances and threads.
+            timeout (float | tuple[float, float] | None): Per-request (connect, read) timeout overriding
+                the transport default.
+            stream_results (bool): Parse result sets incrementally off the socket instead of loading the
+                whole JSON document, keeping peak memory bounded by ``stream_chunk_size`` rows.
+            stream_chunk_size (int): Rows decoded per partial frame in streaming mode.
+            cache (QueryCache | None): Raw-response cache consulted before every request. Defaults to the
+                process-wide cache under ``cache/sparql_data``.
+            use_cache (bool): Set to False to always go to the endpoint.
+            result_format (str): Wire format for ``fetch_sparql_frame`` and ``iter_sparql_frames``: "json",
+                "csv" or "tsv". All three produce the same DataFrame contract.
+            years_per_shard (int | None): HPI windows longer than this are split into year shards that
+                are fetched concurrently; None sends every window as a single query.
+            shard_workers (int): Maximum number of shards of one window in flight at once.
+            shard_retries (int): Extra attempts for a shard after a transient failure.
+            limiter (AdaptiveLimiter | None): Rate and concurrency limiter every request attempt goes
+                through. Defaults to the process-wide limiter shared by all callers of the endpoint.
+            breaker (CircuitBreaker | None): Circuit breaker that rejects requests straight away while the
+                endpoint keeps failing. Defaults to the process-wide breaker.
+            stale_while_revalidate (bool): Serve a cached response that has outlived the cache TTL at once
+                and refresh it in the background, instead of blocking on the endpoint.
         """
+        if result_format not in self.RESULT_FORMATS:
+            raise ValueError(f"result_format must be one of {list(self.RESULT_FORMATS)}. Got '{result_format}'.")
         self.endpoint_url = endpoint_url
         self.verbose = verbose
-        self._hpi_regions = None
+        self.transport = transport or HttpTransport.shared()
+        self.limiter = limiter or AdaptiveLimiter.shared()
+        self.breaker = breaker or CircuitBreaker.shared()
+        self.stale_while_revalidate = stale_while_revalidate
+        self.timeout = timeout
+        self.stream_results = stream_results
+        self.stream_chunk_size = stream_chunk_size
+        self.use_cache = use_cache
+        self.result_format = result_format
+        self.years_per_shard = years_per_shard
+        self.shard_workers = shard_workers
+        self.shard_retries = shard_retries
+        self._cache = cache
         self._logger = BasicLogger(logger_name="SPARQLQUERY", verbose=False, log_directory=None)
 
-    def build_query_for_region(self, region: str = None, start_year: int = 2020, end_year: int = 2024) -> str:
-        start_year_str = f"{start_year}-01-01"
+    @classmethod
+    def resolve_columns(cls, columns: list[str] | None = None) -> list[str]:
+        """Maps a column subset (snake_case or camelCase) onto ``_COLUMNS`` names, keys included.
+
+        Returns every column when ``columns`` is None.
+        """
+        if columns is None:
+            return list(cls._COLUMNS)
+        wanted = set(cls.KEY_COLUMNS)
+        for col in columns:
+            name = cls._SNAKE_TO_COLUMN.get(col, col)
+            if name not in cls._COLUMNS:
+                raise ValueError(f"Unknown HPI column '{col}'. Supported columns are {sorted(cls._SNAKE_TO_COLUMN)}")
+            wanted.add(name)
+        return [col for col in cls._COLUMNS if col in wanted]
+
+    @classmethod
+    def _projection_clauses(cls, columns: list[str] | None = None) -> tuple[str, str]:
+        if columns is None:
+            return cls._SELECT_CLAUSE, cls._OPTIONAL_CLAUSE
+        resolved = cls.resolve_columns(columns)
+        select = "SELECT DISTINCT\n  " + "\n  ".join(f"?{col}" for col in resolved)
+        optional = "\n".join(f"  OPTIONAL {{ ?_about ukhpi:{col} ?{col} }}" for col in resolved if col != "_about")
+        return select, optional
+
+    def build_query_for_region(
+        self,
+        region: str = None,
+        start_year: int = 2020,
+        end_year: int = 2024,
+        columns: list[str] | None = None,
+        since: str | None = None,
+    ) -> str:
+        """Builds the HPI query for one region.
+
+        Only the OPTIONAL joins for ``columns`` (plus the observation keys) are generated,
+        so query time and payload scale with what is actually needed. ``since`` (an ISO
+        date) raises the lower bound of the window to that month, for delta refreshes.
+        """
+        select_clause, optional_clause = self._projection_clauses(columns)
+        start_year_str = max(f"{start_year}-01-01", since or "")
         end_year_str = f"{end_year}-12-01"
 
         FILTER_CLAUSE = f"""
@@ -102,33 +266,215 @@ class SparqlQuery:
                     )
         """
         if region:
-            region_lower = region.lower().replace(" ", "-")
+            region_lower = self.region_slug(region)
             FILTER_CLAUSE = f"""
         FILTER ( ?refPeriodStart >= "{start_year_str}"^^xsd:date  &&
                      ?refPeriodStart <= "{end_year_str}"^^xsd:date &&
-                     ?refRegion IN (<http://landregistry.data.gov.uk/id/region/{region_lower}>)
+                     ?refRegion IN (<{self._REGION_URI}{region_lower}>)
                     )
         """
 
         query = f"""
-            {self._SELECT_CLAUSE}
+            {select_clause}
             WHERE {{
             ?_about ukhpi:refPeriodStart ?refPeriodStart .
 
-            {self._OPTIONAL_CLAUSE}
+            {optional_clause}
 
             {FILTER_CLAUSE}
 
             }}"""
         return query
 
+    @staticmethod
+    def region_slug(region: str) -> str:
+        return region.lower().replace(" ", "-")
+
+    def build_query_for_regions(
+        self,
+        regions: list[str],
+        start_year: int = 2020,
+        end_year: int = 2024,
+        columns: list[str] | None = None,
+    ) -> str:
+        """Builds one HPI query covering several regions, bound through a ``VALUES`` block."""
+        select_clause, optional_clause = self._projection_clauses(columns)
+        start_year_str = f"{start_year}-01-01"
+        end_year_str = f"{end_year}-12-01"
+        values = "\n                ".join(f"<{self._REGION_URI}{self.region_slug(r)}>" for r in regions)
+
+        query = f"""
+            {select_clause}
+            WHERE {{
+            VALUES ?refRegion {{
+                {values}
+            }}
+            ?_about ukhpi:refRegion ?refRegion ;
+                    ukhpi:refPeriodStart ?refPeriodStart .
+
+            {optional_clause}
+
+            FILTER ( ?refPeriodStart >= "{start_year_str}"^^xsd:date  &&
+                     ?refPeriodStart <= "{end_year_str}"^^xsd:date
+                    )
+
+            }}"""
+        return query
+
+    def fetch_window(self, build_query: Callable[[int, int], str], start_year: int, end_year: int) -> pd.DataFrame:
+        """Fetches a year window as ``years_per_shard`` shards and reassembles them in order.
+
+        Args:
+            build_query (Callable[[int, int], str]): Builds the query for one ``(start, end)`` shard.
+            start_year (int): First year of the window.
+            end_year (int): Last year of the window.
+
+        Raises:
+            ShardFetchError: If a shard still fails after ``shard_retries`` retries.
+        """
+        return fetch_shards(
+            lambda start, end: self.fetch_sparql_frame(build_query(start, end)),
+            plan_year_shards(start_year, end_year, self.years_per_shard),
+            max_workers=self.shard_workers,
+            max_retries=self.shard_retries,
+            logger=self._logger,
+        )
+
+    def fetch_hpi_for_region(
+        self,
+        region: str,
+        start_year: int = 2020,
+        end_year: int = 2024,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Fetches one region's HPI series, sharding long windows by year."""
+        return self.fetch_window(
+            lambda start, end: self.build_query_for_region(region, start, end, columns=columns),
+            start_year,
+            end_year,
+        )
+
+    def fetch_hpi_for_regions(
+        self,
+        regions: list[str],
+        start_year: int = 2020,
+        end_year: int = 2024,
+        chunk_size: int = 25,
+        columns: list[str] | None = None,
+        errors: dict[str, str] | None = None,
+    ) -> dict[str, pd.DataFrame]:
+        """Fetches HPI data for many regions with one query per ``chunk_size`` regions.
+
+        Long windows are additionally split into year shards (see ``fetch_window``).
+
+        Args:
+            regions (list[str]): Region names or slugs.
+            start_year (int): First year of the window.
+            end_year (int): Last year of the window.
+            chunk_size (int): Maximum number of regions bound into a single query.
+            columns (list[str] | None): Column subset to project; every column when None.
+            errors (dict[str, str] | None): Filled with the error of each region whose chunk failed.
+
+        Returns:
+            dict[str, pd.DataFrame]: Per-region frames keyed by region slug. Regions whose chunk
+            failed are left out, so callers can tell them apart from regions with no data.
+        """
+        slugs = list(dict.fromkeys(self.region_slug(r) for r in regions))
+        frames: dict[str, pd.DataFrame] = {}
+        for i in range(0, len(slugs), max(chunk_size, 1)):
+            chunk = slugs[i : i + max(chunk_size, 1)]
+            try:
+                df = self.fetch_window(
+                    lambda start, end, chunk=chunk: self.build_query_for_regions(chunk, start, end, columns=columns),
+                    start_year,
+                    end_year,
+                )
+            except Exception as e:
+                self._logger.error(f"Batched HPI fetch failed for {len(chunk)} regions: {e}")
+                if errors is not None:
+                    errors.update(dict.fromkeys(chunk, f"{type(e).__name__}: {e}"))
+                continue
+            frames.update(self.split_by_region(df, chunk))
+        return frames
+
+    @classmethod
+    def split_by_region(cls, df: pd.DataFrame, regions: list[str]) -> dict[str, pd.DataFrame]:
+        """Splits a combined multi-region result into one frame per region slug."""
+        if df.empty or "ref_region" not in df.columns:
+            return {slug: df.iloc[0:0].copy() for slug in regions}
+
+        keys = df["ref_region"].astype(str).str.rsplit("/", n=1).str[-1]
+        grouped = {slug: group.reset_index(drop=True) for slug, group in df.groupby(keys, sort=False)}
+        return {slug: grouped.get(slug, df.iloc[0:0].copy()) for slug in regions}
+
     def build_query_for_postcode(self, postcode: str) -> str:
-        postcode = postcode.upper()
+        return self.build_query_for_postcodes([postcode])
+
+    @staticmethod
+    def normalize_postcode(postcode: str) -> str:
+        return " ".join(postcode.upper().split())
+
+    @classmethod
+    def postcode_scope(cls, value: str) -> tuple[str, str]:
+        """Classifies ``value`` as a unit postcode, sector ("HP20 1") or district ("HP20").
+
+        Returns:
+            tuple[str, str]: The scope ("unit", "sector" or "district") and the normalised value.
+        """
+        value = cls.normalize_postcode(value)
+        for scope, pattern in cls._POSTCODE_SCOPES.items():
+            if pattern.fullmatch(value):
+                return scope, value
+        raise ValueError(f"'{value}' is not a unit postcode, postcode sector or postcode district")
+
+    def build_query_for_postcode_scope(self, scope_value: str, limit: int | None = None, offset: int = 0) -> str:
+        """Builds a price-paid query for every postcode in a sector or district.
+
+        Postcodes are selected with a string range rather than a per-row regex, and the
+        result is ordered by transaction so it can be paged with ``limit``/``offset``.
+        """
+        scope, value = self.postcode_scope(scope_value)
+        if scope == "unit":
+            return self.build_query_for_postcode(value)
+        # A district prefix needs the trailing space, or "HP2" would also match "HP20".
+        prefix = f"{value} " if scope == "district" else value
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        paging = f"LIMIT {limit} OFFSET {offset}" if limit else ""
+        return f"""
+                SELECT ?transx ?addr ?paon ?saon ?street ?town ?county ?postcode
+                    ?amount ?date ?category ?recordStatus ?propertyType ?estateType ?transactionId
+                WHERE {{
+                ?addr lrcommon:postcode ?postcode.
+                FILTER ( ?postcode >= "{prefix}"^^xsd:string && ?postcode < "{upper}"^^xsd:string )
+
+                ?transx lrppi:propertyAddress ?addr ;
+                        lrppi:pricePaid ?amount ;
+                        lrppi:transactionDate ?date ;
+                        lrppi:transactionCategory/skos:prefLabel ?category .
+
+                OPTIONAL {{ ?transx lrppi:transactionId ?transactionId }}
+                OPTIONAL {{ ?transx lrppi:recordStatus ?recordStatus }}
+                OPTIONAL {{ ?transx lrppi:propertyType/skos:prefLabel ?propertyType }}
+                OPTIONAL {{ ?transx lrppi:estateType/skos:prefLabel ?estateType }}
+
+                OPTIONAL {{ ?addr lrcommon:county ?county }}
+                OPTIONAL {{ ?addr lrcommon:paon ?paon }}
+                OPTIONAL {{ ?addr lrcommon:saon ?saon }}
+                OPTIONAL {{ ?addr lrcommon:street ?street }}
+                OPTIONAL {{ ?addr lrcommon:town ?town }}
+                }}
+                ORDER BY ?transx
+                {paging}
+                """
+
+    def build_query_for_postcodes(self, postcodes: list[str]) -> str:
+        """Builds one price-paid query for every postcode bound in its ``VALUES`` block."""
+        values = " ".join(f'"{self.normalize_postcode(pc)}"^^xsd:string' for pc in postcodes)
         return f"""
                 SELECT ?transx ?addr ?paon ?saon ?street ?town ?county ?postcode
                     ?amount ?date ?category ?recordStatus ?propertyType ?estateType ?transactionId
                 WHERE {{
-                VALUES ?postcode {{ "{postcode}"^^xsd:string }}
+                VALUES ?postcode {{ {values} }}
 
                 ?addr lrcommon:postcode ?postcode.
 
@@ -153,50 +499,174 @@ class SparqlQuery:
 
                 """
 
-    def fetch_sparql_query(self, sparql_query: str) -> dict[str, Any]:
-        """Fetches data from a SPARQL endpoint using the provided query."""
+    def _prepare_query(self, sparql_query: str) -> str:
         if not sparql_query.startswith(self._PREFIX):
             sparql_query = self._PREFIX + sparql_query
 
-        # Run the query
         if self.verbose:
             self._logger.info(f"Running SPARQL query: {sparql_query} from {self.endpoint_url}")
+        return sparql_query
+
+    @property
+    def cache(self) -> QueryCache | None:
+        if not self.use_cache:
+            return None
+        return self._cache or QueryCache.shared()
+
+    def _post(self, sparql_query: str, stream: bool = False, result_format: str = "json"):
+        self.breaker.check()
+        try:
+            response = self.transport.post(
+                self.endpoint_url,
+                data={"query": sparql_query},
+                headers={"Accept": self.RESULT_FORMATS[result_format]},
+                timeout=self.timeout,
+                stream=stream,
+                limiter=self.limiter,
+            )
+        except Exception as e:
+            # A 4xx means the endpoint is up and rejected the query; only outages count against it.
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if status is not None and status < 500 and status != 429:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response
+
+    def _revalidate(self, key: str, sparql_query: str, result_format: str) -> None:
+        if self.breaker.state == CircuitBreaker.OPEN:
+            return
+        with self._revalidate_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+            if SparqlQuery._revalidator is None:
+                SparqlQuery._revalidator = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sparql-revalidate")
+        SparqlQuery._revalidator.submit(self._refresh_entry, key, sparql_query, result_format)
+
+    def _refresh_entry(self, key: str, sparql_query: str, result_format: str) -> None:
+        try:
+            self.cache.put(key, self._post(sparql_query, result_format=result_format).content)
+        except Exception as e:
+            self._logger.warning(f"Background refresh failed; keeping the stale response: {e}")
+        finally:
+            with self._revalidate_lock:
+                self._revalidating.discard(key)
+
+    def _fetch_body(self, sparql_query: str, result_format: str = "json") -> bytes:
+        sparql_query = self._prepare_query(sparql_query)
+        flight_key = (self.endpoint_url, result_format, QueryCache.normalize_query(sparql_query))
+        return self._flights.do(flight_key, self._load_body, sparql_query, result_format)
+
+    def _load_body(self, sparql_query: str, result_format: str) -> bytes:
+        cache = self.cache
+        key = cache.key(self.endpoint_url, sparql_query, result_format) if cache else None
+        if cache:
+            body = cache.get(key, allow_stale=self.stale_while_revalidate)
+            if body is not None:
+                if self.stale_while_revalidate and cache.is_stale(key):
+                    self._revalidate(key, sparql_query, result_format)
+                return body
+
+        body = self._post(sparql_query, result_format=result_format).content
+        if cache:
+            cache.put(key, body)
+        return body
+
+    def _iter_body(self, sparql_query: str, result_format: str = "json") -> Iterator[bytes]:
+        sparql_query = self._prepare_query(sparql_query)
+        cache = self.cache
+        key = cache.key(self.endpoint_url, sparql_query, result_format) if cache else None
+        cached = cache.iter_chunks(key, allow_stale=self.stale_while_revalidate) if cache else None
+        if cached is not None:
+            if self.stale_while_revalidate and cache.is_stale(key):
+                self._revalidate(key, sparql_query, result_format)
+            yield from cached
+            return
+
+        with closing(self._post(sparql_query, stream=True, result_format=result_format)) as response:
+            chunks = response.iter_content(chunk_size=64 * 1024)
+            if cache:
+                chunks = cache.tee(key, chunks)
+            yield from chunks
 
-        sparql = SPARQLWrapper(self.endpoint_url)
-        sparql.setQuery(sparql_query)
-        sparql.setReturnFormat(JSON)
-        sparql.setMethod("POST")
-        results = sparql.query().convert()
-        return results
+    def fetch_sparql_query(self, sparql_query: str) -> dict[str, Any]:
+        """Fetches data from a SPARQL endpoint using the provided query.
 
-    @staticmethod
-    def make_data_from_results(results: dict) -> pd.DataFrame:
-        variables = results.get("head", {}).get("vars", [])
-        bindings = results.get("results", {}).get("bindings", [])
+        Responses are served from the raw query cache when an entry for the same
+        normalised query and endpoint is still fresh.
+        """
+        return json.loads(self._fetch_body(sparql_query))
 
-        if not bindings:
-            return pd.DataFrame(columns=[make_snake_from_camel(v) for v in variables])
+    def iter_sparql_frames(self, sparql_query: str, chunk_size: int | None = None) -> Iterator[pd.DataFrame]:
+        """Streams a query's result set as a sequence of partial DataFrames.
 
-        # 1. Create the list of dicts
-        data = [{k: v.get("value") for k, v in result.items()} for result in bindings]
+        The response body is parsed incrementally off the socket (or the cache file) and
+        rows are decoded straight into column buffers, so at most ``chunk_size`` rows are
+        materialised at once. An empty result yields a single empty frame carrying the
+        projected columns.
+        """
+        chunk_size = max(chunk_size or self.stream_chunk_size, 1)
+        if self.result_format != "json":
+            body = self._iter_body(sparql_query, self.result_format)
+            with closing(body), open_chunks(body) as source:
+                yield from iter_delimited_results(source, self._SCHEMA, chunk_size, tsv=self.result_format == "tsv")
+            return
+
+        body = self._iter_body(sparql_query)
+        with closing(body):
+            variables, bindings = iter_sparql_json(body)
+            decoder = ColumnarDecoder(variables, self._SCHEMA)
+            yielded = False
+            while True:
+                decoder.extend(islice(bindings, chunk_size))
+                if not len(decoder):
+                    break
+                yield decoder.to_frame()
+                decoder.clear()
+                yielded = True
+            if not yielded:
+                yield decoder.to_frame()
+            # Read the closing bytes so a tee'd cache entry is committed.
+            for _ in body:
+                pass
+
+    def fetch_sparql_frame(self, sparql_query: str, stream: bool | None = None) -> pd.DataFrame:
+        """Fetches a query straight into a typed DataFrame, streaming if configured to."""
+        stream = self.stream_results if stream is None else stream
+        if not stream:
+            if self.result_format == "json":
+                return self.make_data_from_results(self.fetch_sparql_query(sparql_query))
+            body = self._fetch_body(sparql_query, self.result_format)
+            return decode_delimited_results(io.BytesIO(body), self._SCHEMA, tsv=self.result_format == "tsv")
+
+        return concat_frames(list(self.iter_sparql_frames(sparql_query)))
+
+    @property
+    def transport_stats(self) -> dict[str, int]:
+        """Connection reuse and retry counters for the underlying transport."""
+        return self.transport.stats
 
-        # 2. Initialize DataFrame
-        df = pd.DataFrame(data)
-        df.columns = [make_snake_from_camel(col) for col in df.columns]
+    @property
+    def breaker_stats(self) -> dict[str, int | str]:
+        """Circuit state, consecutive failures and rejected requests."""
+        return self.breaker.stats
 
-        date_cols = ["ref_period_start", "ref_period_end", "date"]
-        for col in date_cols:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col])
+    @property
+    def limiter_stats(self) -> dict[str, float]:
+        """Current concurrency limit, in-flight requests and queue depth of the shared limiter."""
+        return self.limiter.stats
 
-        for col in df.columns:
-            if col not in date_cols:
-                try:
-                    df[col] = pd.to_numeric(df[col], errors="raise")
-                except (ValueError, TypeError):
-                    continue
+    @staticmethod
+    def make_data_from_results(results: dict) -> pd.DataFrame:
+        variables = results.get("head", {}).get("vars", [])
+        bindings = results.get("results", {}).get("bindings", [])
 
-        return df
+        decoder = ColumnarDecoder(variables, SparqlQuery._SCHEMA)
+        decoder.extend(bindings)
+        return decoder.to_frame()
 
     def _fetch_hpi_regions(self) -> pd.DataFrame:
         """Fetches the list of regions from the SPARQL endpoint.
@@ -220,8 +690,7 @@ class SparqlQuery:
 
         """
 
-        results = self.fetch_sparql_query(query)
-        df = self.make_data_from_results(results)
+        df = self.fetch_sparql_frame(query)
         hpi_regions = df.assign(
             ref_region_keyword=df["ref_region"].str.split("/").str[-1],
             ref_region_type_keyword=df["region_type"].str.split("/").str[-1],
@@ -229,21 +698,44 @@ class SparqlQuery:
         return hpi_regions
 
     @property
-    def HPI_REGIONS(self) -> pd.DataFrame:
-        if self._hpi_regions is None:
-            file = FileVersion(
-                base_path=_PACKAGE_DIR / "cache" / "region_data", file_name="hpi_regions_", extension="csv"
-            )
-            file_path = file.latest_file_path
-            if file_path:
-                data = Dataset(file_path=file_path).load_data()
-            else:
-                data = file.load_latest_file(self, "_fetch_hpi_regions", False)
-            if not data:
-                return pd.DataFrame()
+    def region_catalog(self) -> RegionCatalog:
+        """The process-wide region catalog of this instance's endpoint.
 
-            self._hpi_regions = pd.DataFrame(data)
-        return self._hpi_regions
+        Catalogs refreshed from endpoints other than the Land Registry one, such as a local
+        stand-in, are kept in their own directory so they never replace the live catalog.
+        """
+        with SparqlQuery._region_catalog_lock:
+            catalog = SparqlQuery._region_catalogs.get(self.endpoint_url)
+            if catalog is None:
+                cache_path = REGION_CACHE_PATH
+                if self.endpoint_url != LIVE_ENDPOINT:
+                    cache_path = cache_path / hashlib.sha256(self.endpoint_url.encode("utf-8")).hexdigest()[:16]
+                catalog = RegionCatalog(fetch=self._fetch_hpi_regions, cache_path=cache_path)
+                SparqlQuery._region_catalogs[self.endpoint_url] = catalog
+            return catalog
+
+    def hpi_regions(self, complete: bool = False) -> pd.DataFrame:
+        """The HPI region catalog.
+
+        Served from the bundled snapshot or the last refreshed catalog without waiting on the
+        endpoint; a stale or partial catalog is refreshed in the background and swapped in
+        when the refresh lands.
+
+        Args:
+            complete (bool): Build the full catalog in the caller's thread first when only the
+                partial seed is available, for batch jobs that must see every region.
+        """
+        catalog = self.region_catalog
+        if complete:
+            df = catalog.ensure_complete()
+        else:
+            catalog.refresh_in_background()
+            df = catalog.frame
+        return df if not df.empty else pd.DataFrame()
+
+    @property
+    def HPI_REGIONS(self) -> pd.DataFrame:
+        return self.hpi_regions()
 
     def _get_price_paid_data_for_postcode(self, postcode: str) -> pd.DataFrame:
         """Fetches price paid data for a given postcode.
@@ -255,15 +747,18 @@ class SparqlQuery:
             pd.DataFrame: A DataFrame containing the price paid data.
         """
         query = self.build_query_for_postcode(postcode)
-        results = self.fetch_sparql_query(query)
-        return self.make_data_from_results(results)
+        return self.fetch_sparql_frame(query)
 
-    def get_price_paid_data_for_postcode(self, postcode: str) -> pd.DataFrame:
-        file = FileVersion(
+    @staticmethod
+    def _postcode_file(postcode: str) -> FileVersion:
+        return FileVersion(
             base_path=_PACKAGE_DIR / "cache" / "postcode_data",
             file_name=f"price_paid_{postcode.upper().replace(' ', '')}_",
             extension="csv",
         )
+
+    def get_price_paid_data_for_postcode(self, postcode: str) -> pd.DataFrame:
+        file = self._postcode_file(postcode)
         file_path = file.latest_file_path
         if file_path:
             data = Dataset(file_path=file_path).load_data()
@@ -273,3 +768,128 @@ class SparqlQuery:
             return pd.DataFrame()
 
         return pd.DataFrame(data)
+
+    def _fetch_postcode_batch(self, postcodes: list[str]) -> dict[str, pd.DataFrame]:
+        """Fetches one batch, halving it on failure until the failing postcodes are isolated."""
+        try:
+            df = self.fetch_sparql_frame(self.build_query_for_postcodes(postcodes))
+        except Exception as e:
+            if len(postcodes) == 1:
+                self._logger.error(f"Price paid fetch failed for {postcodes[0]}: {e}")
+                return {}
+            mid = len(postcodes) // 2
+            return self._fetch_postcode_batch(postcodes[:mid]) | self._fetch_postcode_batch(postcodes[mid:])
+
+        if df.empty or "postcode" not in df.columns:
+            return {pc: df.iloc[0:0] for pc in postcodes}
+        grouped = dict(tuple(df.groupby(df["postcode"].astype(str), sort=False)))
+        return {pc: grouped.get(pc, df.iloc[0:0]).reset_index(drop=True) for pc in postcodes}
+
+    def fetch_price_paid_for_postcodes(
+        self,
+        postcodes: list[str],
+        batch_size: int = 50,
+        max_workers: int = 4,
+    ) -> dict[str, pd.DataFrame]:
+        """Batched counterpart of ``get_price_paid_data_for_postcode``.
+
+        Postcodes already cached are read from disk; the rest are fetched ``batch_size`` per
+        query and written to the same per-postcode cache files, so later single-postcode
+        calls are served locally. A failing batch is split in half and retried until only
+        the postcodes that fail on their own are left out of the result.
+
+        Args:
+            postcodes (list[str]): Postcodes in any case and spacing.
+            batch_size (int): Maximum number of postcodes bound into one query.
+            max_workers (int): Batches in flight at once; the shared limiter still paces requests.
+
+        Returns:
+            dict[str, pd.DataFrame]: Frames keyed by normalised postcode, empty for postcodes
+            without transactions.
+        """
+        frames: dict[str, pd.DataFrame] = {}
+        missing: list[str] = []
+        for postcode in dict.fromkeys(self.normalize_postcode(pc) for pc in postcodes):
+            file_path = self._postcode_file(postcode).latest_file_path
+            if file_path:
+                frames[postcode] = pd.DataFrame(Dataset(file_path=file_path).load_data())
+            else:
+                missing.append(postcode)
+
+        batch_size = max(batch_size, 1)
+        batches = [missing[i : i + batch_size] for i in range(0, len(missing), batch_size)]
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for fetched in executor.map(self._fetch_postcode_batch, batches):
+                for postcode, df in fetched.items():
+                    file = self._postcode_file(postcode)
+                    WriteFile(
+                        data_to_write=df,
+                        base_path=file.base_path,
+                        file_name=file.file_name,
+                        extension=file.extension,
+                    ).write_file_to_disk()
+                    file_path = file.latest_file_path
+                    if file_path is None:
+                        # The write failed and was logged; serve the fetched rows uncached.
+                        frames[postcode] = df
+                        continue
+                    data = Dataset(file_path=file_path).load_data()
+                    frames[postcode] = pd.DataFrame(data) if data else pd.DataFrame()
+        return frames
+
+    def _fetch_price_paid_pages(self, scope_value: str, page_size: int) -> pd.DataFrame:
+        frames = []
+        offset = 0
+        while True:
+            page = self.fetch_sparql_frame(self.build_query_for_postcode_scope(scope_value, page_size, offset))
+            frames.append(page)
+            if len(page) < page_size:
+                break
+            offset += page_size
+        return concat_frames(frames)
+
+    def _write_unit_postcode_files(self, df: pd.DataFrame) -> None:
+        if df.empty or "postcode" not in df.columns:
+            return
+        for postcode, group in df.groupby(df["postcode"].astype(str), sort=False):
+            file = self._postcode_file(postcode)
+            WriteFile(
+                data_to_write=group,
+                base_path=file.base_path,
+                file_name=file.file_name,
+                extension=file.extension,
+            ).write_file_to_disk()
+
+    def get_price_paid_data_for_scope(self, scope_value: str, page_size: int = 10_000) -> pd.DataFrame:
+        """Returns every transaction in a unit postcode, postcode sector or postcode district.
+
+        Sectors and districts are pulled with one range-filtered query, paged ``page_size``
+        rows at a time, and cached per scope. Each unit postcode in the result also gets
+        its own cache entry, so ``get_price_paid_data_for_postcode`` is then served
+        locally for all of them.
+        """
+        scope, value = self.postcode_scope(scope_value)
+        if scope == "unit":
+            return self.get_price_paid_data_for_postcode(value)
+
+        file = FileVersion(
+            base_path=_PACKAGE_DIR / "cache" / "postcode_data",
+            file_name=f"price_paid_{scope}_{value.replace(' ', '')}_",
+            extension="csv",
+        )
+        file_path = file.latest_file_path
+        if not file_path:
+            df = self._fetch_price_paid_pages(value, page_size)
+            WriteFile(
+                data_to_write=df,
+                base_path=file.base_path,
+                file_name=file.file_name,
+                extension=file.extension,
+            ).write_file_to_disk()
+            self._write_unit_postcode_files(df)
+            file_path = file.latest_file_path
+
+        data = Dataset(file_path=file_path).load_data()
+        if not data:
+            return pd.DataFrame()
+        return pd.DataFrame(data)
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import time
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import requests
+
+from ukhpi.core.decoding import XSD
+from ukhpi.core.sparql import LIVE_ENDPOINT, SparqlQuery
+from ukhpi.io.query_cache import QueryCache
+from ukhpi.loggers import BasicLogger
+
+_SELECT = re.compile(r"SELECT\s+(?:DISTINCT\s+)?(.*?)\s+WHERE", re.IGNORECASE | re.DOTALL)
+_VARIABLE = re.compile(r"\?(\w+)")
+_DATE_BOUND = re.compile(r'"(\d{4}-\d{2}-\d{2})"\^\^xsd:date')
+_REGION = re.compile(r"<http://landregistry\.data\.gov\.uk/id/region/([^>]+)>")
+# Characters escaped inside TSV string literals, as in Turtle.
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_DATATYPES = {"int": f"{XSD}integer", "float": f"{XSD}decimal", "date": f"{XSD}date", "str": f"{XSD}string"}
+
+
+def _synthetic_rows(query: str, default_rows: int) -> tuple[list[str], list[dict[str, tuple[str, str]]]]:
+    """Builds a deterministic result set shaped like the one the live endpoint would return.
+
+    HPI queries get one row per region and month of their window; anything else gets
+    ``default_rows`` rows. Cells are ``(kind, value)`` pairs.
+    """
+    match = _SELECT.search(query)
+    variables = _VARIABLE.findall(match.group(1)) if match else []
+    rng = random.Random(hashlib.sha256(QueryCache.normalize_query(query).encode()).digest())
+
+    dates = _DATE_BOUND.findall(query)
+    regions = list(dict.fromkeys(_REGION.findall(query))) or ["united-kingdom"]
+    if len(dates) >= 2 and "refPeriodStart" in variables:
+        months = pd.date_range(dates[0], dates[1], freq="MS")
+        keys = [(region, month) for region in regions for month in months]
+    else:
+        keys = [(regions[0], pd.Timestamp("2020-01-01") + pd.DateOffset(months=i)) for i in range(default_rows)]
+
+    rows = []
+    for region, month in keys:
+        row = {}
+        for var in variables:
+            kind = SparqlQuery._SCHEMA.get(var, "str")
+            if var == "_about":
+                value = f"http://landregistry.data.gov.uk/data/ukhpi/region/{region}/month/{month:%Y-%m}"
+            elif var == "refRegion":
+                value = f"{SparqlQuery._REGION_URI}{region}"
+            elif var == "refMonth":
+                value = f"{month:%Y-%m}"
+            elif kind == "date":
+                value = f"{month:%Y-%m-%d}"
+            elif kind == "uri":
+                value = f"http://landregistry.data.gov.uk/def/standin/{var}"
+            elif kind == "int":
+                value = str(rng.randint(10, 5000))
+            elif kind == "float":
+                value = f"{rng.uniform(50, 500_000):.2f}"
+            else:
+                value = f"{var} {len(rows)}"
+            row[var] = (kind, value)
+        rows.append(row)
+    return variables, rows
+
+
+def render_results(variables: list[str], rows: list[dict[str, tuple[str, str]]], result_format: str) -> bytes:
+    """Serialises ``(kind, value)`` rows as a SPARQL JSON, CSV or TSV result set."""
+    if result_format == "json":
+        bindings = []
+        for row in rows:
+            binding = {}
+            for var, (kind, value) in row.items():
+                if kind == "uri":
+                    binding[var] = {"type": "uri", "value": value}
+                else:
+                    binding[var] = {"type": "literal", "datatype": _DATATYPES[kind], "value": value}
+            bindings.append(binding)
+        return json.dumps({"head": {"vars": variables}, "results": {"bindings": bindings}}).encode()
+
+    buffer = io.StringIO()
+    if result_format == "csv":
+        writer = csv.writer(buffer, lineterminator="\r\n")
+        writer.writerow(variables)
+        writer.writerows([row[var][1] for var in variables] for row in rows)
+        return buffer.getvalue().encode()
+
+    buffer.write("\t".join(f"?{var}" for var in variables) + "\n")
+    for row in rows:
+        terms = []
+        for var in variables:
+            kind, value = row[var]
+            if kind == "uri":
+                terms.append(f"<{value}>")
+            elif kind in ("int", "float"):
+                terms.append(value)
+            else:
+                terms.append(f'"{value.translate(_TSV_ESCAPES)}"^^<{_DATATYPES[kind]}>')
+        buffer.write("\t".join(terms) + "\n")
+    return buffer.getvalue().encode()
+
+
+class SparqlStandin:
+    """Local HTTP stand-in for the Land Registry SPARQL endpoint.
+
+    Responses are replayed from a store of recorded bodies keyed exactly like
+    ``QueryCache`` entries for the live endpoint, so a populated ``cache/sparql_data``
+    directory can be replayed as is. Queries with no recording are synthesised (HPI
+    queries get one row per region and month of their window) or, in recorder mode,
+    forwarded to ``upstream`` and captured. Latency, jitter, server errors and 429
+    throttling can be injected with a seeded RNG, so runs are repeatable. Successful
+    responses are gzip-compressed for clients that accept it, as the live endpoint does.
+    """
+
+    def __init__(
+        self,
+        store_path: Path | str | None = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        synthesize: bool = True,
+        synthetic_rows: int = 100,
+        upstream: str | None = None,
+        key_endpoint: str = LIVE_ENDPOINT,
+        seed: int = 0,
+    ):
+        """
+        Initializes the stand-in.
+
+        Args:
+            store_path (Path | str | None): Directory of recorded responses; None keeps nothing on disk
+                and serves synthetic responses only.
+            latency (float): Seconds added to every response.
+            jitter (float): Maximum extra seconds, drawn uniformly per request.
+            error_rate (float): Fraction of requests answered with HTTP 500.
+            throttle_rate (float): Fraction of requests answered with HTTP 429 and ``Retry-After``.
+            retry_after (float): ``Retry-After`` value sent with throttled responses.
+            synthesize (bool): Synthesise responses for queries without a recording; otherwise answer 404.
+            synthetic_rows (int): Rows in synthetic responses to non-HPI queries.
+            upstream (str | None): Recorder mode: forward unrecorded queries here and store the responses.
+            key_endpoint (str): Endpoint URL the store keys are computed for.
+            seed (int): Seed for fault injection and jitter.
+        """
+        self.store = QueryCache(base_path=store_path, ttl_seconds=None, max_bytes=1 << 62) if store_path else None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.synthesize = synthesize
+        self.synthetic_rows = synthetic_rows
+        self.upstream = upstream
+        self.key_endpoint = key_endpoint
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(("requests", "replayed", "recorded", "synthesized", "errors", "throttled"), 0)
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+        self._logger = BasicLogger(logger_name="SPARQL_STANDIN", verbose=False, log_directory=None)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def _draw(self) -> tuple[float, float]:
+        with self._lock:
+            return self._rng.random(), self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+
+    def respond(self, query: str, result_format: str) -> tuple[int, dict[str, str], bytes]:
+        """Returns the status, headers and body the stand-in serves for ``query``."""
+        self._count("requests")
+        roll, delay = self._draw()
+        time.sleep(self.latency + delay)
+
+        if roll < self.throttle_rate:
+            self._count("throttled")
+            return 429, {"Retry-After": f"{self.retry_after:g}"}, b"Too many requests"
+        if roll < self.throttle_rate + self.error_rate:
+            self._count("errors")
+            return 500, {}, b"Injected server error"
+
+        content_type = {"Content-Type": SparqlQuery.RESULT_FORMATS[result_format]}
+        key = self.store.key(self.key_endpoint, query, result_format) if self.store else None
+        body = self.store.get(key) if self.store else None
+        if body is not None:
+            self._count("replayed")
+            return 200, content_type, body
+
+        if self.upstream:
+            response = requests.post(
+                self.upstream,
+                data={"query": query},
+                headers={"Accept": SparqlQuery.RESULT_FORMATS[result_format]},
+                timeout=(10, 300),
+            )
+            if response.ok and self.store:
+                self.store.put(key, response.content)
+                self._count("recorded")
+            return response.status_code, content_type, response.content
+
+        if not self.synthesize:
+            return 404, {}, b"No recording for this query"
+        self._count("synthesized")
+        variables, rows = _synthetic_rows(query, self.synthetic_rows)
+        return 200, content_type, render_results(variables, rows, result_format)
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self, params: dict[str, list[str]]) -> None:
+                query = params.get("query", [""])[0]
+                accept = self.headers.get("Accept", "")
+                result_format = next(
+                    (fmt for fmt, mime in SparqlQuery.RESULT_FORMATS.items() if mime in accept),
+                    "json",
+                )
+                status, headers, body = standin.respond(query, result_format)
+                # Compress like the live endpoint, so wire sizes measured against the stand-in hold.
+                if status == 200 and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, compresslevel=6)
+                    headers = {**headers, "Content-Encoding": "gzip"}
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self._serve(parse_qs(self.rfile.read(length).decode("utf-8")))
+
+            def do_GET(self):
+                self._serve(parse_qs(urlparse(self.path).query))
+
+            def log_message(self, format, *args):
+                standin._logger.debug(format % args)
+
+        return Handler
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serves on a background thread and returns the query URL (port 0 picks a free port)."""
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self.url
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/landregistry/query"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> SparqlStandin:
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+def build_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="ukhpi-standin",
+        description="Serve a local record/replay stand-in for the Land Registry SPARQL endpoint.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8890, help="Port to listen on (default: 8890).")
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help="Directory of recorded responses, e.g. src/ukhpi/cache/sparql_data (default: synthesise only).",
+    )
+    parser.add_argument("--record", metavar="UPSTREAM", default=None, help="Forward and record unknown queries.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random extra seconds per response.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument(
+        "--retry-after", type=float, default=1.0, help="Retry-After seconds sent with throttled responses (default: 1)."
+    )
+    parser.add_argument("--no-synthesize", action="store_true", help="Answer 404 for queries without a recording.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for fault injection (default: 0).")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    standin = SparqlStandin(
+        store_path=args.store,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        synthesize=not args.no_synthesize,
+        upstream=args.record,
+        seed=args.seed,
+    )
+    url = standin.start(args.host, args.port)
+    print(f"SPARQL stand-in listening on {url}")
+    try:
+        standin._thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.stop()
+        print(f"Served: {standin.stats}")
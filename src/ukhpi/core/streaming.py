@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import codecs
+import io
+import json
+import re
+from collections.abc import Iterable, Iterator
+
+_WHITESPACE = re.compile(r"[\s,]*")
+# Consumed text is dropped from the buffer once it grows past this many characters.
+_COMPACT_AT = 1 << 20
+
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterable of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def open_chunks(chunks: Iterable[bytes], buffer_size: int = 64 * 1024) -> io.BufferedReader:
+    """Wraps a byte-chunk iterator (e.g. a streamed HTTP body) as a buffered file object."""
+    return io.BufferedReader(_ChunkReader(chunks), buffer_size=buffer_size)
+
+
+class _TextStream:
+    """Incrementally decoded text buffer over an iterable of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def read_more(self) -> bool:
+        if self.exhausted:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                if self.pos > _COMPACT_AT:
+                    self.buf = self.buf[self.pos :]
+                    self.pos = 0
+                self.buf += self._decoder.decode(chunk)
+                return True
+        self.buf += self._decoder.decode(b"", final=True)
+        self.exhausted = True
+        return False
+
+    def seek_past(self, token: str) -> bool:
+        """Advances ``pos`` to just after the next occurrence of ``token``."""
+        while True:
+            idx = self.buf.find(token, self.pos)
+            if idx >= 0:
+                self.pos = idx + len(token)
+                return True
+            # Keep a tail in case the token straddles two chunks.
+            self.pos = max(self.pos, len(self.buf) - len(token))
+            if not self.read_more():
+                return False
+
+    def skip_separators(self) -> None:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self.read_more():
+                return
+
+    def decode_value(self, decoder: json.JSONDecoder):
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.read_more():
+                    raise
+                continue
+            self.pos = end
+            return value
+
+
+def iter_sparql_json(chunks: Iterable[bytes]) -> tuple[list[str], Iterator[dict]]:
+    """Parses a SPARQL JSON result set incrementally.
+
+    Only ``head.vars`` and one binding at a time are held as Python objects, so memory
+    stays flat however large ``results.bindings`` is. The endpoint must emit ``head``
+    before ``results``, as Fuseki and every other mainstream store do.
+
+    Returns:
+        tuple[list[str], Iterator[dict]]: The projected variables and a lazy iterator
+        over the bindings.
+    """
+    stream = _TextStream(chunks)
+    decoder = json.JSONDecoder()
+
+    if not stream.seek_past('"vars"') or not stream.seek_past(":"):
+        raise ValueError("SPARQL JSON response has no head.vars ahead of its bindings")
+    stream.skip_separators()
+    variables = stream.decode_value(decoder)
+
+    def bindings() -> Iterator[dict]:
+        if not stream.seek_past('"bindings"') or not stream.seek_past("["):
+            return
+        while True:
+            stream.skip_separators()
+            if stream.pos >= len(stream.buf) or stream.buf[stream.pos] == "]":
+                return
+            yield stream.decode_value(decoder)
+
+    return variables, bindings()
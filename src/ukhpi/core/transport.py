@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ukhpi.core.limiter import AdaptiveLimiter
+from ukhpi.loggers import BasicLogger
+
+
+class TransportError(Exception):
+    pass
+
+
+class HttpTransport:
+    """Pooled keep-alive HTTP transport shared by every SPARQL fetch.
+
+    A single ``requests.Session`` holds a bounded pool of connections per host, so
+    concurrent fetches reuse open sockets instead of paying a fresh TCP/TLS handshake.
+    Transient failures (timeouts, dropped connections, truncated bodies, 429/5xx) are retried with
+    exponential backoff.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    # A connection dropped mid-body surfaces as ChunkedEncodingError once the content is read.
+    RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+    THROTTLE_STATUSES = frozenset({429, 503})
+
+    _shared: HttpTransport | None = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 120.0,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+
+        # pool_block=True caps open sockets at pool_size; extra threads wait for a free connection.
+        self._adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._failures = 0
+        # Body bytes as sent on the wire, and after content decoding (gzip) by requests.
+        self._bytes_received = 0
+        self._bytes_decoded = 0
+        self._logger = BasicLogger(logger_name="HTTP_TRANSPORT", verbose=False, log_directory=None)
+
+    @classmethod
+    def shared(cls) -> HttpTransport:
+        """Process-wide transport, so every ``SparqlQuery`` draws from the same connection pool."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _backoff(self, attempt: int, retry_after: str | None = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return min(self.backoff_factor * (2**attempt), self.backoff_max)
+
+    @classmethod
+    def _outcome(cls, status_code: int) -> str:
+        if status_code in cls.THROTTLE_STATUSES:
+            return "throttled"
+        if status_code >= 500:
+            return "error"
+        return "ok"
+
+    def post(
+        self,
+        url: str,
+        data: dict[str, Any],
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] | None = None,
+        stream: bool = False,
+        limiter: AdaptiveLimiter | None = None,
+    ) -> requests.Response:
+        """POST ``data`` to ``url``, retrying transient failures with exponential backoff.
+
+        When a ``limiter`` is given, every attempt waits for a slot and reports its outcome
+        back, so retries are paced and throttling shrinks the shared concurrency limit.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            started = limiter.acquire() if limiter else None
+            outcome = "error"
+            try:
+                response = self.session.post(url, data=data, headers=headers, timeout=timeout, stream=stream)
+                outcome = self._outcome(response.status_code)
+            except self.RETRY_EXCEPTIONS as exc:
+                if attempt == self.max_retries:
+                    with self._lock:
+                        self._failures += 1
+                    raise TransportError(f"Request to {url} failed after {attempt + 1} attempts: {exc}") from exc
+                self._logger.debug(f"Attempt {attempt + 1} to {url} failed: {exc}")
+            else:
+                if response.status_code not in self.RETRY_STATUSES:
+                    if not response.ok:
+                        with self._lock:
+                            self._failures += 1
+                        response.raise_for_status()
+                    if not stream:
+                        decoded = len(response.content)
+                        with self._lock:
+                            self._bytes_received += self.wire_bytes(response)
+                            self._bytes_decoded += decoded
+                    return response
+                if attempt == self.max_retries:
+                    with self._lock:
+                        self._failures += 1
+                    response.raise_for_status()
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+                self._logger.debug(f"Attempt {attempt + 1} to {url} returned HTTP {response.status_code}")
+            finally:
+                # Every attempt gives its slot back, whatever it raised; any failure to get a
+                # response counts as an error.
+                if limiter:
+                    limiter.release(started, outcome)
+
+            with self._lock:
+                self._retries += 1
+            time.sleep(self._backoff(attempt, retry_after))
+        raise TransportError(f"Request to {url} failed")  # pragma: no cover - loop always returns or raises
+
+    @staticmethod
+    def wire_bytes(response: requests.Response) -> int:
+        """Bytes a fully read response body took on the wire, before content decoding.
+
+        Read from the underlying connection when it reports them, else from ``Content-Length``;
+        the decoded size is the last resort.
+        """
+        try:
+            read = response.raw.tell()
+        except (AttributeError, OSError, ValueError):
+            read = 0
+        if read:
+            return read
+        length = response.headers.get("Content-Length", "")
+        return int(length) if length.isdigit() else len(response.content)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Connection reuse counters summed over every host pool held by the session."""
+        container = self._adapter.poolmanager.pools
+        pools = [pool for pool in (container.get(key) for key in container.keys()) if pool is not None]
+        opened = sum(pool.num_connections for pool in pools)
+        requests_sent = sum(pool.num_requests for pool in pools)
+        with self._lock:
+            return {
+                "requests": requests_sent,
+                "connections_opened": opened,
+                "connections_reused": max(requests_sent - opened, 0),
+                "retries": self._retries,
+                "failures": self._failures,
+                "bytes_received": self._bytes_received,
+                "bytes_decoded": self._bytes_decoded,
+            }
+
+    def close(self) -> None:
+        self.session.close()
@@ -4,6 +4,8 @@ import webbrowser
 
 import dash
 
+from ukhpi.core.hpi import sparqlquery
+from ukhpi.core.ppi import sparq
 from ukhpi.dashboard.callbacks import register_callbacks
 from ukhpi.dashboard.layout import build_layout
 
@@ -11,7 +13,14 @@ from ukhpi.dashboard.layout import build_layout
 def _create_app() -> dash.Dash:
     app = dash.Dash(__name__, suppress_callback_exceptions=True)
     app.title = "UK House Price Index Dashboard"
-    app.layout = build_layout()
+    # Callbacks answer from the last cached response while a refresh runs in the background,
+    # for the HPI tabs and the postcode tab alike.
+    for client in (sparqlquery, sparq):
+        client.stale_while_revalidate = True
+    # The region picker loads from the bundled or last refreshed catalog; bring it up to date
+    # off the request path. Passing the function rebuilds the layout on each page load.
+    sparqlquery.region_catalog.refresh_in_background()
+    app.layout = build_layout
     register_callbacks(app)
     return app
 
@@ -7,6 +7,7 @@ import dash_mantine_components as dmc
 import pandas as pd
 from dash import Input, Output, State, dcc, html, no_update
 
+from ukhpi.core.hpi import HousePriceIndex
 from ukhpi.dashboard.annotations import apply_historical_events
 from ukhpi.dashboard.components import build_kpi_row, chart_card, postcode_tab_layout, render_postcode_content
 from ukhpi.dashboard.tabs import (
@@ -452,16 +453,9 @@ def register_callbacks(app: dash.Dash) -> None:
         regions = [region]
         if compare_on:
             regions.extend(r for r in (compare_list or []) if r and r != region)
-        frames = []
-        for r in regions:
-            df = HousePriceIndexPlots(start_year=start, end_year=end, region=r).hpi_df.copy()
-            if df.empty:
-                continue
-            df.insert(0, "region", r)
-            frames.append(df)
-        if not frames:
+        combined = HousePriceIndex().fetch_hpi_frame(start, end, regions)
+        if combined.empty:
             return no_update
-        combined = pd.concat(frames, ignore_index=True)
         filename = f"ukhpi_{'-'.join(regions)}_{start}_{end}.csv"
         return dcc.send_data_frame(combined.to_csv, filename, index=False)
 
@@ -36,4 +36,8 @@ def build_region_options(regions_df: pd.DataFrame) -> list[dict]:
             seen.add(slug)
             options.append({"label": f"{emoji} {slug.replace('-', ' ').title()}", "value": slug})
 
+    # Regions of unknown type, such as those in the bundled seed catalog, come last.
+    for slug in sorted(set(regions_df["ref_region_keyword"].dropna().unique()) - seen):
+        options.append({"label": f"🏠 {slug.replace('-', ' ').title()}", "value": slug})
+
     return options
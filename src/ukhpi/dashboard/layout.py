@@ -3,7 +3,7 @@ from __future__ import annotations
 import dash_mantine_components as dmc
 from dash import dcc, html
 
-from ukhpi.core.sparql import SparqlQuery
+from ukhpi.core.hpi import sparqlquery
 from ukhpi.dashboard.components import build_region_options, build_sidebar, control_group
 from ukhpi.dashboard.tabs import (
     DEFAULT_END,
@@ -17,8 +17,11 @@ from ukhpi.dashboard.tabs import (
     VIEW_CONFIG,
 )
 
-_regions_df = SparqlQuery().HPI_REGIONS
-REGION_OPTIONS = build_region_options(_regions_df)
+
+def _region_options() -> list[dict]:
+    # Read from the local catalog so startup never waits on the endpoint; a background
+    # refresh shows up on the next page load.
+    return build_region_options(sparqlquery.region_catalog.frame)
 
 
 def _theme_toggle() -> dmc.ActionIcon:
@@ -81,9 +84,10 @@ def _slider_marks() -> dict[int, dict]:
 
 
 def _toolbar() -> html.Div:
+    region_options = _region_options()
     region_dropdown = dcc.Dropdown(
         id="region-dropdown",
-        options=REGION_OPTIONS,
+        options=region_options,
         value=DEFAULT_REGION,
         clearable=False,
         searchable=True,
@@ -101,7 +105,7 @@ def _toolbar() -> html.Div:
         style={"display": "none", "marginTop": "8px"},
         children=dcc.Dropdown(
             id="compare-regions",
-            options=REGION_OPTIONS,
+            options=region_options,
             multi=True,
             value=[],
             placeholder=f"Add up to {MAX_COMPARE_REGIONS} regions",
@@ -108,20 +108,9 @@ class GeoOps:
         if hpi_by_geo is None or hpi_by_geo.empty:
             hpi = HousePriceIndex()
 
-            dfs = []
-
-            for geo_name in self.REF_GEO_DF[geo_type_id].unique():
-                result = None
-                try:
-                    result = hpi.fetch_hpi(start_year=start_year, end_year=end_year, region=geo_name)
-                except Exception as e:
-                    print(e)
-                    continue
-                if result is None or result.empty:
-                    continue
-                dfs.append(result)
-
-            hpi_by_geo = pd.concat(dfs, ignore_index=True)
+            regions = [str(geo_name) for geo_name in self.REF_GEO_DF[geo_type_id].dropna().unique()]
+            # One indexed store query for every region in the geography.
+            hpi_by_geo = hpi.fetch_hpi_frame(start_year=start_year, end_year=end_year, regions=regions)
             if hpi_by_geo.empty or hpi_by_geo is None:
                 print("Empty data entered")
                 return pd.DataFrame()
@@ -0,0 +1,62 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pandas as pd
+
+# Parquet and Feather need pyarrow, which is an optional dependency (``pip install ukhpi[parquet]``).
+# Without it, caches keep using CSV.
+HAS_ARROW = importlib.util.find_spec("pyarrow") is not None
+COLUMNAR_EXTENSIONS = {".parquet", ".feather"}
+CACHE_EXTENSION = ".parquet" if HAS_ARROW else ".csv"
+
+
+def _suffix(file_path: Path) -> str:
+    return Path(file_path).suffix.lower()
+
+
+def read_frame(file_path: str | Path) -> pd.DataFrame:
+    """Reads a cache file into a DataFrame, typed where the format stores types."""
+    file_path = Path(file_path)
+    ext = _suffix(file_path)
+    if ext == ".parquet":
+        return pd.read_parquet(file_path)
+    if ext == ".feather":
+        return pd.read_feather(file_path)
+    if ext == ".csv":
+        df = pd.read_csv(file_path, low_memory=False)
+        return df.rename(columns=lambda col: col.replace(" ", "_").lower())
+    if ext == ".json":
+        with file_path.open() as f:
+            return pd.DataFrame(json.load(f))
+    raise ValueError(f"Unsupported extension: {ext.lstrip('.')!r}")
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """Casts object columns holding mixed Python types, which Arrow cannot store, to strings."""
+    mixed = [
+        col
+        for col in df.columns
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True).startswith("mixed")
+    ]
+    if not mixed:
+        return df
+    return df.assign(**{col: df[col].where(df[col].isna(), df[col].astype(str)) for col in mixed})
+
+
+def write_frame(df: pd.DataFrame, file_path: str | Path) -> None:
+    """Writes a DataFrame in the format given by the file extension."""
+    file_path = Path(file_path)
+    ext = _suffix(file_path)
+    if ext in COLUMNAR_EXTENSIONS:
+        df = _arrow_safe(df.reset_index(drop=True))
+        df.columns = [str(col) for col in df.columns]
+        if ext == ".parquet":
+            df.to_parquet(file_path, index=False)
+        else:
+            df.to_feather(file_path)
+        return
+    if ext == ".csv":
+        df.to_csv(file_path, index=False)
+        return
+    raise ValueError(f"Unsupported extension: {ext.lstrip('.')!r}")
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+import pandas as pd
+
+from ukhpi.loggers import BasicLogger
+
+
+class FrameCache:
+    """Process-wide in-memory LRU cache of parsed DataFrames with a byte budget.
+
+    Entry sizes are measured with ``memory_usage(deep=True)``. Once the cached frames
+    exceed ``max_bytes``, least recently used entries are evicted; a single frame larger
+    than the whole budget is not cached at all. Each entry can carry a ``version`` tag,
+    such as the date stamp of the file it was read from, for callers to check freshness.
+    Cached frames are shared: callers must copy before mutating.
+    """
+
+    _shared: FrameCache | None = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_bytes: int = 256 * 1024**2):
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[pd.DataFrame, int, Any]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._bl = BasicLogger(verbose=False, log_directory=None, logger_name="FRAME_CACHE")
+
+    @classmethod
+    def shared(cls) -> FrameCache:
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int) -> None:
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    def lookup(self, key: Hashable) -> tuple[pd.DataFrame, Any] | None:
+        """Returns ``(frame, version)`` for a cached key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0], entry[2]
+
+    def get(self, key: Hashable) -> pd.DataFrame | None:
+        hit = self.lookup(key)
+        return hit[0] if hit is not None else None
+
+    def put(self, key: Hashable, frame: pd.DataFrame, version: Any = None) -> None:
+        nbytes = int(frame.memory_usage(deep=True).sum())
+        with self._lock:
+            self._discard(key)
+            if nbytes > self._max_bytes:
+                self._bl.debug(f"Not caching {key!r}: {nbytes} bytes exceeds the {self._max_bytes} byte budget")
+                return
+            self._entries[key] = (frame, nbytes, version)
+            self._bytes += nbytes
+            self._evict()
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _evict(self) -> None:
+        while self._bytes > self._max_bytes and self._entries:
+            _, (_, nbytes, _) = self._entries.popitem(last=False)
+            self._bytes -= nbytes
+            self._evictions += 1
+
+    @property
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+            }
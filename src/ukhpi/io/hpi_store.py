@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from collections.abc import Iterable
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+
+from ukhpi.loggers import BasicLogger
+
+_DEFAULT_PATH = Path(__file__).resolve().parent.parent / "cache" / "sqlite_dbs" / "hpi.db"
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class HpiStore:
+    """SQLite store of HPI observations, one row per region and month.
+
+    Rows live in a single ``hpi`` table keyed on ``(region, ref_period_start)``, with a
+    second index on ``ref_period_start`` for cross-sections. Any window, region list or
+    column subset is therefore one indexed query. Columns are added the first time a
+    frame carrying them is upserted. The database runs in WAL mode, so a collector can
+    write while dashboards read.
+
+    Materialised roll-ups live in sibling tables with the same key (such as
+    ``hpi_quarter``), created on their first upsert and selected with the ``table`` argument.
+    """
+
+    TABLE = "hpi"
+    KEY_COLUMNS = ("region", "ref_period_start")
+
+    _shared: HpiStore | None = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: Path | str = _DEFAULT_PATH, timeout: float = 30.0):
+        """
+        Args:
+            db_path (Path | str): SQLite database file; created on first use.
+            timeout (float): Seconds a connection waits on a lock held by another writer.
+        """
+        self.db_path = Path(db_path)
+        self.timeout = timeout
+        self._schema_lock = threading.Lock()
+        self._bl = BasicLogger(verbose=False, log_directory=None, logger_name="HPI_STORE")
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._create_table(conn, self.TABLE)
+
+    @classmethod
+    def shared(cls) -> HpiStore:
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _quote(column: str) -> str:
+        if not _IDENTIFIER.match(column):
+            raise ValueError(f"Invalid HPI column name '{column}'")
+        return f'"{column}"'
+
+    @staticmethod
+    def _create_table(conn: sqlite3.Connection, table: str) -> None:
+        if not _IDENTIFIER.match(table):
+            raise ValueError(f"Invalid HPI table name '{table}'")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "region TEXT NOT NULL, ref_period_start TEXT NOT NULL, "
+            "PRIMARY KEY (region, ref_period_start))"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_period ON {table} (ref_period_start)")
+
+    def _table_columns(self, table: str) -> list[str]:
+        if not _IDENTIFIER.match(table):
+            raise ValueError(f"Invalid HPI table name '{table}'")
+        with closing(self._connect()) as conn:
+            return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+    @property
+    def columns(self) -> list[str]:
+        return self._table_columns(self.TABLE)
+
+    def _ensure_columns(self, conn: sqlite3.Connection, types: dict[str, str], table: str) -> None:
+        with self._schema_lock:
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for column, sql_type in types.items():
+                if column in existing:
+                    continue
+                try:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {self._quote(column)} {sql_type}")
+                except sqlite3.OperationalError as e:
+                    # Another process added it first.
+                    if "duplicate column" not in str(e):
+                        raise
+
+    @staticmethod
+    def _prepare(df: pd.DataFrame, region: str | None) -> pd.DataFrame:
+        if region is not None:
+            df = df.assign(region=region)
+        elif "region" not in df.columns:
+            df = df.assign(region=df["ref_region"].astype(str).str.rsplit("/", n=1).str[-1])
+        df = df.assign(ref_period_start=pd.to_datetime(df["ref_period_start"], errors="coerce"))
+        df = df.dropna(subset=["ref_period_start"]).drop_duplicates(list(HpiStore.KEY_COLUMNS), keep="last")
+
+        updates = {}
+        for column in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[column]):
+                updates[column] = df[column].dt.strftime("%Y-%m-%d")
+            elif isinstance(df[column].dtype, pd.CategoricalDtype):
+                updates[column] = df[column].astype(object)
+        df = df.assign(**updates)
+        return df.astype(object).where(df.notna(), None)
+
+    def upsert(self, df: pd.DataFrame, region: str | None = None, table: str = TABLE) -> int:
+        """Inserts or updates the rows of ``df``; only the columns present in ``df`` are written.
+
+        Args:
+            df (pd.DataFrame): HPI rows with a ``ref_period_start`` column.
+            region (str | None): Region slug for every row; taken from ``ref_region`` when omitted.
+            table (str): Table to write; created on first use.
+
+        Returns:
+            int: Number of rows written.
+        """
+        if df is None or df.empty or "ref_period_start" not in df.columns:
+            return 0
+        types = {
+            col: "REAL"
+            if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+            else "TEXT"
+            for col in df.columns
+        }
+        df = self._prepare(df, region)
+        if df.empty:
+            return 0
+
+        columns = list(df.columns)
+        quoted = [self._quote(c) for c in columns]
+        updates = ", ".join(
+            f"{q} = excluded.{q}" for c, q in zip(columns, quoted, strict=True) if c not in self.KEY_COLUMNS
+        )
+        sql = (
+            f"INSERT INTO {table} ({', '.join(quoted)}) VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT (region, ref_period_start) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+        )
+        with closing(self._connect()) as conn, conn:
+            if table != self.TABLE:
+                self._create_table(conn, table)
+            self._ensure_columns(conn, {col: types.get(col, "TEXT") for col in df.columns}, table)
+            conn.executemany(sql, df.itertuples(index=False, name=None))
+        return len(df)
+
+    def regions(self, table: str = TABLE) -> list[str]:
+        if not self._table_columns(table):
+            return []
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute(f"SELECT DISTINCT region FROM {table} ORDER BY region")]
+
+    def filled_columns(
+        self, regions: Iterable[str], columns: list[str] | None = None, table: str = TABLE
+    ) -> dict[str, set[str]]:
+        """Columns holding at least one value for each region the store has rows for.
+
+        Args:
+            regions (Iterable[str]): Region slugs; regions without rows are left out.
+            columns (list[str] | None): Columns to check; every non-key column when None.
+            table (str): Table to inspect.
+        """
+        regions = list(dict.fromkeys(regions))
+        stored = self._table_columns(table)
+        if not regions or not stored:
+            return {}
+        wanted = set(stored) if columns is None else set(columns)
+        known = [c for c in stored if c in wanted and c not in self.KEY_COLUMNS]
+        counts = "".join(f", COUNT({self._quote(c)})" for c in known)
+        sql = f"SELECT region{counts} FROM {table} WHERE region IN ({', '.join('?' for _ in regions)}) GROUP BY region"
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, regions).fetchall()
+        return {row[0]: {c for c, n in zip(known, row[1:], strict=True) if n} for row in rows}
+
+    @staticmethod
+    def _bound(value: str | int, end: bool = False) -> str:
+        text = str(value)
+        if re.fullmatch(r"\d{4}", text):
+            return f"{text}-12-31" if end else f"{text}-01-01"
+        return pd.Timestamp(text).strftime("%Y-%m-%d")
+
+    def query(
+        self,
+        regions: Iterable[str] | None = None,
+        start: str | int | None = None,
+        end: str | int | None = None,
+        columns: list[str] | None = None,
+        table: str = TABLE,
+    ) -> pd.DataFrame:
+        """Reads a slice of the store with one indexed query.
+
+        Args:
+            regions (Iterable[str] | None): Region slugs; every region when None.
+            start (str | int | None): First year (``2020``) or date (``"2020-06-01"``), inclusive.
+            end (str | int | None): Last year or date, inclusive.
+            columns (list[str] | None): Columns besides the keys; all when None. Columns the
+                store does not hold are skipped.
+            table (str): Table to read; a table never written reads as empty.
+
+        Returns:
+            pd.DataFrame: Rows ordered by region and month, ``ref_period_start`` as datetimes.
+        """
+        known = self._table_columns(table)
+        if not known:
+            return pd.DataFrame(columns=list(self.KEY_COLUMNS))
+        if columns is None:
+            select = "*"
+        else:
+            known = set(known)
+            wanted = list(self.KEY_COLUMNS) + [c for c in columns if c in known and c not in self.KEY_COLUMNS]
+            select = ", ".join(self._quote(c) for c in wanted)
+
+        clauses, params = [], []
+        if regions is not None:
+            regions = list(dict.fromkeys(regions))
+            if not regions:
+                return pd.DataFrame(columns=list(self.KEY_COLUMNS))
+            clauses.append(f"region IN ({', '.join('?' for _ in regions)})")
+            params.extend(regions)
+        if start is not None:
+            clauses.append("ref_period_start >= ?")
+            params.append(self._bound(start))
+        if end is not None:
+            clauses.append("ref_period_start <= ?")
+            params.append(self._bound(end, end=True))
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT {select} FROM {table}{where} ORDER BY region, ref_period_start"
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+        return df.assign(ref_period_start=pd.to_datetime(df["ref_period_start"]))
@@ -3,9 +3,13 @@ import json
 import os
 from pathlib import Path
 
+import pandas as pd
+
+from ukhpi.io.formats import COLUMNAR_EXTENSIONS, read_frame
+
 
 class Dataset:
-    """Loads CSV or JSON data from a local file path."""
+    """Loads CSV, JSON, Parquet or Feather data from a local file path."""
 
     def __init__(self, file_path: str | Path):
         self.file_path = Path(file_path)
@@ -15,6 +19,8 @@ class Dataset:
             raise FileNotFoundError(f"File path does not exist: {self.file_path}")
 
         ext = os.path.splitext(self.file_path)[1].lower().lstrip(".")
+        if f".{ext}" in COLUMNAR_EXTENSIONS:
+            return read_frame(self.file_path).to_dict("records")
         if ext == "csv":
             with self.file_path.open() as f:
                 reader = csv.DictReader(f)
@@ -23,3 +29,13 @@ class Dataset:
             with self.file_path.open() as f:
                 return json.load(f)
         raise ValueError(f"Unsupported extension: {ext!r}")
+
+    def load_frame(self) -> pd.DataFrame:
+        """Loads the file straight into a DataFrame.
+
+        Parquet and Feather keep the dtypes they were written with; CSV and JSON are
+        parsed by pandas, which infers numeric columns.
+        """
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"File path does not exist: {self.file_path}")
+        return read_frame(self.file_path)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from ukhpi.loggers import BasicLogger
+
+_DEFAULT_PATH = Path(__file__).resolve().parent.parent / "cache" / "sparql_data"
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryCache:
+    """Content-addressed, gzip-compressed on-disk cache of raw SPARQL responses.
+
+    Entries are keyed by a hash of the endpoint, the requested result format and the
+    whitespace-normalised query text, so the same query is served locally whichever
+    API issued it. Entries older than ``ttl_seconds`` are treated as misses, and the
+    least recently used entries are evicted once the directory exceeds ``max_bytes``.
+    The directory's size is counted once and then tracked as entries are written, so a
+    write only scans the directory when the cache is over budget.
+    """
+
+    SUFFIX = ".gz"
+
+    _shared: QueryCache | None = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        base_path: Path | str = _DEFAULT_PATH,
+        ttl_seconds: float = 24 * 60 * 60,
+        max_bytes: int = 512 * 1024**2,
+        compress_level: int = 6,
+    ):
+        self.base_path = Path(base_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+        self._evictions = 0
+        # Bytes held by the entries, counted on first use by the first scan.
+        self._total_bytes: int | None = None
+        self._bl = BasicLogger(verbose=False, log_directory=None, logger_name="QUERY_CACHE")
+
+    @classmethod
+    def shared(cls) -> QueryCache:
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return _WHITESPACE.sub(" ", query).strip()
+
+    def key(self, endpoint: str, query: str, result_format: str = "json") -> str:
+        payload = "\n".join([endpoint, result_format, self.normalize_query(query)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.base_path / f"{key}{self.SUFFIX}"
+
+    def _expired(self, mtime: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - mtime > self.ttl_seconds
+
+    def _fresh_path(self, key: str, allow_stale: bool = False) -> Path | None:
+        path = self.path_for(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return None
+        expired = self._expired(stat.st_mtime)
+        if expired and not allow_stale:
+            with self._lock:
+                self._misses += 1
+            return None
+        # atime records the last read and drives LRU eviction; mtime keeps the write time for TTL.
+        os.utime(path, (time.time(), stat.st_mtime))
+        with self._lock:
+            if expired:
+                self._stale_hits += 1
+            else:
+                self._hits += 1
+        return path
+
+    def is_stale(self, key: str) -> bool:
+        """Whether an entry exists for ``key`` but is older than the TTL."""
+        try:
+            return self._expired(self.path_for(key).stat().st_mtime)
+        except FileNotFoundError:
+            return False
+
+    def get(self, key: str, allow_stale: bool = False) -> bytes | None:
+        """Returns the cached body for ``key``; expired entries are only returned with ``allow_stale``."""
+        path = self._fresh_path(key, allow_stale)
+        if path is None:
+            return None
+        try:
+            with gzip.open(path, "rb") as f:
+                return f.read()
+        except (OSError, EOFError) as e:
+            self._bl.debug(f"Discarding unreadable cache entry '{path}': {e}")
+            self._remove(path)
+            return None
+
+    def iter_chunks(self, key: str, chunk_size: int = 64 * 1024, allow_stale: bool = False) -> Iterator[bytes] | None:
+        """Streams a cached body back in ``chunk_size`` pieces, or returns None on a miss."""
+        path = self._fresh_path(key, allow_stale)
+        if path is None:
+            return None
+
+        def chunks() -> Iterator[bytes]:
+            with gzip.open(path, "rb") as f:
+                while chunk := f.read(chunk_size):
+                    yield chunk
+
+        return chunks()
+
+    def put(self, key: str, body: bytes) -> None:
+        for _ in self.tee(key, [body]):
+            pass
+
+    def tee(self, key: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Passes ``chunks`` through while writing them to the cache.
+
+        The entry is committed only once the stream is fully consumed, so an
+        abandoned or failed download never leaves a truncated body behind.
+        """
+        self.base_path.mkdir(exist_ok=True, parents=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.base_path, suffix=".tmp")
+        completed = False
+        try:
+            with (
+                os.fdopen(fd, "wb") as raw,
+                gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=self.compress_level) as gz,
+            ):
+                for chunk in chunks:
+                    gz.write(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            if completed:
+                self._commit(Path(tmp_name), self.path_for(key))
+                self.evict()
+            else:
+                Path(tmp_name).unlink(missing_ok=True)
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.base_path.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+        return entries
+
+    def _commit(self, tmp: Path, path: Path) -> None:
+        """Moves a finished entry into place and adds the bytes it grew the cache by to the count."""
+        if self._total_bytes is None:
+            total = sum(size for _, size, _ in self._scan())
+            with self._lock:
+                if self._total_bytes is None:
+                    self._total_bytes = total
+        grown = self._size(tmp) - self._size(path)
+        os.replace(tmp, path)
+        with self._lock:
+            self._total_bytes += grown
+
+    def _remove(self, path: Path) -> None:
+        size = self._size(path)
+        path.unlink(missing_ok=True)
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes = max(self._total_bytes - size, 0)
+
+    def evict(self) -> int:
+        """Removes least recently used entries until the cache fits in ``max_bytes``.
+
+        Returns at once while the tracked size is within budget. Otherwise the directory is
+        scanned, which also resyncs the count with entries written by other processes.
+        """
+        with self._lock:
+            if self._total_bytes is not None and self._total_bytes <= self.max_bytes:
+                return 0
+
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        with self._lock:
+            self._total_bytes = total
+            self._evictions += removed
+        return removed
+
+    def clear(self) -> None:
+        for path in self.base_path.glob(f"*{self.SUFFIX}"):
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._total_bytes = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "bytes": self._total_bytes or 0,
+            }
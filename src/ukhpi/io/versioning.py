@@ -3,6 +3,7 @@ import re
 from pathlib import Path
 from typing import Any
 
+from ukhpi.io.formats import read_frame, write_frame
 from ukhpi.io.loader import Dataset
 from ukhpi.loggers import BasicLogger
 
@@ -12,7 +13,12 @@ class DatesNotFound(Exception):
 
 
 class FileVersion:
-    """Resolve timestamped cache files like ``{name}_{MMDDYYYY}.{ext}``."""
+    """Resolve timestamped cache files like ``{name}_{MMDDYYYY}.{ext}``.
+
+    ``legacy_extensions`` lists formats the same cache was written in before. When no file
+    with ``extension`` exists, the latest legacy file is converted to ``extension`` on first
+    lookup (keeping its date stamp) and the legacy copies are removed.
+    """
 
     def __init__(
         self,
@@ -20,13 +26,21 @@ class FileVersion:
         file_name: str,
         extension: str,
         date_fmt: str = "%m%d%Y",
+        legacy_extensions: tuple[str, ...] = (),
     ):
         self.base_path = Path(base_path)
         self.file_name = f"{file_name}_" if not file_name.endswith("_") else file_name
-        self.extension = f".{extension}" if not extension.startswith(".") else extension
+        self.extension = self._dotted(extension)
+        self.legacy_extensions = tuple(
+            ext for ext in (self._dotted(e) for e in legacy_extensions) if ext != self.extension
+        )
         self.date_fmt = date_fmt
         self._bl = BasicLogger(verbose=False, log_directory=None, logger_name="DATA_VERSION")
 
+    @staticmethod
+    def _dotted(extension: str) -> str:
+        return f".{extension}" if not extension.startswith(".") else extension
+
     def folder_exists(self) -> bool:
         self.base_path.mkdir(exist_ok=True, parents=True)
         return True
@@ -35,31 +49,37 @@ class FileVersion:
         self.folder_exists()
         return [fp for fp in self.base_path.iterdir() if fp.is_file() and self.file_name in fp.name]
 
-    def make_file_name(self) -> str:
-        stamp = datetime.datetime.now().strftime(self.date_fmt)
+    def make_file_name(self, date: datetime.datetime | None = None) -> str:
+        stamp = (date or datetime.datetime.now()).strftime(self.date_fmt)
         return f"{self.file_name}{stamp}{self.extension}"
 
-    def _fetch_dates_from_file_names(self) -> list[datetime.datetime]:
+    def _fetch_dates_from_file_names(self, extension: str | None = None) -> list[datetime.datetime]:
         if not self.file_name.endswith("_"):
             self.file_name = f"{self.file_name}_"
+        extension = extension or self.extension
 
         name_pat = re.sub(r"\(", r"\\(?", self.file_name)
         name_pat = re.sub(r"\)", r"\\)?", name_pat)
         date_pat = re.sub(r"%m|%Y|%d|%H|%M|%S", "[0-9]+", self.date_fmt)
         date_pat = re.sub(r"%b|%B", "[a-zA-Z]+", date_pat)
 
-        pattern = re.compile(rf"\b{name_pat}{date_pat}{self.extension}")
+        pattern = re.compile(rf"\b{name_pat}{date_pat}{re.escape(extension)}$")
         matches = [fp for fp in self.base_path.iterdir() if fp.is_file() and pattern.findall(fp.name)]
         if not matches:
             raise DatesNotFound("No dates found for any of the matching file names in the directory")
 
         dates = [
-            datetime.datetime.strptime(re.sub(rf"{name_pat}|\{self.extension}", "", fp.name), self.date_fmt)
+            datetime.datetime.strptime(re.sub(rf"{name_pat}|{re.escape(extension)}$", "", fp.name), self.date_fmt)
             for fp in matches
         ]
         dates.sort()
         return dates
 
+    def date_of(self, file_path: Path) -> datetime.datetime:
+        """The date stamp of one of this cache's files."""
+        file_path = Path(file_path)
+        return datetime.datetime.strptime(file_path.name[len(self.file_name) : -len(file_path.suffix)], self.date_fmt)
+
     def check_version(self) -> Any:
         self.folder_exists()
         try:
@@ -84,13 +104,37 @@ class FileVersion:
         except (ValueError, IndexError):
             return True
 
+    def _migrate_legacy(self) -> Path | None:
+        for ext in self.legacy_extensions:
+            try:
+                dates = self._fetch_dates_from_file_names(ext)
+            except DatesNotFound:
+                continue
+
+            stamp = dates[-1].strftime(self.date_fmt)
+            legacy = self.base_path / f"{self.file_name}{stamp}{ext}"
+            target = self.base_path / f"{self.file_name}{stamp}{self.extension}"
+            try:
+                write_frame(read_frame(legacy), target)
+            except Exception as e:
+                # The legacy file stays readable as it is.
+                self._bl.warning(f"Failed to migrate '{legacy.name}' to {self.extension}: {e}")
+                target.unlink(missing_ok=True)
+                return legacy
+
+            for d in dates:
+                (self.base_path / f"{self.file_name}{d.strftime(self.date_fmt)}{ext}").unlink(missing_ok=True)
+            self._bl.info(f"Migrated '{legacy.name}' to '{target.name}'")
+            return target
+        return None
+
     @property
     def latest_file_path(self) -> Path | None:
         self.folder_exists()
         try:
             dates = self._fetch_dates_from_file_names()
         except DatesNotFound:
-            return None
+            return self._migrate_legacy()
 
         latest = dates[-1].strftime(self.date_fmt)
         return self.base_path / f"{self.file_name}{latest}{self.extension}"
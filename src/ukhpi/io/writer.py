@@ -1,25 +1,35 @@
+import datetime
+from pathlib import Path
+
+from ukhpi.io.formats import write_frame
 from ukhpi.io.versioning import FileVersion
 from ukhpi.loggers import BasicLogger
 
 
 class WriteFile(FileVersion):
-    """Writes a DataFrame to a timestamped CSV within the cache directory."""
+    """Writes a DataFrame to a timestamped cache file, in the format given by the extension."""
 
     def __init__(self, data_to_write, **kwargs):
         super().__init__(**kwargs)
         self.data_to_write = data_to_write
         self._bl = BasicLogger(verbose=False, log_directory=None, logger_name="DATA_WRITER")
 
-    def write_file_to_disk(self, check_version: bool = False) -> None:
+    def write_file_to_disk(self, check_version: bool = False, date: datetime.datetime | None = None) -> Path | None:
+        """Writes the frame stamped with ``date``, today by default, replacing a file with the same stamp.
+
+        Returns the path written, or None when the write failed and was logged.
+        """
         self.folder_exists()
         if check_version:
             self.check_version()
 
-        file_path = self.base_path / self.make_file_name()
+        file_path = self.base_path / self.make_file_name(date)
         if file_path.exists():
             file_path.unlink()
 
         try:
-            self.data_to_write.to_csv(file_path, index=False)
+            write_frame(self.data_to_write, file_path)
         except Exception as e:
-            self._bl.error("Unable to write the content as csv", e)
+            self._bl.error(f"Unable to write the content as {self.extension.lstrip('.')}: {e}")
+            return None
+        return file_path
@@ -1,12 +1,8 @@
 from __future__ import annotations
 
-from pathlib import Path
-
 import pandas as pd
 
 from ukhpi.core.hpi import HousePriceIndex
-from ukhpi.io.loader import Dataset
-from ukhpi.io.versioning import FileVersion
 from ukhpi.plotting.categories import cat_plots, go, px
 
 
@@ -20,14 +16,22 @@ class HousePriceIndexPlots:
         start_year: str | int = None,
         end_year: str | int = None,
         region: str = "united-kingdom",
+        granularity: str = "month",
     ):
+        """
+        Args:
+            start_year (str | int): First year plotted; defaults to 2020.
+            end_year (str | int): Last year plotted; defaults to 2024.
+            region (str): Region name or slug.
+            granularity (str): ``"month"``, or ``"quarter"`` or ``"year"`` to plot the
+                materialised roll-ups, with 3 or 12 times fewer points.
+        """
         self._start_year = int(start_year) if start_year else 2020
         self._end_year = int(end_year) if end_year else 2024
         self._region = region.lower().replace(" ", "-") if region else "all"
+        self._granularity = granularity
         self._hpi = HousePriceIndex()
         self._hpi_df = pd.DataFrame()
-        self._file_name = f"hpi_{self._start_year}_{self._end_year}_{self._region}_"
-        self._data_path = Path(__file__).resolve().parent.parent / "cache" / "region_data"
         self._sub_title = (
             f"<br><sup>{self._region.replace('-', ' ').upper()} - {self._start_year} to {self._end_year}</sup>"
         )
@@ -45,25 +49,17 @@ class HousePriceIndexPlots:
             if col != "average_price" and not any(word in col.replace("_", " ") for word in excluded)
         ]
 
-    def _fetch_hpi_df(self) -> pd.DataFrame:
-        return self._hpi.fetch_hpi(self._start_year, self._end_year, self._region)
-
     def get_hpi_df(self) -> pd.DataFrame:
-        file = FileVersion(base_path=self._data_path, file_name=self._file_name, extension="csv")
-        file_path = file.latest_file_path
-        if file_path:
-            data = Dataset(file_path=file_path).load_data()
-        else:
-            data = file.load_latest_file(self, "_fetch_hpi_df", check_version=False)
-        if not data:
-            return pd.DataFrame()
-        return pd.DataFrame(data)
+        # A slice of the region's canonical series; plot objects built at once for the same
+        # region share its single load.
+        return self._hpi.fetch_hpi(self._start_year, self._end_year, self._region, granularity=self._granularity)
 
     @property
     def hpi_df(self) -> pd.DataFrame:
         if self._hpi_df.empty:
             df = self.get_hpi_df()
-            for col in df.columns:
+            # Series read from a columnar cache are already typed; only text columns need parsing.
+            for col in df.select_dtypes(include="object").columns:
                 try:
                     df[col] = pd.to_numeric(df[col])
                 except (ValueError, TypeError):
@@ -6,14 +6,14 @@ from pathlib import Path
 import pandas as pd
 from tqdm import tqdm
 
-from ukhpi.core.ppi import PricePaidData
+from ukhpi.core.ppi import sparq
 from ukhpi.loggers import BasicLogger
 from ukhpi.postcode_lookups.aylesbury_postcodes import load_aylesbury_postcodes
 
 _log = BasicLogger(verbose=True, log_directory=None, logger_name="AYLESBURY_PPI")
 
 
-def extract_all_aylesbury_price_paid_data() -> pd.DataFrame | None:
+def extract_all_aylesbury_price_paid_data(batch_size: int = 50) -> pd.DataFrame | None:
     _log.info("Loading aylesbury postcodes")
     aylesbury_postcodes_df = load_aylesbury_postcodes()
 
@@ -26,12 +26,14 @@ def extract_all_aylesbury_price_paid_data() -> pd.DataFrame | None:
     aylesbury_all_data: list[pd.DataFrame] = []
     n_postcodes = len(all_postcodes)
     _log.info(f"Found {n_postcodes} postcodes in Aylesbury")
-    for postcode in tqdm(all_postcodes, desc="Processing postcode", total=n_postcodes):
-        postcode_data = PricePaidData(postcode=postcode)
-        postcode_df = postcode_data.data_for_postcode
-        if postcode_df is None or postcode_df.empty:
-            continue
-        aylesbury_all_data.append(postcode_df)
+    # Hand the fetcher several batches at a time so they run concurrently, while the bar still advances.
+    step = batch_size * 8
+    with tqdm(desc="Processing postcode", total=n_postcodes) as progress:
+        for i in range(0, n_postcodes, step):
+            chunk = all_postcodes[i : i + step]
+            frames = sparq.fetch_price_paid_for_postcodes(chunk, batch_size=batch_size)
+            aylesbury_all_data.extend(df for df in frames.values() if df is not None and not df.empty)
+            progress.update(len(chunk))
 
     if not aylesbury_all_data:
         return None
@@ -50,9 +52,10 @@ def make_db_of_results(
     db_directory: Path = DEFAULT_DB_DIRECTORY,
     db_name: str = DEFAULT_DB_NAME,
     table_name: str = DEFAULT_TABLE_NAME,
+    batch_size: int = 50,
 ) -> Path | None:
     _log.info("Making db of results")
-    aylesbury_all_data_df = extract_all_aylesbury_price_paid_data()
+    aylesbury_all_data_df = extract_all_aylesbury_price_paid_data(batch_size=batch_size)
 
     if aylesbury_all_data_df is None or aylesbury_all_data_df.empty:
         return None
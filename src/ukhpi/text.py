@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 
 
 def split_camel_case(s: str) -> list[str]:
@@ -12,6 +13,7 @@ def split_camel_case(s: str) -> list[str]:
     return re.split(regex, s)
 
 
+@lru_cache(maxsize=1024)
 def make_snake_from_camel(camel_str: str) -> str:
     fragments = split_camel_case(camel_str)
     if not fragments:
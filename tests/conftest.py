@@ -2,8 +2,96 @@
 
 from __future__ import annotations
 
+import threading
+import time
+
 import pytest
 
+from ukhpi.core.transport import TransportError
+from ukhpi.io.frame_cache import FrameCache
+from ukhpi.io.hpi_store import HpiStore
+from ukhpi.io.query_cache import QueryCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_query_cache(tmp_path, monkeypatch):
+    """Point the process-wide raw SPARQL response cache at a per-test directory."""
+    cache = QueryCache(base_path=tmp_path / "sparql_data")
+    monkeypatch.setattr(QueryCache, "_shared", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_frame_cache(monkeypatch):
+    """Give every test an empty process-wide frame cache."""
+    cache = FrameCache()
+    monkeypatch.setattr(FrameCache, "_shared", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_hpi_store(tmp_path_factory, monkeypatch):
+    """Point the process-wide HPI store at a per-test database."""
+    store = HpiStore(db_path=tmp_path_factory.mktemp("hpi_store") / "hpi.db")
+    monkeypatch.setattr(HpiStore, "_shared", store)
+    return store
+
+
+class FakeResponse:
+    """A response whose body is served whole as ``content`` or in ``chunk_size`` pieces."""
+
+    def __init__(self, body: bytes, chunk_size: int | None = None):
+        self.content = body
+        self.chunk_size = chunk_size
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        size = self.chunk_size or chunk_size
+        return (self.content[i : i + size] for i in range(0, len(self.content), size))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTransport:
+    """Stands in for ``HttpTransport``, recording every request and answering each with ``body``.
+
+    Args:
+        body (bytes): Response body.
+        fail (bool): Raise ``TransportError`` instead of answering.
+        delay (float): Seconds each request takes.
+        chunk_size (int | None): Size of the streamed pieces; the caller's chunk size when None.
+    """
+
+    def __init__(self, body: bytes = b"", fail: bool = False, delay: float = 0.0, chunk_size: int | None = None):
+        self.body = body
+        self.fail = fail
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.requests: list[dict] = []
+        self.responses: list[FakeResponse] = []
+        self.done = threading.Event()
+
+    @property
+    def calls(self) -> int:
+        return len(self.requests)
+
+    def post(self, url, data, headers=None, timeout=None, stream=False, limiter=None):
+        self.requests.append({"url": url, "data": data, "headers": headers or {}, "stream": stream})
+        time.sleep(self.delay)
+        if self.fail:
+            raise TransportError("endpoint down")
+        response = FakeResponse(self.body, self.chunk_size)
+        self.responses.append(response)
+        self.done.set()
+        return response
+
+
+@pytest.fixture
+def fake_transport():
+    """Factory for a fake SPARQL transport; see ``FakeTransport`` for the options."""
+    return FakeTransport
+
 
 @pytest.fixture
 def fake_sparql_bindings():
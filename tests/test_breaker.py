@@ -0,0 +1,92 @@
+"""Tests for the circuit breaker and stale-while-revalidate serving."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import pytest
+
+from ukhpi.core.breaker import CircuitBreaker, CircuitOpenError
+from ukhpi.core.sparql import SparqlQuery
+from ukhpi.core.transport import TransportError
+
+_QUERY = "SELECT ?x WHERE { ?x ?y ?z }"
+
+
+def _body(value):
+    return json.dumps({"head": {"vars": ["x"]}, "results": {"bindings": [{"x": {"value": value}}]}}).encode()
+
+
+def test_breaker_opens_after_consecutive_failures_and_half_opens_after_cooldown():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()  # the single half-open trial
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats["rejected"] == 2
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_open_circuit_fails_fast_without_touching_the_endpoint(fake_transport):
+    transport = fake_transport(fail=True)
+    sq = SparqlQuery(transport=transport, use_cache=False, breaker=CircuitBreaker(failure_threshold=2, cooldown=60))
+
+    for _ in range(2):
+        with pytest.raises(TransportError):
+            sq.fetch_sparql_query(_QUERY)
+    with pytest.raises(CircuitOpenError):
+        sq.fetch_sparql_query(_QUERY)
+
+    assert transport.calls == 2
+    assert sq.breaker_stats["state"] == CircuitBreaker.OPEN
+
+
+def test_stale_entries_are_served_at_once_and_refreshed_in_the_background(isolated_query_cache, fake_transport):
+    transport = fake_transport(body=_body("fresh"), delay=0.2)
+    sq = SparqlQuery(transport=transport, breaker=CircuitBreaker(), stale_while_revalidate=True)
+    key = isolated_query_cache.key(sq.endpoint_url, sq._prepare_query(_QUERY))
+    isolated_query_cache.put(key, _body("stale"))
+    old = time.time() - 2 * isolated_query_cache.ttl_seconds
+    os.utime(isolated_query_cache.path_for(key), (old, old))
+
+    began = time.monotonic()
+    result = sq.fetch_sparql_query(_QUERY)
+
+    assert time.monotonic() - began < 0.1
+    assert result["results"]["bindings"][0]["x"]["value"] == "stale"
+    assert transport.done.wait(timeout=2)
+    for _ in range(50):
+        if not isolated_query_cache.is_stale(key):
+            break
+        time.sleep(0.02)
+    assert sq.fetch_sparql_query(_QUERY)["results"]["bindings"][0]["x"]["value"] == "fresh"
+    assert transport.calls == 1
+
+
+def test_stale_entries_are_misses_without_stale_while_revalidate(isolated_query_cache, fake_transport):
+    transport = fake_transport(body=_body("fresh"))
+    sq = SparqlQuery(transport=transport, breaker=CircuitBreaker())
+    key = isolated_query_cache.key(sq.endpoint_url, sq._prepare_query(_QUERY))
+    isolated_query_cache.put(key, _body("stale"))
+    old = time.time() - 2 * isolated_query_cache.ttl_seconds
+    os.utime(isolated_query_cache.path_for(key), (old, old))
+
+    assert sq.fetch_sparql_query(_QUERY)["results"]["bindings"][0]["x"]["value"] == "fresh"
+    assert transport.calls == 1
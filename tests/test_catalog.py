@@ -0,0 +1,147 @@
+"""Tests for the versioned region catalog (ukhpi.core.catalog)."""
+
+from __future__ import annotations
+
+import datetime
+import json
+import threading
+
+import pandas as pd
+
+from ukhpi.core.catalog import SNAPSHOT_PATH, RegionCatalog, write_snapshot
+from ukhpi.core.sparql import SparqlQuery
+
+
+def _regions(*slugs):
+    return pd.DataFrame(
+        {
+            "ref_region": [f"http://landregistry.data.gov.uk/id/region/{s}" for s in slugs],
+            "region_label": [s.title() for s in slugs],
+            "region_type": ["http://example.org/Country"] * len(slugs),
+            "ref_region_keyword": list(slugs),
+            "ref_region_type_keyword": ["Country"] * len(slugs),
+        }
+    )
+
+
+def _failing_fetch():
+    raise AssertionError("the endpoint must not be queried")
+
+
+def test_bundled_snapshot_is_a_readable_seed():
+    payload = json.loads(SNAPSHOT_PATH.read_text(encoding="utf-8"))
+    catalog = RegionCatalog(fetch=_failing_fetch, cache_path=SNAPSHOT_PATH.parent / "missing")
+
+    assert datetime.date.fromisoformat(payload["version"])
+    assert "england" in set(catalog.frame["ref_region_keyword"])
+    assert catalog.complete is payload["complete"]
+    if not payload["complete"]:
+        # The placeholder seed carries no region types rather than invented ones.
+        assert catalog.frame["ref_region_type_keyword"].isna().all()
+
+
+def test_complete_snapshot_loads_without_touching_the_endpoint(tmp_path):
+    snapshot = write_snapshot(_regions("england", "wales"), tmp_path / "snapshot.json")
+    catalog = RegionCatalog(fetch=_failing_fetch, snapshot_path=snapshot, cache_path=tmp_path / "region_data")
+
+    assert catalog.complete
+    assert not catalog.is_stale
+    assert list(catalog.frame["ref_region_keyword"]) == ["england", "wales"]
+    assert catalog.refresh_in_background() is None
+
+
+def test_refresh_persists_and_swaps_in_the_new_catalog(tmp_path):
+    snapshot = write_snapshot(_regions("england"), tmp_path / "snapshot.json")
+    catalog = RegionCatalog(
+        fetch=lambda: _regions("england", "scotland"), snapshot_path=snapshot, cache_path=tmp_path / "region_data"
+    )
+    assert len(catalog.frame) == 1
+
+    catalog.refresh_in_background(force=True).join(timeout=5)
+
+    assert list(catalog.frame["ref_region_keyword"]) == ["england", "scotland"]
+    assert len(list((tmp_path / "region_data").glob("hpi_regions_*.csv"))) == 1
+    # A fresh process picks the refreshed catalog over the older bundled one.
+    reloaded = RegionCatalog(fetch=_failing_fetch, snapshot_path=snapshot, cache_path=tmp_path / "region_data")
+    assert len(reloaded.frame) == 2
+
+
+def test_failed_refresh_keeps_the_catalog_in_use(tmp_path):
+    snapshot = write_snapshot(_regions("england"), tmp_path / "snapshot.json")
+
+    def down():
+        raise ConnectionError("endpoint down")
+
+    catalog = RegionCatalog(fetch=down, snapshot_path=snapshot, cache_path=tmp_path / "region_data")
+
+    assert list(catalog.refresh()["ref_region_keyword"]) == ["england"]
+
+
+def test_complete_hpi_regions_builds_the_full_catalog_once_when_only_a_seed_is_bundled(monkeypatch, tmp_path):
+    seed = tmp_path / "seed.json"
+    seed.write_text(json.dumps({"version": "2026-01-01", "complete": False, "regions": []}))
+    calls = []
+    barrier = threading.Barrier(4)
+
+    def fetch():
+        calls.append(1)
+        return _regions("england", "wales")
+
+    catalog = RegionCatalog(fetch=fetch, snapshot_path=seed, cache_path=tmp_path / "region_data")
+    monkeypatch.setitem(SparqlQuery._region_catalogs, SparqlQuery().endpoint_url, catalog)
+
+    def load():
+        barrier.wait()
+        return SparqlQuery().hpi_regions(complete=True)
+
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert list(SparqlQuery().hpi_regions(complete=True)["ref_region_keyword"]) == ["england", "wales"]
+
+
+def test_hpi_regions_serves_the_seed_at_once_and_refreshes_in_the_background(monkeypatch, tmp_path):
+    seed = write_snapshot(_regions("england"), tmp_path / "seed.json")
+    payload = json.loads(seed.read_text())
+    seed.write_text(json.dumps({**payload, "complete": False}))
+    release = threading.Event()
+
+    def slow_fetch():
+        release.wait(timeout=5)
+        return _regions("england", "wales")
+
+    catalog = RegionCatalog(fetch=slow_fetch, snapshot_path=seed, cache_path=tmp_path / "region_data")
+    monkeypatch.setitem(SparqlQuery._region_catalogs, SparqlQuery().endpoint_url, catalog)
+
+    assert list(SparqlQuery().HPI_REGIONS["ref_region_keyword"]) == ["england"]
+    release.set()
+    catalog._refresh_thread.join(timeout=5)
+    assert list(SparqlQuery().HPI_REGIONS["ref_region_keyword"]) == ["england", "wales"]
+
+
+def test_failed_background_refreshes_are_not_retried_on_every_read(tmp_path):
+    snapshot = write_snapshot(_regions("england"), tmp_path / "snapshot.json")
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise ConnectionError("endpoint down")
+
+    catalog = RegionCatalog(fetch=down, snapshot_path=snapshot, cache_path=tmp_path / "region_data", max_age_days=-1)
+
+    catalog.refresh_in_background().join(timeout=5)
+    assert catalog.refresh_in_background() is None
+    assert len(calls) == 1
+
+
+def test_each_endpoint_gets_its_own_region_catalog(monkeypatch):
+    monkeypatch.setattr(SparqlQuery, "_region_catalogs", {})
+    live, standin = SparqlQuery(), SparqlQuery(endpoint_url="http://127.0.0.1:8890/landregistry/query")
+
+    assert live.region_catalog is SparqlQuery().region_catalog
+    assert standin.region_catalog is not live.region_catalog
+    assert standin.region_catalog._file.base_path != live.region_catalog._file.base_path
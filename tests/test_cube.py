@@ -0,0 +1,82 @@
+"""Tests for the memory-mapped HPI cube (ukhpi.core.cube)."""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ukhpi.core.cube import HpiCube
+
+
+def _series(region, months, price):
+    return pd.DataFrame(
+        {
+            "ref_region": f"http://landregistry.data.gov.uk/id/region/{region}",
+            "ref_period_start": pd.to_datetime([f"{m}-01" for m in months]),
+            "ref_month": months,
+            "average_price": [price + i for i in range(len(months))],
+            "sales_volume": [10] * len(months),
+        }
+    )
+
+
+@pytest.fixture
+def cube(tmp_path):
+    hpi_path = tmp_path / "hpi_data"
+    hpi_path.mkdir()
+    _series("east-of-england", ["2023-01", "2023-02", "2023-03"], 300.0).to_csv(
+        hpi_path / "east_of_england_hpi_01012024.csv", index=False
+    )
+    _series("wales", ["2023-02", "2023-04"], 200.0).to_csv(hpi_path / "wales_hpi_01012024.csv", index=False)
+    (hpi_path / "wales_2023_2023_hpi_01012024.csv").write_text("ignored\n")
+    return HpiCube.build(hpi_path=hpi_path, path=tmp_path / "cube")
+
+
+def test_build_packs_every_region_onto_a_dense_month_axis(cube):
+    assert cube.regions == ["east-of-england", "wales"]
+    assert cube.months == ["2023-01", "2023-02", "2023-03", "2023-04"]
+    assert isinstance(cube.data, np.memmap) and cube.data.dtype == np.float32
+    assert cube.data.shape == (2, 4, len(cube.metrics))
+
+
+def test_slices_along_each_axis(cube):
+    assert cube.value("East of England", "2023-03", "average_price") == 302.0
+
+    cross = cube.cross_section("average_price", "2023-02")
+    assert cross.to_dict() == {"east-of-england": 301.0, "wales": 200.0}
+
+    series = cube.series("wales", "average_price")
+    assert series["2023-04"] == 201.0
+    assert math.isnan(series["2023-01"]) and math.isnan(series["2023-03"])
+
+    snapshot = cube.snapshot("wales", pd.Timestamp("2023-02-01"))
+    assert snapshot["sales_volume"] == 10.0
+    assert math.isnan(snapshot["house_price_index"])
+
+    assert cube.panel("sales_volume").shape == (2, 4)
+
+
+def test_reopening_reads_the_same_mapping(cube):
+    reopened = HpiCube(cube.path)
+    assert reopened.version == cube.version
+    assert np.array_equal(reopened.data, cube.data, equal_nan=True)
+    with pytest.raises(KeyError, match="Unknown region"):
+        reopened.series("atlantis", "average_price")
+
+
+def test_empty_cache_builds_an_empty_cube(tmp_path):
+    cube = HpiCube.build(hpi_path=tmp_path / "hpi_data", path=tmp_path / "cube")
+    assert cube.regions == [] and cube.data.shape[0] == 0
+
+
+def test_rebuild_swaps_in_a_new_data_file(cube, tmp_path):
+    first = cube.path / f"hpi_cube_{cube.version}.f32"
+    rebuilt = HpiCube.build(hpi_path=tmp_path / "hpi_data", path=cube.path)
+
+    assert rebuilt.version != cube.version
+    assert not first.exists()
+    assert [p.name for p in cube.path.glob("*.f32")] == [f"hpi_cube_{rebuilt.version}.f32"]
+    assert rebuilt.value("wales", "2023-04", "average_price") == 201.0
@@ -4,7 +4,9 @@ import pandas as pd
 import pytest
 
 import ukhpi.core.collection as collection_module
-from ukhpi.core.collection import DEFAULT_DATA_PATH, DataCollection, build_parser, main
+import ukhpi.core.hpi as hpi_module
+from ukhpi.core.collection import DEFAULT_DATA_PATH, CollectionManifest, DataCollection, build_parser, main
+from ukhpi.io.formats import CACHE_EXTENSION, write_frame
 
 
 def test_parser_defaults():
@@ -44,10 +46,12 @@ def test_main_instantiates_data_collection(monkeypatch, tmp_path):
     calls = {}
 
     class StubCollection:
-        def __init__(self, data_path, start_year, end_year):
+        def __init__(self, data_path, start_year, end_year, chunk_size, **options):
             calls["data_path"] = Path(data_path)
             calls["start_year"] = start_year
             calls["end_year"] = end_year
+            calls["chunk_size"] = chunk_size
+            calls["options"] = options
 
         def collect_data(self):
             calls["collected"] = True
@@ -60,6 +64,8 @@ def test_main_instantiates_data_collection(monkeypatch, tmp_path):
     assert calls["data_path"] == tmp_path
     assert calls["start_year"] == 2022
     assert calls["end_year"] == 2022
+    assert calls["chunk_size"] == 25
+    assert calls["options"] == {"resume": False, "only_failed": False, "retries": 3, "backoff": 2.0}
     assert calls["collected"] is True
 
 
@@ -68,22 +74,164 @@ def test_collect_data_concats_successful_fetches_and_counts_failures(monkeypatch
     and failures are counted without aborting the run.
     """
     regions_df = pd.DataFrame({"ref_region_keyword": ["england", "wales", "scotland", "northern-ireland"]})
-    monkeypatch.setattr(
-        collection_module.SparqlQuery,
-        "HPI_REGIONS",
-        property(lambda _self: regions_df),
-    )
+    monkeypatch.setattr(collection_module.SparqlQuery, "hpi_regions", lambda _self, complete=False: regions_df)
 
-    def fake_fetch(_self, start_year, end_year, region):
-        if region == "scotland":
+    batches = []
+
+    def fake_fetch_for_regions(_self, start_year, end_year, regions, chunk_size, **options):
+        batches.append(list(regions))
+        if "scotland" in regions:
             raise RuntimeError("boom")
-        return pd.DataFrame({"region": [region], "average_price": [100000], "ref_period_start": ["2023-01-01"]})
+        return {
+            region: pd.DataFrame({"region": [region], "average_price": [100000], "ref_period_start": ["2023-01-01"]})
+            for region in regions
+        }
 
-    monkeypatch.setattr(collection_module.HousePriceIndex, "fetch_hpi", fake_fetch)
+    monkeypatch.setattr(collection_module.HousePriceIndex, "fetch_hpi_for_regions", fake_fetch_for_regions)
 
-    dc = DataCollection(data_path=tmp_path, start_year=2023, end_year=2023, verbose=False)
+    dc = DataCollection(data_path=tmp_path, start_year=2023, end_year=2023, verbose=False, chunk_size=1, retries=0)
     result = dc.collect_data()
 
     assert isinstance(result, pd.DataFrame)
     assert len(result) == 3  # england, wales, northern-ireland
     assert set(result["region"]) == {"england", "wales", "northern-ireland"}
+    assert sorted(len(batch) for batch in batches) == [1, 1, 1, 1]
+
+
+def test_collect_data_batches_regions_into_chunks(monkeypatch, tmp_path):
+    regions_df = pd.DataFrame({"ref_region_keyword": [f"region-{i}" for i in range(7)]})
+    monkeypatch.setattr(collection_module.SparqlQuery, "hpi_regions", lambda _self, complete=False: regions_df)
+    batches = []
+
+    def fake_fetch_for_regions(_self, start_year, end_year, regions, chunk_size, **options):
+        batches.append(list(regions))
+        return {region: pd.DataFrame({"region": [region]}) for region in regions}
+
+    monkeypatch.setattr(collection_module.HousePriceIndex, "fetch_hpi_for_regions", fake_fetch_for_regions)
+
+    result = DataCollection(data_path=tmp_path, verbose=False, chunk_size=3).collect_data()
+
+    assert len(result) == 7
+    assert sorted(len(batch) for batch in batches) == [1, 3, 3]
+
+
+def test_main_builds_the_cube_from_the_collected_series(monkeypatch, tmp_path):
+    built = {}
+
+    class StubCollection:
+        def __init__(self, data_path, start_year, end_year, chunk_size, **options):
+            pass
+
+        def collect_data(self):
+            return None
+
+    monkeypatch.setattr("ukhpi.core.collection.DataCollection", StubCollection)
+    monkeypatch.setattr(collection_module.HpiCube, "build", lambda hpi_path: built.setdefault("path", hpi_path))
+
+    main(["--data-path", str(tmp_path), "--build-cube"])
+
+    assert built["path"] == tmp_path
+
+
+def _stub_regions_and_fetch(monkeypatch, regions, failures):
+    """Fetches succeed and write a cache file, except while ``failures[region]`` is positive."""
+    sleeps, batches = [], []
+    monkeypatch.setattr(
+        collection_module.SparqlQuery,
+        "hpi_regions",
+        lambda _self, complete=False: pd.DataFrame({"ref_region_keyword": regions}),
+    )
+    monkeypatch.setattr(collection_module.time, "sleep", lambda s: sleeps.append(s))
+
+    def fake_fetch_for_regions(_self, start_year, end_year, regions, chunk_size, **options):
+        batches.append(list(regions))
+        frames = {}
+        for region in regions:
+            if failures.get(region, 0) > 0:
+                failures[region] -= 1
+                continue
+            file = _self._hpi_file(region)
+            (file.base_path / file.make_file_name()).write_text("ref_period_start\n2023-06-01\n")
+            frames[region] = pd.DataFrame({"ref_period_start": ["2023-05-01", "2023-06-01"]})
+        return frames
+
+    monkeypatch.setattr(collection_module.HousePriceIndex, "fetch_hpi_for_regions", fake_fetch_for_regions)
+    return sleeps, batches
+
+
+def test_collect_data_retries_failures_with_backoff_and_checkpoints_a_manifest(monkeypatch, tmp_path):
+    sleeps, batches = _stub_regions_and_fetch(monkeypatch, ["england", "wales"], {"wales": 2})
+
+    DataCollection(data_path=tmp_path, start_year=2023, end_year=2023, verbose=False, chunk_size=5).collect_data()
+
+    assert batches == [["england", "wales"], ["wales"], ["wales"]]
+    assert sleeps == [2.0, 4.0]
+    manifest = CollectionManifest(tmp_path / CollectionManifest.FILE_NAME, 2023, 2023)
+    assert manifest.regions["wales"]["status"] == "ok"
+    assert manifest.regions["wales"]["attempts"] == 3
+    assert manifest.regions["england"]["rows"] == 2
+    assert manifest.regions["england"]["watermark"] == "2023-06-01"
+
+    # Rerunning the same day fetches nothing.
+    DataCollection(data_path=tmp_path, start_year=2023, end_year=2023, verbose=False).collect_data()
+    assert len(batches) == 3
+
+
+def test_only_failed_and_resume_select_regions_from_the_manifest(monkeypatch, tmp_path):
+    failures = {"scotland": 1}
+    _, batches = _stub_regions_and_fetch(monkeypatch, ["england", "scotland", "wales"], failures)
+    options = dict(data_path=tmp_path, start_year=2023, end_year=2023, verbose=False, chunk_size=1, retries=0)
+
+    DataCollection(**options).collect_data()
+    assert CollectionManifest(tmp_path / CollectionManifest.FILE_NAME, 2023, 2023).status("scotland") == "failed"
+
+    batches.clear()
+    DataCollection(**options, only_failed=True).collect_data()
+    assert batches == [["scotland"]]
+
+    # Entries collected on an earlier day are refetched by default, but not when resuming.
+    manifest = CollectionManifest(tmp_path / CollectionManifest.FILE_NAME, 2023, 2023)
+    manifest.regions["wales"]["updated"] = "2000-01-01T00:00:00"
+    manifest.save()
+    batches.clear()
+    DataCollection(**options, resume=True).collect_data()
+    assert batches == []
+    DataCollection(**options).collect_data()
+    assert batches == [["wales"]]
+
+
+def test_parser_resume_and_only_failed_are_exclusive(capsys):
+    assert build_parser().parse_args(["--resume"]).resume is True
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["--resume", "--only-failed"])
+
+
+def test_stale_regions_are_delta_refreshed_and_chunk_errors_reach_the_manifest(monkeypatch, tmp_path):
+    yesterday = (pd.Timestamp.now() - pd.Timedelta(days=1)).strftime("%m%d%Y")
+    cached = pd.DataFrame({"ref_period_start": pd.to_datetime(["2023-05-01"]), "average_price": [100.0]})
+    write_frame(cached, tmp_path / f"england_hpi_{yesterday}{CACHE_EXTENSION}")
+    monkeypatch.setattr(
+        collection_module.SparqlQuery,
+        "hpi_regions",
+        lambda _self, complete=False: pd.DataFrame({"ref_region_keyword": ["england", "wales"]}),
+    )
+    deltas = []
+
+    def fake_delta(query):
+        deltas.append(query)
+        return pd.DataFrame({"ref_period_start": pd.to_datetime(["2023-06-01"]), "average_price": [110.0]})
+
+    def down(build_query, start_year, end_year):
+        raise RuntimeError("endpoint timed out")
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_frame", fake_delta)
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_window", down)
+
+    DataCollection(data_path=tmp_path, start_year=2023, end_year=2023, verbose=False, retries=0).collect_data()
+
+    manifest = CollectionManifest(tmp_path / CollectionManifest.FILE_NAME, 2023, 2023)
+    assert len(deltas) == 1
+    assert manifest.regions["england"]["status"] == "ok"
+    assert manifest.regions["england"]["watermark"] == "2023-06-01"
+    assert manifest.regions["wales"]["status"] == "failed"
+    assert manifest.regions["wales"]["error"] == "RuntimeError: endpoint timed out"
@@ -1,6 +1,11 @@
 import datetime
 
+import pandas as pd
+import pytest
+
+from ukhpi.io.loader import Dataset
 from ukhpi.io.versioning import FileVersion
+from ukhpi.io.writer import WriteFile
 
 
 def test_make_file_name_appends_today_and_extension(tmp_path):
@@ -38,3 +43,39 @@ def test_latest_file_path_returns_newest(tmp_path):
 def test_latest_file_path_returns_none_when_empty(tmp_path):
     fv = FileVersion(base_path=tmp_path, file_name="hpi", extension="csv")
     assert fv.latest_file_path is None
+
+
+def test_legacy_csv_is_migrated_to_parquet_on_lookup(tmp_path):
+    pytest.importorskip("pyarrow")
+    pd.DataFrame({"ref_period_start": ["2023-01-01"], "Average Price": [250000.5]}).to_csv(
+        tmp_path / "hpi_06152024.csv", index=False
+    )
+    (tmp_path / "hpi_01012023.csv").write_text("x\n1\n")
+    fv = FileVersion(base_path=tmp_path, file_name="hpi", extension="parquet", legacy_extensions=("csv",))
+
+    latest = fv.latest_file_path
+
+    assert latest.name == "hpi_06152024.parquet"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["hpi_06152024.parquet"]
+    df = Dataset(file_path=latest).load_frame()
+    assert df["average_price"].dtype == "float64"
+    assert Dataset(file_path=latest).load_data() == [{"ref_period_start": "2023-01-01", "average_price": 250000.5}]
+
+
+def test_write_file_round_trips_dtypes_through_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame(
+        {
+            "ref_period_start": pd.to_datetime(["2023-01-01", "2023-02-01"]),
+            "average_price": [250000.0, 260000.0],
+            "sales_volume": [10, 12],
+            "region": pd.Categorical(["england", "england"]),
+            "mixed": ["a", 1],
+        }
+    )
+    WriteFile(data_to_write=df, base_path=tmp_path, file_name="hpi", extension="parquet").write_file_to_disk()
+
+    loaded = Dataset(file_path=FileVersion(tmp_path, "hpi", "parquet").latest_file_path).load_frame()
+
+    assert loaded.dtypes.drop("mixed").equals(df.dtypes.drop("mixed"))
+    assert loaded["mixed"].tolist() == ["a", "1"]
@@ -0,0 +1,126 @@
+"""Tests for the derived-metric engine (ukhpi.core.derived)."""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ukhpi.core.derived as derived_module
+from ukhpi.core.cube import HpiCube
+from ukhpi.core.derived import DerivedMetrics
+from ukhpi.io.formats import CACHE_EXTENSION, write_frame
+
+MONTHS = [f"2023-{m:02d}" for m in range(1, 7)]
+
+
+def _write_series(hpi_path, region, prices, stamp="01012024"):
+    frame = pd.DataFrame(
+        {
+            "ref_region": f"http://landregistry.data.gov.uk/id/region/{region}",
+            "ref_period_start": pd.to_datetime([f"{m}-01" for m in MONTHS]),
+            "average_price": prices,
+        }
+    )
+    write_frame(frame, hpi_path / f"{region.replace('-', '_')}_hpi_{stamp}{CACHE_EXTENSION}")
+
+
+@pytest.fixture
+def paths(tmp_path):
+    hpi_path = tmp_path / "hpi_data"
+    hpi_path.mkdir()
+    _write_series(hpi_path, "england", [100.0, 110.0, 121.0, 133.1, 146.41, 161.051])
+    _write_series(hpi_path, "wales", [200.0, 200.0, np.nan, 220.0, 230.0, 240.0])
+    HpiCube.build(hpi_path=hpi_path, path=tmp_path / "cube")
+    return hpi_path, tmp_path / "cube"
+
+
+def test_metrics_are_computed_for_every_region_in_one_pass(paths):
+    metrics = DerivedMetrics(paths[1])
+
+    rebased = metrics.rebased("average_price", "2023-02")
+    assert rebased.index.tolist() == ["england", "wales"]
+    assert rebased.loc["england", "2023-02"] == 100.0
+    assert rebased.loc["england", "2023-03"] == pytest.approx(110.0)
+
+    mom = metrics.change("average_price")
+    assert mom.loc["england", ["2023-02", "2023-06"]].tolist() == pytest.approx([10.0, 10.0])
+    assert metrics.change("average_price", relative=False).loc["wales", "2023-05"] == 10.0
+
+    rolling = metrics.rolling_mean("average_price", window=3)
+    assert np.isnan(rolling.loc["england", "2023-02"])
+    assert rolling.loc["england", "2023-03"] == pytest.approx(110.333, abs=1e-3)
+    # A gap leaves every window that spans it empty.
+    assert rolling.loc["wales"].isna().tolist() == [True, True, True, True, True, False]
+
+
+def test_cumulative_change_and_real_terms(paths):
+    metrics = DerivedMetrics(paths[1])
+
+    window = metrics.cumulative_change("average_price", "2023-02", pd.Timestamp("2023-04-01"))
+    assert window.columns.tolist() == ["2023-02", "2023-03", "2023-04"]
+    assert window.loc["wales"].tolist()[::2] == pytest.approx([0.0, 10.0])
+
+    cpi = pd.Series([100.0, 100.0, 100.0, 100.0, 125.0], index=pd.period_range("2023-01", periods=5, freq="M"))
+    real = metrics.real_terms("average_price", cpi)
+    assert real.loc["wales", "2023-01"] == 250.0
+    assert real.loc["wales", "2023-05"] == 230.0
+    assert np.isnan(real.loc["wales", "2023-06"])
+
+
+def test_results_are_cached_until_the_cube_is_rebuilt(paths, monkeypatch):
+    hpi_path, cube_path = paths
+    calls = []
+    original = derived_module.rebase
+    monkeypatch.setattr(derived_module, "rebase", lambda *a: calls.append(1) or original(*a))
+    metrics = DerivedMetrics(cube_path)
+
+    first = metrics.rebased("average_price", "2023-01")
+    first.iloc[:] = 0.0
+    assert metrics.rebased("average_price", "2023-01").loc["england", "2023-02"] == pytest.approx(110.0)
+    assert len(calls) == 1
+
+    _write_series(hpi_path, "england", [100.0, 150.0, 121.0, 133.1, 146.41, 161.051], stamp="02012024")
+    HpiCube.build(hpi_path=hpi_path, path=cube_path)
+
+    assert metrics.rebased("average_price", "2023-01").loc["england", "2023-02"] == 150.0
+    assert len(calls) == 2
+
+
+def test_series_written_after_the_build_rebuild_the_cube_and_invalidate_results(paths):
+    hpi_path, cube_path = paths
+    metrics = DerivedMetrics(cube_path, source_check_interval=0)
+    assert metrics.rebased("average_price", "2023-01").loc["england", "2023-02"] == pytest.approx(110.0)
+    version = metrics.cube.version
+
+    # A delta refresh rewrites today's series file without rebuilding the cube.
+    _write_series(hpi_path, "england", [100.0, 150.0, 121.0, 133.1, 146.41, 161.051], stamp="02012024")
+
+    assert metrics.rebased("average_price", "2023-01").loc["england", "2023-02"] == 150.0
+    assert metrics.cube.version != version
+    assert HpiCube(cube_path).source_version == metrics.cube.source_version
+
+
+def test_real_terms_rejects_a_base_month_the_deflator_does_not_cover(paths):
+    cpi = pd.Series([100.0, 110.0], index=["2023-01", "2023-02"])
+
+    with pytest.raises(ValueError, match="2023-06"):
+        DerivedMetrics(paths[1]).real_terms("average_price", cpi, base_month="2023-06")
+
+
+def test_the_series_directory_is_listed_only_when_its_mtime_moves(paths, monkeypatch):
+    hpi_path, cube_path = paths
+    listings = []
+    original = derived_module.source_version
+    monkeypatch.setattr(derived_module, "source_version", lambda p: listings.append(p) or original(p))
+    metrics = DerivedMetrics(cube_path, source_check_interval=60)
+
+    for _ in range(3):
+        metrics.rebased("average_price", "2023-01")
+    assert len(listings) == 1
+
+    os.utime(hpi_path, ns=(0, hpi_path.stat().st_mtime_ns + 1))
+    metrics.rebased("average_price", "2023-01")
+    assert len(listings) == 2
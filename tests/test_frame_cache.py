@@ -0,0 +1,73 @@
+"""Tests for the in-memory DataFrame LRU (ukhpi.io.frame_cache)."""
+
+from __future__ import annotations
+
+import pandas as pd
+
+import ukhpi.core.hpi as hpi_module
+from ukhpi.core.hpi import HousePriceIndex
+from ukhpi.io.frame_cache import FrameCache
+from ukhpi.io.loader import Dataset
+
+
+def _frame(rows):
+    return pd.DataFrame({"value": range(rows)})
+
+
+def _nbytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def test_least_recently_used_frames_are_evicted_past_the_byte_budget():
+    a, b, c = _frame(100), _frame(100), _frame(100)
+    cache = FrameCache(max_bytes=2 * _nbytes(a))
+    cache.put("a", a)
+    cache.put("b", b)
+    assert cache.get("a") is a  # "b" is now least recently used
+
+    cache.put("c", c)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is a and cache.get("c") is c
+    assert cache.stats == {
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+        "entries": 2,
+        "bytes": 2 * _nbytes(a),
+        "max_bytes": 2 * _nbytes(a),
+    }
+
+
+def test_frames_larger_than_the_budget_are_not_cached():
+    cache = FrameCache(max_bytes=_nbytes(_frame(10)))
+    cache.put("big", _frame(1000))
+    assert cache.get("big") is None
+    assert cache.stats["bytes"] == 0
+
+
+def test_shrinking_the_budget_evicts_and_versions_are_kept():
+    cache = FrameCache()
+    cache.put("a", _frame(100), version=2024)
+    cache.put("b", _frame(100), version=2025)
+
+    cache.max_bytes = _nbytes(_frame(100))
+
+    assert cache.lookup("a") is None
+    assert cache.lookup("b")[1] == 2025
+
+
+def test_repeat_renders_skip_disk(monkeypatch, tmp_path, fake_sparql_bindings):
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", lambda q: fake_sparql_bindings)
+    monkeypatch.setattr(hpi_module.sparqlquery, "years_per_shard", None)
+    reads = []
+    load_frame = Dataset.load_frame
+    monkeypatch.setattr(Dataset, "load_frame", lambda self: reads.append(self.file_path) or load_frame(self))
+
+    for _ in range(3):
+        hpi = HousePriceIndex()
+        hpi._data_path = tmp_path
+        assert len(hpi.fetch_hpi(2023, 2023, "england")) == 2
+
+    assert len(reads) == 1  # the read right after the cold fetch
+    assert FrameCache.shared().stats["hits"] == 2
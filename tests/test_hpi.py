@@ -1,7 +1,14 @@
+import re
+
+import numpy as np
 import pandas as pd
+import pytest
 
 import ukhpi.core.hpi as hpi_module
+import ukhpi.io.writer as writer_module
 from ukhpi.core.hpi import HousePriceIndex
+from ukhpi.io.frame_cache import FrameCache
+from ukhpi.io.loader import Dataset
 from ukhpi.plotting.hpi_plots import HousePriceIndexPlots
 
 
@@ -83,3 +90,271 @@ def test_house_price_index_plots_hpi_df_coerces_numeric_columns(monkeypatch):
     df = p.hpi_df
     assert pd.api.types.is_numeric_dtype(df["average_price"])
     assert df["region_label"].dtype == object
+
+
+def test_fetch_hpi_for_regions_writes_per_region_cache_entries(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_batch(regions, start_year, end_year, chunk_size=25, errors=None):
+        calls.append(list(regions))
+        return {
+            region: pd.DataFrame({"average_price": [250000.0], "ref_period_start": ["2023-01-01"]})
+            for region in regions
+        }
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_hpi_for_regions", fake_batch)
+
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+
+    first = hpi.fetch_hpi_for_regions(2023, 2023, ["England", "wales"])
+    second = hpi.fetch_hpi_for_regions(2023, 2023, ["england", "wales"])
+
+    assert calls == [["england", "wales"]]
+    assert set(first) == set(second) == {"england", "wales"}
+    assert hpi._hpi_file("england").latest_file_path is not None
+
+    def boom(q):
+        raise AssertionError("fetch_hpi should read the cache entry written by the batch")
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", boom)
+    assert not hpi.fetch_hpi(2023, 2023, "england").empty
+
+
+def _projected_results(query):
+    columns = [c for c in ("averagePrice", "housePriceIndex", "salesVolume") if f"?{c}\n" in query]
+    months = ("2023-01-01", "2023-02-01")
+    return {
+        "head": {"vars": ["_about", "refPeriodStart", *columns]},
+        "results": {
+            "bindings": [
+                {
+                    "_about": {"type": "uri", "value": f"http://example/obs/{month}"},
+                    "refPeriodStart": {"value": month},
+                    **{c: {"value": str(100 + i)} for c in columns},
+                }
+                for i, month in enumerate(months)
+            ]
+        },
+    }
+
+
+def test_fetch_hpi_with_columns_fetches_and_merges_only_missing_columns(monkeypatch, tmp_path):
+    queries = []
+
+    def fake_fetch(query):
+        queries.append(query)
+        return _projected_results(query)
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", fake_fetch)
+    monkeypatch.setattr(hpi_module.sparqlquery, "years_per_shard", None)
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+
+    first = hpi.fetch_hpi(2023, 2023, "england", columns=["average_price"])
+    second = hpi.fetch_hpi(2023, 2023, "england", columns=["average_price", "house_price_index"])
+    third = hpi.fetch_hpi(2023, 2023, "england", columns=["house_price_index"])
+
+    assert "average_price" in first.columns and "house_price_index" not in first.columns
+    assert len(queries) == 2
+    assert "?housePriceIndex\n" in queries[1] and "?averagePrice\n" not in queries[1]
+    assert {"average_price", "house_price_index"} <= set(second.columns)
+    assert len(second) == 2
+    assert "average_price" not in third.columns
+
+
+def test_fetch_hpi_refresh_upserts_only_the_revision_window(monkeypatch, tmp_path):
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+    yesterday = (pd.Timestamp.now() - pd.Timedelta(days=1)).strftime("%m%d%Y")
+    cached = pd.DataFrame(
+        {
+            "ref_period_start": [f"2023-{m:02d}-01" for m in range(1, 7)],
+            "ref_region": ["http://landregistry.data.gov.uk/id/region/england"] * 6,
+            "average_price": [100.0] * 6,
+        }
+    )
+    cached.to_csv(tmp_path / f"england_hpi_{yesterday}.csv", index=False)
+    queries = []
+
+    def fake_fetch(query):
+        queries.append(query)
+        return {
+            "head": {"vars": ["refPeriodStart", "averagePrice"]},
+            "results": {
+                "bindings": [
+                    {"refPeriodStart": {"value": f"2023-{m:02d}-01"}, "averagePrice": {"value": "200"}}
+                    for m in range(3, 8)
+                ]
+            },
+        }
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", fake_fetch)
+
+    assert len(hpi.fetch_hpi(2023, 2023, "england")) == 6 and not queries  # no refresh requested
+
+    df = hpi.fetch_hpi(2023, 2023, "england", refresh=True, lookback_months=3)
+
+    assert len(queries) == 1
+    assert '"2023-03-01"^^xsd:date' in queries[0]
+    assert "averagePrice" in queries[0] and "housePriceIndex" not in queries[0]
+    assert df["ref_period_start"].dt.strftime("%Y-%m-%d").tolist() == [f"2023-{m:02d}-01" for m in range(1, 8)]
+    assert df["average_price"].astype(float).tolist() == [100.0, 100.0] + [200.0] * 5
+
+    hpi.fetch_hpi(2023, 2023, "england", refresh=True)
+    assert len(queries) == 1  # today's file is already fresh
+
+
+def test_fetch_hpi_serves_every_window_from_one_full_history_fetch(monkeypatch, tmp_path):
+    queries = []
+
+    def fake_fetch(query):
+        queries.append(query)
+        return {
+            "head": {"vars": ["refPeriodStart", "averagePrice"]},
+            "results": {
+                "bindings": [
+                    {"refPeriodStart": {"value": f"{year}-06-01"}, "averagePrice": {"value": str(year)}}
+                    for year in range(2015, 2025)
+                ]
+            },
+        }
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", fake_fetch)
+    monkeypatch.setattr(hpi_module.sparqlquery, "years_per_shard", None)
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+
+    first = hpi.fetch_hpi(2020, 2024, "england")
+    second = hpi.fetch_hpi(2016, 2021, "england")
+    plots = HousePriceIndexPlots(2018, 2019, "england")
+    plots._hpi._data_path = tmp_path
+
+    assert len(queries) == 1
+    assert f'"{hpi_module.SERIES_START_YEAR}-01-01"^^xsd:date' in queries[0]
+    assert first["ref_period_start"].dt.year.tolist() == list(range(2020, 2025))
+    assert second["ref_period_start"].dt.year.tolist() == list(range(2016, 2022))
+    assert plots.hpi_df["average_price"].tolist() == [2018, 2019]
+    assert [p.name.split("_")[0] for p in tmp_path.iterdir()] == ["england"]
+
+
+def test_only_the_uk_back_series_is_fetched_from_1968(monkeypatch, tmp_path):
+    queries = []
+
+    def fake_fetch(query):
+        queries.append(query)
+        return {"head": {"vars": ["refPeriodStart"]}, "results": {"bindings": []}}
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", fake_fetch)
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+
+    hpi.fetch_hpi(2020, 2024, "england")
+    england = list(queries)
+    queries.clear()
+    hpi.fetch_hpi(2020, 2024, "united-kingdom")
+
+    def first_years(qs):
+        return sorted(int(y) for q in qs for y in re.findall(r'"(\d{4})-01-01"\^\^xsd:date', q))
+
+    years = hpi._history_end() - hpi_module.SERIES_START_YEAR + 1
+    assert len(england) == -(-years // hpi_module.sparqlquery.years_per_shard)
+    assert first_years(england)[0] == 1995
+    assert first_years(queries)[0] == 1968
+
+
+# The delta refresh behind the last fetch replaces every cached month.
+@pytest.mark.filterwarnings("error::FutureWarning")
+def test_merging_missing_columns_keeps_the_file_date_stamp(monkeypatch, tmp_path):
+    queries = []
+
+    def fake_fetch(query):
+        queries.append(query)
+        return _projected_results(query)
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", fake_fetch)
+    monkeypatch.setattr(hpi_module.sparqlquery, "years_per_shard", None)
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+    hpi.fetch_hpi(2023, 2023, "england", columns=["average_price"])
+    file = hpi._hpi_file("england")
+    old = file.latest_file_path.with_name(f"{file.file_name}01012023{file.latest_file_path.suffix}")
+    file.latest_file_path.rename(old)
+    FrameCache.shared().clear()
+
+    hpi.fetch_hpi(2022, 2022, "england", columns=["house_price_index"])
+
+    assert file.latest_file_path == old
+    # The stamp still shows the series was last brought up to date in 2023, so a later
+    # window goes back for the new months.
+    hpi.fetch_hpi(2024, 2024, "england", columns=["house_price_index"])
+    assert len(queries) == 3
+
+
+def test_fetched_series_are_served_when_their_cache_write_fails(monkeypatch, tmp_path):
+    def disk_full(df, path):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(writer_module, "write_frame", disk_full)
+    monkeypatch.setattr(
+        hpi_module.sparqlquery,
+        "fetch_hpi_for_regions",
+        lambda regions, start_year, end_year, chunk_size=25, errors=None: {
+            region: pd.DataFrame({"average_price": [250000.0], "ref_period_start": ["2023-01-01"]})
+            for region in regions
+        },
+    )
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", _projected_results)
+    monkeypatch.setattr(hpi_module.sparqlquery, "years_per_shard", None)
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+
+    frames = hpi.fetch_hpi_for_regions(2023, 2023, ["england"])
+    assert frames["england"]["average_price"].tolist() == [250000.0]
+    assert hpi._hpi_file("england").latest_file_path is None
+
+    # A file written before the disk filled up is topped up in memory.
+    monkeypatch.undo()
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", _projected_results)
+    monkeypatch.setattr(hpi_module.sparqlquery, "years_per_shard", None)
+    hpi.fetch_hpi(2023, 2023, "wales", columns=["average_price"])
+    monkeypatch.setattr(writer_module, "write_frame", disk_full)
+
+    df = hpi.fetch_hpi(2023, 2023, "wales", columns=["house_price_index"])
+    assert df["house_price_index"].tolist() == [100.0, 101.0]
+
+
+def test_series_files_keep_full_float_precision_across_delta_refreshes(monkeypatch, tmp_path):
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+    yesterday = (pd.Timestamp.now() - pd.Timedelta(days=1)).strftime("%m%d%Y")
+    pd.DataFrame(
+        {
+            "ref_period_start": ["2023-01-01", "2023-06-01"],
+            "average_price": [16_777_217.25, 100.0],
+            "house_price_index": [123.456789, 100.0],
+        }
+    ).to_csv(tmp_path / f"england_hpi_{yesterday}.csv", index=False)
+    monkeypatch.setattr(
+        hpi_module.sparqlquery,
+        "fetch_sparql_query",
+        lambda query: {
+            "head": {"vars": ["refPeriodStart", "averagePrice", "housePriceIndex"]},
+            "results": {
+                "bindings": [
+                    {
+                        "refPeriodStart": {"value": "2023-06-01"},
+                        "averagePrice": {"value": "16777219.75"},
+                        "housePriceIndex": {"value": "98.7654321"},
+                    }
+                ]
+            },
+        },
+    )
+
+    df = hpi.fetch_hpi(2023, 2023, "england", refresh=True, lookback_months=0)
+
+    assert df["average_price"].dtype == np.float32
+    on_disk = Dataset(file_path=hpi._hpi_file("england").latest_file_path).load_frame()
+    assert on_disk["average_price"].tolist() == [16_777_217.25, 16_777_219.75]
+    assert on_disk["house_price_index"].tolist() == [123.456789, 98.7654321]
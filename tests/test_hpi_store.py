@@ -0,0 +1,158 @@
+"""Tests for the SQLite HPI store (ukhpi.io.hpi_store)."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+import pandas as pd
+
+import ukhpi.core.hpi as hpi_module
+from ukhpi.core.hpi import HousePriceIndex
+from ukhpi.io.hpi_store import HpiStore
+
+
+def _rows(region, months, price, **extra):
+    return pd.DataFrame(
+        {
+            "ref_region": f"http://landregistry.data.gov.uk/id/region/{region}",
+            "ref_period_start": pd.to_datetime([f"{m}-01" for m in months]),
+            "ref_month": months,
+            "average_price": [float(price)] * len(months),
+            **extra,
+        }
+    )
+
+
+def test_store_runs_in_wal_mode_with_the_region_month_key(tmp_path):
+    store = HpiStore(tmp_path / "hpi.db")
+    with sqlite3.connect(store.db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM hpi WHERE region = 'wales' AND ref_period_start >= '2023-01-01'"
+        ).fetchall()
+    assert "INDEX" in plan[0][-1]
+
+
+def test_upsert_updates_only_the_columns_it_carries(tmp_path):
+    store = HpiStore(tmp_path / "hpi.db")
+    store.upsert(_rows("wales", ["2023-01", "2023-02"], 200, sales_volume=[5, 6]))
+    store.upsert(_rows("wales", ["2023-02", "2023-03"], 210).drop(columns=["ref_month"]))
+
+    df = store.query(regions=["wales"])
+
+    assert df["ref_period_start"].dt.strftime("%Y-%m").tolist() == ["2023-01", "2023-02", "2023-03"]
+    assert df["average_price"].tolist() == [200.0, 210.0, 210.0]
+    assert df["sales_volume"].tolist()[:2] == [5.0, 6.0]
+    assert df["ref_month"].tolist()[:2] == ["2023-01", "2023-02"]
+    assert store.regions() == ["wales"]
+
+
+def test_query_filters_regions_dates_and_columns(tmp_path):
+    store = HpiStore(tmp_path / "hpi.db")
+    for region, price in (("wales", 200), ("england", 300), ("scotland", 150)):
+        store.upsert(_rows(region, ["2022-12", "2023-06", "2024-01"], price))
+
+    df = store.query(regions=["wales", "england"], start=2023, end="2023-12-31", columns=["average_price", "nope"])
+
+    assert list(df.columns) == ["region", "ref_period_start", "average_price"]
+    assert df[["region", "average_price"]].values.tolist() == [["england", 300.0], ["wales", 200.0]]
+    assert store.query(regions=[]).empty
+
+
+def test_concurrent_writers_and_readers(tmp_path):
+    store = HpiStore(tmp_path / "hpi.db")
+    errors = []
+
+    def write(i):
+        try:
+            store.upsert(_rows(f"region-{i}", [f"2023-{m:02d}" for m in range(1, 13)], i))
+            store.query(start=2023)
+        except sqlite3.Error as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert len(store.query()) == 96
+
+
+def test_fetch_hpi_frame_reads_many_regions_in_one_query(monkeypatch, tmp_path, isolated_hpi_store):
+    def fake_batch(regions, start_year, end_year, chunk_size=25, errors=None):
+        return {r: _rows(r, ["2022-06", "2023-06"], 100 + len(r)) for r in regions}
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_hpi_for_regions", fake_batch)
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+
+    df = hpi.fetch_hpi_frame(2023, 2023, ["Wales", "england"])
+
+    assert df[["region", "average_price"]].values.tolist() == [["england", 107.0], ["wales", 105.0]]
+    assert isolated_hpi_store.regions() == ["england", "wales"]
+
+    # Regions written by an earlier fetch are read straight from the store.
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_hpi_for_regions", None)
+    assert len(hpi.fetch_hpi_frame(2022, 2023, ["wales"])) == 2
+
+
+def test_fetch_hpi_frame_tops_up_regions_stored_with_a_column_subset(monkeypatch, tmp_path, isolated_hpi_store):
+    queries = []
+
+    def fake_fetch(query):
+        queries.append(query)
+        columns = [c for c in ("averagePrice", "housePriceIndex") if f"?{c}\n" in query]
+        return {
+            "head": {"vars": ["_about", "refPeriodStart", *columns]},
+            "results": {
+                "bindings": [
+                    {
+                        "_about": {"type": "uri", "value": f"http://example/obs/{month}"},
+                        "refPeriodStart": {"value": month},
+                        **{c: {"value": "100"} for c in columns},
+                    }
+                    for month in ("2023-01-01", "2023-02-01")
+                ]
+            },
+        }
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", fake_fetch)
+    monkeypatch.setattr(hpi_module.sparqlquery, "years_per_shard", None)
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+    hpi.fetch_hpi(2023, 2023, "england", columns=["average_price"])
+
+    df = hpi.fetch_hpi_frame(2023, 2023, ["england"], columns=["average_price", "house_price_index"])
+
+    assert df["house_price_index"].tolist() == [100.0, 100.0]
+    assert len(queries) == 2
+    assert "?averagePrice\n" not in queries[1]
+    assert isolated_hpi_store.filled_columns(["england"]) == {
+        "england": {"_about", "average_price", "house_price_index"}
+    }
+
+
+def test_fetch_hpi_frame_writes_fetched_regions_once(monkeypatch, tmp_path, isolated_hpi_store):
+    monkeypatch.setattr(
+        hpi_module.sparqlquery,
+        "fetch_hpi_for_regions",
+        lambda regions, start_year, end_year, chunk_size=25, errors=None: {
+            r: _rows(r, ["2023-06"], 100) for r in regions
+        },
+    )
+    upserts = []
+    upsert = isolated_hpi_store.upsert
+    monkeypatch.setattr(
+        isolated_hpi_store,
+        "upsert",
+        lambda df, region=None, table="hpi": upserts.append(table) or upsert(df, region, table),
+    )
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+
+    hpi.fetch_hpi_frame(2023, 2023, ["wales"])
+
+    assert upserts == ["hpi", "hpi_quarter", "hpi_year"]
@@ -0,0 +1,72 @@
+"""Tests for the adaptive rate/concurrency limiter (ukhpi.core.limiter)."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from ukhpi.core.limiter import AdaptiveLimiter
+from ukhpi.core.sparql import SparqlQuery
+
+
+def test_limit_grows_additively_on_healthy_responses():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=4, rate=1000, burst=1000)
+
+    for _ in range(20):
+        limiter.release(limiter.acquire(), "ok")
+
+    assert limiter.limit == 4
+
+
+def test_limit_halves_on_throttling_once_per_cooldown():
+    limiter = AdaptiveLimiter(initial_limit=8, rate=1000, burst=1000, decrease_cooldown=60)
+
+    for _ in range(3):
+        limiter.release(limiter.acquire(), "throttled")
+
+    assert limiter.limit == 4
+    assert limiter.stats["throttled"] == 3
+
+
+def test_acquire_blocks_at_the_concurrency_limit_and_reports_queue_depth():
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=1, rate=1000, burst=1000)
+    held = limiter.acquire()
+    acquired = threading.Event()
+
+    def worker():
+        limiter.release(limiter.acquire(), "ok")
+        acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    time.sleep(0.05)
+    assert not acquired.is_set()
+    assert limiter.stats == {**limiter.stats, "in_flight": 1, "queue_depth": 1}
+
+    limiter.release(held, "ok")
+    thread.join(timeout=1)
+    assert acquired.is_set()
+    assert limiter.stats["queue_depth"] == 0
+
+
+def test_token_bucket_paces_requests_beyond_the_burst():
+    limiter = AdaptiveLimiter(initial_limit=16, rate=50, burst=1)
+
+    began = time.monotonic()
+    for _ in range(6):
+        limiter.release(limiter.acquire(), "ok")
+
+    assert time.monotonic() - began >= 5 / 50 * 0.9
+
+
+def test_unknown_outcome_is_rejected():
+    limiter = AdaptiveLimiter()
+    with pytest.raises(ValueError):
+        limiter.release(limiter.acquire(), "maybe")
+
+
+def test_sparql_queries_share_the_process_wide_limiter():
+    assert SparqlQuery().limiter is SparqlQuery().limiter is AdaptiveLimiter.shared()
+    assert set(SparqlQuery().limiter_stats) >= {"limit", "in_flight", "queue_depth"}
@@ -5,9 +5,13 @@ All tests are offline — SPARQL calls are monkeypatched.
 
 from __future__ import annotations
 
+import re
+
 import pandas as pd
+import pytest
 
 import ukhpi.core.ppi as ppi_module
+import ukhpi.core.sparql as sparql_module
 from ukhpi.core.ppi import PricePaidData, PricePaidDataPlots
 from ukhpi.core.sparql import SparqlQuery
 
@@ -201,3 +205,124 @@ def test_clean_df_falls_back_to_string_paon_when_not_numeric(monkeypatch):
 
     assert cleaned["paon"].dtype == object
     assert cleaned["paon"].iloc[0] == "FLAT A"
+
+
+def test_fetch_price_paid_for_postcodes_batches_splits_and_isolates_failures(monkeypatch, tmp_path):
+    monkeypatch.setattr(sparql_module, "_PACKAGE_DIR", tmp_path)
+    sq = SparqlQuery()
+    queries = []
+
+    def fake_fetch(query):
+        queries.append(query)
+        if '"BAD 1AA"' in query:
+            raise RuntimeError("query timed out")
+        bound = [pc for pc in ("HP20 1AA", "HP20 1AB", "HP20 1AD", "HP21 7QX") if f'"{pc}"' in query]
+        return {
+            "head": {"vars": ["postcode", "amount", "date"]},
+            "results": {
+                "bindings": [
+                    {
+                        "postcode": {"value": pc},
+                        "amount": {"value": "250000"},
+                        "date": {"value": "2023-01-15"},
+                    }
+                    for pc in bound
+                    if pc != "HP20 1AD"
+                ]
+            },
+        }
+
+    monkeypatch.setattr(sq, "fetch_sparql_query", fake_fetch)
+
+    frames = sq.fetch_price_paid_for_postcodes(
+        ["hp20 1aa", "HP20 1AB", "BAD 1AA", "HP20 1AD", "hp21  7qx"], batch_size=4, max_workers=1
+    )
+
+    assert set(frames) == {"HP20 1AA", "HP20 1AB", "HP20 1AD", "HP21 7QX"}
+    assert frames["HP20 1AD"].empty
+    assert frames["HP20 1AA"]["amount"].tolist() == ["250000"]
+    # One batch of four failed and was bisected down to the bad postcode; the second batch succeeded.
+    assert len(queries) == 6
+
+    monkeypatch.setattr(sq, "fetch_sparql_query", lambda q: (_ for _ in ()).throw(AssertionError("refetched")))
+    assert sq.get_price_paid_data_for_postcode("HP20 1AB")["postcode"].tolist() == ["HP20 1AB"]
+    assert set(sq.fetch_price_paid_for_postcodes(["HP20 1AA", "HP21 7QX"])) == {"HP20 1AA", "HP21 7QX"}
+
+
+def test_fetch_price_paid_for_postcodes_serves_fetched_rows_when_the_cache_write_fails(monkeypatch, tmp_path):
+    monkeypatch.setattr(sparql_module, "_PACKAGE_DIR", tmp_path)
+    monkeypatch.setattr(sparql_module.WriteFile, "write_file_to_disk", lambda self, **kwargs: None)
+    sq = SparqlQuery()
+    monkeypatch.setattr(
+        sq,
+        "fetch_sparql_query",
+        lambda query: {
+            "head": {"vars": ["postcode", "amount"]},
+            "results": {"bindings": [{"postcode": {"value": "HP20 1AA"}, "amount": {"value": "250000"}}]},
+        },
+    )
+
+    frames = sq.fetch_price_paid_for_postcodes(["HP20 1AA"])
+
+    assert frames["HP20 1AA"]["postcode"].tolist() == ["HP20 1AA"]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("hp20 1aa", ("unit", "HP20 1AA")),
+        ("HP20  1", ("sector", "HP20 1")),
+        ("ec1a", ("district", "EC1A")),
+    ],
+)
+def test_postcode_scope_classifies_units_sectors_and_districts(value, expected):
+    assert SparqlQuery.postcode_scope(value) == expected
+
+
+def test_postcode_scope_rejects_other_strings():
+    with pytest.raises(ValueError):
+        SparqlQuery.postcode_scope("Aylesbury")
+
+
+def test_district_range_filter_does_not_spill_into_longer_districts():
+    query = SparqlQuery().build_query_for_postcode_scope("HP2", limit=100, offset=200)
+
+    assert '?postcode >= "HP2 "^^xsd:string && ?postcode < "HP2!"^^xsd:string' in query
+    assert "LIMIT 100 OFFSET 200" in query
+    assert "ORDER BY ?transx" in query
+
+
+def test_sector_fetch_pages_caches_scope_and_derives_unit_entries(monkeypatch, tmp_path):
+    monkeypatch.setattr(sparql_module, "_PACKAGE_DIR", tmp_path)
+    sq = SparqlQuery()
+    rows = [("HP20 1AA", "250000"), ("HP20 1AA", "260000"), ("HP20 1AB", "300000")]
+    offsets = []
+
+    def fake_fetch(query):
+        limit, offset = map(int, re.search(r"LIMIT (\d+) OFFSET (\d+)", query).groups())
+        offsets.append(offset)
+        return {
+            "head": {"vars": ["transx", "postcode", "amount"]},
+            "results": {
+                "bindings": [
+                    {
+                        "transx": {"type": "uri", "value": f"http://example/t/{i}"},
+                        "postcode": {"value": pc},
+                        "amount": {"value": amount},
+                    }
+                    for i, (pc, amount) in enumerate(rows)
+                ][offset : offset + limit]
+            },
+        }
+
+    monkeypatch.setattr(sq, "fetch_sparql_query", fake_fetch)
+    monkeypatch.setattr(ppi_module, "sparq", sq)
+
+    df = sq.get_price_paid_data_for_scope("hp20 1", page_size=2)
+
+    assert offsets == [0, 2]
+    assert df["amount"].tolist() == ["250000", "260000", "300000"]
+
+    monkeypatch.setattr(sq, "fetch_sparql_query", lambda q: (_ for _ in ()).throw(AssertionError("refetched")))
+    assert len(PricePaidData("HP20 1").data_for_postcode) == 3
+    assert sq.get_price_paid_data_for_postcode("HP20 1AA")["amount"].tolist() == ["250000", "260000"]
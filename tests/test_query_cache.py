@@ -0,0 +1,121 @@
+"""Tests for the content-addressed raw SPARQL response cache."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from ukhpi.core.sparql import SparqlQuery
+from ukhpi.io.query_cache import QueryCache
+
+_BODY = json.dumps({"head": {"vars": ["averagePrice"]}, "results": {"bindings": []}}).encode()
+
+
+def test_key_ignores_whitespace_but_not_endpoint_or_format(tmp_path):
+    cache = QueryCache(base_path=tmp_path)
+    base = cache.key("http://a/query", "SELECT ?x\n   WHERE { ?x ?y ?z }")
+
+    assert base == cache.key("http://a/query", "  SELECT ?x WHERE {\t?x ?y ?z }  ")
+    assert base != cache.key("http://b/query", "SELECT ?x WHERE { ?x ?y ?z }")
+    assert base != cache.key("http://a/query", "SELECT ?x WHERE { ?x ?y ?z }", result_format="csv")
+
+
+def test_put_get_round_trip_is_compressed_on_disk(tmp_path):
+    cache = QueryCache(base_path=tmp_path)
+    body = b"x" * 10_000
+    cache.put("abc", body)
+
+    assert cache.get("abc") == body
+    assert cache.path_for("abc").stat().st_size < len(body)
+    assert cache.stats["hits"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = QueryCache(base_path=tmp_path, ttl_seconds=60)
+    cache.put("abc", b"payload")
+    old = time.time() - 120
+    os.utime(cache.path_for("abc"), (old, old))
+
+    assert cache.get("abc") is None
+    assert cache.stats["misses"] == 1
+
+
+def test_size_budget_evicts_least_recently_used(tmp_path):
+    cache = QueryCache(base_path=tmp_path, max_bytes=10**9, compress_level=0)
+    for name in ("a", "b", "c"):
+        cache.put(name, os.urandom(1000))
+    now = time.time()
+    for offset, name in enumerate(("b", "a", "c")):
+        path = cache.path_for(name)
+        os.utime(path, (now - 100 + offset, path.stat().st_mtime))
+
+    cache.max_bytes = 2 * cache.path_for("a").stat().st_size + 10
+    removed = cache.evict()
+
+    assert removed == 1
+    assert not cache.path_for("b").exists()
+    assert cache.path_for("a").exists() and cache.path_for("c").exists()
+
+
+def test_writes_track_the_cache_size_and_only_scan_when_over_budget(tmp_path):
+    QueryCache(base_path=tmp_path, compress_level=0).put("old", os.urandom(1000))
+    cache = QueryCache(base_path=tmp_path, compress_level=0)
+    scans = []
+    scan = cache._scan
+    cache._scan = lambda: scans.append(1) or scan()
+
+    for name in ("a", "b", "a"):
+        cache.put(name, os.urandom(1000))
+
+    assert len(scans) == 1  # the size is counted once, on the first write
+    assert cache.stats["bytes"] == sum(p.stat().st_size for p in tmp_path.glob("*.gz"))
+
+    cache.max_bytes = cache.stats["bytes"]
+    cache.put("c", os.urandom(1000))
+    assert len(scans) == 2
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["bytes"] <= cache.max_bytes
+
+
+def test_abandoned_tee_leaves_no_entry(tmp_path):
+    cache = QueryCache(base_path=tmp_path)
+    stream = cache.tee("abc", iter([b"one", b"two"]))
+    next(stream)
+    stream.close()
+
+    assert cache.get("abc") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_identical_queries_hit_the_endpoint_once(isolated_query_cache, fake_transport):
+    transport = fake_transport(_BODY, chunk_size=5)
+    first = SparqlQuery(transport=transport)
+    second = SparqlQuery(transport=transport)
+
+    first.fetch_sparql_query("SELECT ?averagePrice WHERE { ?s ?p ?averagePrice }")
+    second.fetch_sparql_query("SELECT ?averagePrice\nWHERE { ?s ?p ?averagePrice }")
+    second.fetch_sparql_frame("SELECT ?averagePrice WHERE { ?s ?p ?averagePrice }", stream=True)
+
+    assert transport.calls == 1
+    assert isolated_query_cache.stats["hits"] == 2
+
+
+def test_streamed_fetch_populates_cache(isolated_query_cache, fake_transport):
+    transport = fake_transport(_BODY, chunk_size=5)
+    sq = SparqlQuery(transport=transport)
+
+    sq.fetch_sparql_frame("SELECT ?averagePrice {}", stream=True)
+    sq.fetch_sparql_query("SELECT ?averagePrice {}")
+
+    assert transport.calls == 1
+
+
+def test_use_cache_false_always_fetches(fake_transport):
+    transport = fake_transport(_BODY, chunk_size=5)
+    sq = SparqlQuery(transport=transport, use_cache=False)
+
+    sq.fetch_sparql_query("SELECT ?averagePrice {}")
+    sq.fetch_sparql_query("SELECT ?averagePrice {}")
+
+    assert transport.calls == 2
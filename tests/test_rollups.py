@@ -0,0 +1,82 @@
+"""Tests for the quarterly and annual HPI roll-ups (ukhpi.core.rollups)."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+import ukhpi.core.hpi as hpi_module
+from ukhpi.core.hpi import HousePriceIndex
+from ukhpi.core.rollups import roll_up
+from ukhpi.plotting.hpi_plots import HousePriceIndexPlots
+
+
+def _monthly(months):
+    return pd.DataFrame(
+        {
+            "ref_region": "http://landregistry.data.gov.uk/id/region/england",
+            "ref_period_start": pd.to_datetime([f"{m}-01" for m in months]),
+            "average_price": [100.0 + i for i in range(len(months))],
+            "house_price_index": [10.0 + i for i in range(len(months))],
+            "percentage_change": [10.0] * len(months),
+            "sales_volume_cash": [5] * len(months),
+        }
+    )
+
+
+def test_roll_up_aggregates_each_metric_family_by_its_rule():
+    months = [f"2023-{m:02d}" for m in range(1, 13)] + ["2024-01"]
+    monthly = _monthly(months).sample(frac=1, random_state=0)
+
+    quarters = roll_up(monthly, "quarter")
+
+    assert quarters["ref_month"].tolist() == ["2023Q1", "2023Q2", "2023Q3", "2023Q4", "2024Q1"]
+    assert quarters["ref_period_start"].iloc[1] == pd.Timestamp("2023-04-01")
+    assert quarters["period_months"].tolist() == [3, 3, 3, 3, 1]
+    assert quarters["average_price"].tolist()[:2] == [101.0, 104.0]
+    assert quarters["house_price_index"].tolist()[:2] == [12.0, 15.0]
+    assert quarters["sales_volume_cash"].tolist()[:2] == [15, 15]
+    assert quarters["percentage_change"].iloc[0] == pytest.approx(33.1)
+    assert quarters["ref_region"].iloc[0].endswith("/england")
+
+    years = roll_up(monthly, "year", since=pd.Timestamp("2024-01-01"))
+    assert years["ref_month"].tolist() == ["2024"]
+
+    with pytest.raises(ValueError):
+        roll_up(monthly, "week")
+
+
+def test_fetch_hpi_serves_materialised_roll_ups_refreshed_by_new_months(monkeypatch, tmp_path, isolated_hpi_store):
+    yesterday = (pd.Timestamp.now() - pd.Timedelta(days=1)).strftime("%m%d%Y")
+    _monthly([f"2023-{m:02d}" for m in range(1, 6)]).to_csv(tmp_path / f"england_hpi_{yesterday}.csv", index=False)
+
+    def fake_fetch(query):
+        return {
+            "head": {"vars": ["refPeriodStart", "averagePrice"]},
+            "results": {
+                "bindings": [
+                    {"refPeriodStart": {"value": f"2023-{m:02d}-01"}, "averagePrice": {"value": "200"}}
+                    for m in range(3, 8)
+                ]
+            },
+        }
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", fake_fetch)
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+
+    quarters = hpi.fetch_hpi(2023, 2023, "england", granularity="quarter")
+    assert quarters["ref_month"].tolist() == ["2023Q1", "2023Q2"]
+    assert quarters["average_price"].tolist() == [101.0, 103.5]
+    assert isolated_hpi_store.regions("hpi_quarter") == ["england"]
+
+    # A delta refresh rewrites the series; the roll-ups follow from the first revised month.
+    hpi.fetch_hpi(2023, 2023, "england", refresh=True, lookback_months=2)
+    quarters = hpi.fetch_hpi(2023, 2023, "england", granularity="quarter")
+    assert quarters["average_price"].tolist() == pytest.approx([401 / 3, 200.0, 200.0])
+    assert quarters["period_months"].tolist() == [3, 3, 1]
+
+    plots = HousePriceIndexPlots(2023, 2023, "england", granularity="year")
+    plots._hpi = hpi
+    assert plots.hpi_df["ref_month"].tolist() == ["2023"]
+    assert len(hpi.fetch_hpi_frame(2023, 2023, ["england"], granularity="year")) == 1
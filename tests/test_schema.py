@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from ukhpi.core.schema import HPI_SCHEMA, PPI_SCHEMA, apply_schema, memory_report
+
+
+def _hpi_text_frame(regions: int = 20, months: int = 24) -> pd.DataFrame:
+    rows = []
+    for r in range(regions):
+        for m in range(months):
+            month = f"{2020 + m // 12}-{m % 12 + 1:02d}"
+            rows.append(
+                {
+                    "_about": f"http://landregistry.data.gov.uk/data/ukhpi/region/region-{r}/month/{month}",
+                    "ref_region": f"http://landregistry.data.gov.uk/id/region/region-{r}",
+                    "ref_month": month,
+                    "ref_period_start": f"{month}-01",
+                    "average_price": str(250000.5 + m),
+                    "house_price_index": "123.45",
+                    "sales_volume": str(100 + m),
+                    "sales_volume_cash": "" if m == 0 else str(40 + m),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def test_apply_schema_casts_hpi_columns_to_compact_dtypes():
+    df = apply_schema(_hpi_text_frame(), HPI_SCHEMA)
+
+    assert isinstance(df["ref_region"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df["ref_period_start"])
+    assert df["average_price"].dtype == np.float32
+    assert df["average_price"].iloc[0] == 250000.5
+    assert df["sales_volume"].dtype == np.int32
+    # A gap in a count keeps it numeric as float32.
+    assert df["sales_volume_cash"].dtype == np.float32
+    assert df["sales_volume_cash"].isna().sum() == 20
+    # Months stay "YYYY-MM" labels that compare equal to strings.
+    assert (df["ref_month"] == "2021-06").sum() == 20
+
+
+def test_apply_schema_leaves_undeclared_columns_and_input_untouched():
+    raw = pd.DataFrame({"amount": ["250000", "3000000000"], "paon": ["12", "Flat 1"], "town": ["AYLESBURY"] * 2})
+
+    df = apply_schema(raw, PPI_SCHEMA)
+
+    assert raw["amount"].dtype == object
+    assert df["paon"].tolist() == ["12", "Flat 1"]
+    # Prices beyond the int32 range keep 64-bit integers.
+    assert df["amount"].dtype == np.int64
+    assert isinstance(df["town"].dtype, pd.CategoricalDtype)
+
+
+def test_memory_report_shows_multi_region_frames_shrinking():
+    raw = _hpi_text_frame()
+
+    report = memory_report(raw, apply_schema(raw, HPI_SCHEMA))
+
+    assert report.loc["average_price", ["dtype_before", "dtype_after"]].tolist() == ["object", "float32"]
+    total = report.loc["total"]
+    assert total["bytes_saved"] == total["bytes_before"] - total["bytes_after"]
+    assert total["bytes_after"] < total["bytes_before"] / 3
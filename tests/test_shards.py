@@ -0,0 +1,106 @@
+"""Tests for date-sharded window fetching (ukhpi.core.shards)."""
+
+from __future__ import annotations
+
+import re
+import threading
+
+import pandas as pd
+import pytest
+
+import ukhpi.core.shards as shards_module
+from ukhpi.core.breaker import CircuitOpenError
+from ukhpi.core.shards import ShardFetchError, fetch_shards, plan_year_shards
+from ukhpi.core.sparql import SparqlQuery
+from ukhpi.core.transport import TransportError
+
+
+def test_plan_year_shards_covers_window_without_gaps():
+    assert plan_year_shards(1990, 2025, 10) == [(1990, 1999), (2000, 2009), (2010, 2019), (2020, 2025)]
+    assert plan_year_shards(2023, 2023, 5) == [(2023, 2023)]
+    assert plan_year_shards(1990, 2025, None) == [(1990, 2025)]
+
+
+def test_plan_year_shards_rejects_inverted_window():
+    with pytest.raises(ValueError):
+        plan_year_shards(2025, 1990)
+
+
+def test_fetch_shards_retries_only_the_failed_shard_and_keeps_order():
+    calls: dict[tuple[int, int], int] = {}
+    lock = threading.Lock()
+
+    def fetch(start, end):
+        with lock:
+            calls[(start, end)] = calls.get((start, end), 0) + 1
+            attempt = calls[(start, end)]
+        if (start, end) == (2000, 2004) and attempt == 1:
+            raise TransportError("read timeout")
+        return pd.DataFrame({"year": list(range(start, end + 1))})
+
+    df = fetch_shards(fetch, plan_year_shards(1990, 2009, 5), max_workers=3, backoff_factor=0.0)
+
+    assert df["year"].tolist() == list(range(1990, 2010))
+    assert calls[(2000, 2004)] == 2
+    assert all(n == 1 for shard, n in calls.items() if shard != (2000, 2004))
+
+
+def test_fetch_shards_attempts_every_shard_before_raising():
+    seen = []
+
+    def fetch(start, end):
+        seen.append(start)
+        if start == 1995:
+            raise TransportError("down")
+        return pd.DataFrame({"year": [start]})
+
+    with pytest.raises(ShardFetchError) as exc:
+        fetch_shards(fetch, plan_year_shards(1990, 2004, 5), max_retries=1, backoff_factor=0.0)
+
+    assert list(exc.value.failed) == [(1995, 1999)]
+    assert sorted(set(seen)) == [1990, 1995, 2000]
+    assert seen.count(1995) == 2
+
+
+def test_open_circuit_fails_shards_without_retrying_or_sleeping(monkeypatch):
+    sleeps, seen = [], []
+    monkeypatch.setattr(shards_module.time, "sleep", lambda s: sleeps.append(s))
+
+    def fetch(start, end):
+        seen.append(start)
+        raise CircuitOpenError("circuit open")
+
+    with pytest.raises(ShardFetchError) as exc:
+        fetch_shards(fetch, plan_year_shards(1990, 1999, 5), max_retries=2)
+
+    assert all(isinstance(e, CircuitOpenError) for e in exc.value.failed.values())
+    assert sorted(seen) == [1990, 1995]
+    assert sleeps == []
+
+
+def test_fetch_hpi_for_region_shards_long_windows(monkeypatch):
+    sq = SparqlQuery(years_per_shard=10)
+    windows = []
+
+    def fake_fetch(query):
+        start, end = re.findall(r'"(\d{4})-\d{2}-\d{2}"\^\^xsd:date', query)
+        windows.append((int(start), int(end)))
+        return {
+            "head": {"vars": ["refPeriodStart", "refRegion"]},
+            "results": {
+                "bindings": [
+                    {
+                        "refPeriodStart": {"value": f"{start}-01-01"},
+                        "refRegion": {"type": "uri", "value": "http://landregistry.data.gov.uk/id/region/england"},
+                    }
+                ]
+            },
+        }
+
+    monkeypatch.setattr(sq, "fetch_sparql_query", fake_fetch)
+
+    df = sq.fetch_hpi_for_region("england", 1990, 2025)
+
+    assert sorted(windows) == [(1990, 1999), (2000, 2009), (2010, 2019), (2020, 2025)]
+    assert df["ref_period_start"].dt.year.tolist() == [1990, 2000, 2010, 2020]
+    assert isinstance(df["ref_region"].dtype, pd.CategoricalDtype)
@@ -0,0 +1,94 @@
+"""Tests for single-flight request coalescing (ukhpi.core.singleflight)."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import ukhpi.core.hpi as hpi_module
+from ukhpi.core.hpi import HousePriceIndex
+from ukhpi.core.singleflight import SingleFlight
+from ukhpi.core.sparql import SparqlQuery
+
+
+def _run_concurrently(n, func):
+    barrier = threading.Barrier(n)
+
+    def call():
+        barrier.wait()
+        return func()
+
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        futures = [executor.submit(call) for _ in range(n)]
+        return [f.result() for f in futures]
+
+
+def test_concurrent_calls_with_one_key_run_once_and_share_the_result():
+    flights = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return object()
+
+    results = _run_concurrently(6, lambda: flights.do("k", slow))
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flights.stats == {"in_flight": 0, "coalesced": 5}
+
+
+def test_waiters_receive_the_leaders_exception():
+    flights = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            flights.do("k", failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    _run_concurrently(3, call)
+    assert len(errors) == 3
+
+
+def test_completed_calls_are_not_cached():
+    flights = SingleFlight()
+    assert flights.do("k", lambda: 1) == 1
+    assert flights.do("k", lambda: 2) == 2
+
+
+def test_cold_fetch_hpi_sends_one_upstream_request_for_concurrent_callers(monkeypatch, tmp_path, fake_sparql_bindings):
+    queries = []
+
+    def slow_fetch(query):
+        queries.append(query)
+        time.sleep(0.1)
+        return fake_sparql_bindings
+
+    monkeypatch.setattr(hpi_module.sparqlquery, "fetch_sparql_query", slow_fetch)
+    monkeypatch.setattr(hpi_module.sparqlquery, "years_per_shard", None)
+    hpi = HousePriceIndex()
+    hpi._data_path = tmp_path
+
+    frames = _run_concurrently(6, lambda: hpi.fetch_hpi(2023, 2023, "england"))
+
+    assert len(queries) == 1
+    assert all(len(df) == 2 for df in frames)
+    assert len({id(df) for df in frames}) == 6  # each caller gets its own copy
+
+
+def test_identical_queries_share_one_round_trip(fake_transport):
+    transport = fake_transport(b'{"head": {"vars": []}, "results": {"bindings": []}}', delay=0.1)
+    sq = SparqlQuery(transport=transport, use_cache=False)
+
+    _run_concurrently(4, lambda: sq.fetch_sparql_query("SELECT * WHERE { ?s ?p ?o }"))
+
+    assert transport.calls == 1
@@ -1,4 +1,5 @@
 import pandas as pd
+import pytest
 
 from ukhpi.core.sparql import SparqlQuery
 
@@ -51,3 +52,186 @@ def test_make_data_from_results_with_bindings_parses_dates_and_numerics():
     assert len(df) == 2
     assert pd.api.types.is_numeric_dtype(df["average_price"])
     assert pd.api.types.is_datetime64_any_dtype(df["ref_period_start"])
+
+
+def test_build_query_for_regions_binds_every_region_in_values_block():
+    sq = SparqlQuery()
+    query = sq.build_query_for_regions(["England", "west-northamptonshire"], 2020, 2024)
+
+    assert "VALUES ?refRegion" in query
+    assert "<http://landregistry.data.gov.uk/id/region/england>" in query
+    assert "<http://landregistry.data.gov.uk/id/region/west-northamptonshire>" in query
+    assert "2020-01-01" in query
+    assert "2024-12-01" in query
+
+
+def test_fetch_hpi_for_regions_chunks_queries_and_splits_results(monkeypatch):
+    sq = SparqlQuery()
+    queries = []
+
+    def fake_fetch(query):
+        queries.append(query)
+        regions = [r for r in ("england", "wales", "scotland") if f"/region/{r}>" in query]
+        return {
+            "head": {"vars": ["averagePrice", "refRegion"]},
+            "results": {
+                "bindings": [
+                    {
+                        "averagePrice": {"value": "100"},
+                        "refRegion": {"value": f"http://landregistry.data.gov.uk/id/region/{r}"},
+                    }
+                    for r in regions
+                    if r != "wales"
+                ]
+            },
+        }
+
+    monkeypatch.setattr(sq, "fetch_sparql_query", fake_fetch)
+
+    frames = sq.fetch_hpi_for_regions(["England", "Wales", "Scotland"], 2023, 2023, chunk_size=2)
+
+    assert len(queries) == 2
+    assert set(frames) == {"england", "wales", "scotland"}
+    assert len(frames["england"]) == 1
+    assert frames["wales"].empty
+    assert "average_price" in frames["wales"].columns
+
+
+def test_fetch_hpi_for_regions_drops_regions_from_failed_chunks(monkeypatch):
+    sq = SparqlQuery()
+
+    def flaky_fetch(query):
+        if "/region/wales>" in query:
+            raise RuntimeError("timeout")
+        return {"head": {"vars": ["refRegion"]}, "results": {"bindings": []}}
+
+    monkeypatch.setattr(sq, "fetch_sparql_query", flaky_fetch)
+
+    frames = sq.fetch_hpi_for_regions(["england", "wales"], 2023, 2023, chunk_size=1)
+
+    assert set(frames) == {"england"}
+
+
+def test_make_data_from_results_uses_schema_and_datatype_annotations():
+    xsd = "http://www.w3.org/2001/XMLSchema#"
+    results = {
+        "head": {"vars": ["refRegion", "salesVolume", "averagePrice", "refMonth", "extraCount", "label"]},
+        "results": {
+            "bindings": [
+                {
+                    "refRegion": {"type": "uri", "value": "http://landregistry.data.gov.uk/id/region/england"},
+                    "salesVolume": {"type": "literal", "datatype": f"{xsd}integer", "value": "120"},
+                    "averagePrice": {"type": "literal", "datatype": f"{xsd}integer", "value": "250000"},
+                    "refMonth": {"type": "literal", "datatype": f"{xsd}gYearMonth", "value": "2023-01"},
+                    "extraCount": {"type": "literal", "datatype": f"{xsd}integer", "value": "7"},
+                    "label": {"type": "literal", "xml:lang": "en", "value": "England"},
+                },
+                {
+                    "refRegion": {"type": "uri", "value": "http://landregistry.data.gov.uk/id/region/england"},
+                    "averagePrice": {"type": "literal", "datatype": f"{xsd}integer", "value": "260000"},
+                    "refMonth": {"type": "literal", "datatype": f"{xsd}gYearMonth", "value": "2023-02"},
+                    "extraCount": {"type": "literal", "datatype": f"{xsd}integer", "value": "8"},
+                    "label": {"type": "literal", "xml:lang": "en", "value": "England"},
+                },
+            ]
+        },
+    }
+
+    df = SparqlQuery.make_data_from_results(results)
+
+    assert list(df.columns) == ["ref_region", "sales_volume", "average_price", "ref_month", "extra_count", "label"]
+    assert isinstance(df["ref_region"].dtype, pd.CategoricalDtype)
+    assert df["sales_volume"].dtype == "float64"  # missing value in the second row
+    assert pd.isna(df["sales_volume"].iloc[1])
+    assert df["average_price"].dtype == "float64"
+    assert df["ref_month"].tolist() == ["2023-01", "2023-02"]
+    assert df["extra_count"].dtype == "int64"
+    assert df["label"].tolist() == ["England", "England"]
+
+
+_XSD = "http://www.w3.org/2001/XMLSchema#"
+_ENGLAND = "http://landregistry.data.gov.uk/id/region/england"
+
+_JSON_RESULTS = {
+    "head": {"vars": ["refRegion", "refPeriodStart", "refMonth", "averagePrice", "salesVolume", "paon"]},
+    "results": {
+        "bindings": [
+            {
+                "refRegion": {"type": "uri", "value": _ENGLAND},
+                "refPeriodStart": {"type": "literal", "datatype": f"{_XSD}date", "value": "2023-01-01"},
+                "refMonth": {"type": "literal", "datatype": f"{_XSD}gYearMonth", "value": "2023-01"},
+                "averagePrice": {"type": "literal", "datatype": f"{_XSD}integer", "value": "250000"},
+                "salesVolume": {"type": "literal", "datatype": f"{_XSD}integer", "value": "120"},
+                "paon": {"type": "literal", "value": "12"},
+            },
+            {
+                "refRegion": {"type": "uri", "value": _ENGLAND},
+                "refPeriodStart": {"type": "literal", "datatype": f"{_XSD}date", "value": "2023-02-01"},
+                "refMonth": {"type": "literal", "datatype": f"{_XSD}gYearMonth", "value": "2023-02"},
+                "averagePrice": {"type": "literal", "datatype": f"{_XSD}integer", "value": "260000"},
+                "salesVolume": {"type": "literal", "datatype": f"{_XSD}integer", "value": "95"},
+                "paon": {"type": "literal", "value": "14"},
+            },
+        ]
+    },
+}
+
+_CSV_BODY = (
+    "refRegion,refPeriodStart,refMonth,averagePrice,salesVolume,paon\r\n"
+    f"{_ENGLAND},2023-01-01,2023-01,250000,120,12\r\n"
+    f"{_ENGLAND},2023-02-01,2023-02,260000,95,14\r\n"
+).encode()
+
+_TSV_BODY = (
+    "?refRegion\t?refPeriodStart\t?refMonth\t?averagePrice\t?salesVolume\t?paon\n"
+    f'<{_ENGLAND}>\t"2023-01-01"^^<{_XSD}date>\t"2023-01"^^<{_XSD}gYearMonth>\t250000\t120\t"12"\n'
+    f'<{_ENGLAND}>\t"2023-02-01"^^<{_XSD}date>\t"2023-02"^^<{_XSD}gYearMonth>\t260000\t95\t"14"\n'
+).encode()
+
+
+@pytest.mark.parametrize(
+    ("result_format", "body", "accept"),
+    [("csv", _CSV_BODY, "text/csv"), ("tsv", _TSV_BODY, "text/tab-separated-values")],
+)
+@pytest.mark.parametrize("stream", [False, True])
+def test_delimited_result_formats_match_json_frame_contract(result_format, body, accept, stream, fake_transport):
+    transport = fake_transport(body, chunk_size=7)
+    sq = SparqlQuery(transport=transport, result_format=result_format)
+
+    df = sq.fetch_sparql_frame("SELECT * {}", stream=stream)
+    expected = SparqlQuery.make_data_from_results(_JSON_RESULTS)
+
+    assert [r["headers"]["Accept"] for r in transport.requests] == [accept]
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_unknown_result_format_is_rejected():
+    with pytest.raises(ValueError, match="result_format"):
+        SparqlQuery(result_format="xml")
+
+
+def test_build_query_for_region_projects_only_requested_columns():
+    sq = SparqlQuery()
+    query = sq.build_query_for_region("england", 2023, 2023, columns=["average_price", "salesVolumeCash"])
+
+    assert "ukhpi:averagePrice ?averagePrice" in query
+    assert "ukhpi:salesVolumeCash ?salesVolumeCash" in query
+    assert "ukhpi:refMonth ?refMonth" in query  # keys are always selected
+    assert "housePriceIndex" not in query
+    assert query.count("OPTIONAL") == 5  # averagePrice, refMonth, refPeriodStart, refRegion, salesVolumeCash
+
+
+def test_resolve_columns_rejects_unknown_names():
+    with pytest.raises(ValueError, match="Unknown HPI column"):
+        SparqlQuery.resolve_columns(["not_a_column"])
+
+
+def test_tsv_string_escapes_are_decoded(fake_transport):
+    body = (
+        "?refRegion\t?refPeriodStart\t?paon\n"
+        f'<{_ENGLAND}>\t"2023-01-01"^^<{_XSD}date>\t"FLAT \\"A\\"\\tREAR\\\\1\\nB"\n'
+    ).encode()
+
+    df = SparqlQuery(transport=fake_transport(body), result_format="tsv").fetch_sparql_frame("SELECT * {}")
+
+    assert df["paon"].tolist() == ['FLAT "A"\tREAR\\1\nB']
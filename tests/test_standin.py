@@ -0,0 +1,94 @@
+"""Tests for the local SPARQL stand-in server (ukhpi.core.standin)."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+import requests
+
+from ukhpi.core.limiter import AdaptiveLimiter
+from ukhpi.core.sparql import SparqlQuery
+from ukhpi.core.standin import SparqlStandin, build_parser, render_results
+from ukhpi.core.transport import HttpTransport
+
+
+def _client(url, **kwargs):
+    limiter = AdaptiveLimiter(rate=1000, burst=1000)
+    return SparqlQuery(endpoint_url=url, use_cache=False, limiter=limiter, **kwargs)
+
+
+@pytest.mark.parametrize("result_format", ["json", "csv", "tsv"])
+def test_synthetic_hpi_responses_cover_every_region_and_month(result_format):
+    with SparqlStandin() as standin:
+        sq = _client(standin.url, result_format=result_format)
+        query = sq.build_query_for_regions(["england", "wales"], 2022, 2023, columns=["average_price"])
+
+        df = sq.fetch_sparql_frame(query)
+
+    assert len(df) == 2 * 24
+    assert set(df.columns) == {"_about", "average_price", "ref_month", "ref_period_start", "ref_region"}
+    assert pd.api.types.is_datetime64_any_dtype(df["ref_period_start"])
+    assert df["average_price"].dtype == "float64"
+
+
+def test_recorder_mode_captures_responses_for_offline_replay(tmp_path):
+    store = tmp_path / "recordings"
+    with SparqlStandin(seed=1) as upstream:
+        live = upstream.url
+        with SparqlStandin(store_path=store, upstream=live, key_endpoint=live) as recorder:
+            sq = _client(recorder.url)
+            query = sq.build_query_for_region("england", 2023, 2023)
+            recorded = sq.fetch_sparql_frame(query)
+        assert recorder.stats["recorded"] == 1
+
+    with SparqlStandin(store_path=store, synthesize=False, key_endpoint=live) as replay:
+        replayed = _client(replay.url).fetch_sparql_frame(query)
+        assert replay.stats["replayed"] == 1
+
+    pd.testing.assert_frame_equal(recorded, replayed)
+
+
+def test_unrecorded_queries_are_rejected_when_synthesis_is_off(tmp_path):
+    with SparqlStandin(store_path=tmp_path, synthesize=False) as standin:
+        response = requests.post(standin.url, data={"query": "SELECT ?x WHERE { ?x ?y ?z }"}, timeout=5)
+    assert response.status_code == 404
+
+
+def test_injected_throttling_and_errors_are_retried_by_the_transport():
+    with SparqlStandin(error_rate=0.3, throttle_rate=0.3, retry_after=0, seed=7) as standin:
+        transport = HttpTransport(max_retries=10, backoff_factor=0.0)
+        sq = _client(standin.url, transport=transport)
+
+        for year in range(2015, 2020):
+            assert len(sq.fetch_sparql_frame(sq.build_query_for_region("england", year, year))) == 12
+
+        stats = standin.stats
+    assert stats["throttled"] > 0 and stats["errors"] > 0
+    assert stats["synthesized"] == 5
+    assert transport.stats["retries"] == stats["throttled"] + stats["errors"]
+
+
+@pytest.mark.parametrize("result_format", ["csv", "tsv"])
+def test_delimited_string_values_are_escaped(result_format, fake_transport):
+    paon = 'FLAT "A"\tREAR\\1\nB'
+    body = render_results(
+        ["refPeriodStart", "paon"], [{"refPeriodStart": ("date", "2023-01-01"), "paon": ("str", paon)}], result_format
+    )
+
+    df = SparqlQuery(transport=fake_transport(body), result_format=result_format).fetch_sparql_frame("SELECT * {}")
+
+    assert df["paon"].tolist() == [paon]
+
+
+def test_parser_exposes_the_retry_after_knob():
+    assert build_parser().parse_args([]).retry_after == 1.0
+    assert build_parser().parse_args(["--retry-after", "2.5"]).retry_after == 2.5
+
+
+def test_responses_are_compressed_for_clients_that_accept_gzip():
+    with SparqlStandin() as standin:
+        query = SparqlQuery().build_query_for_region("england", 2022, 2023)
+        response = requests.post(standin.url, data={"query": query}, timeout=5)
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert int(response.headers["Content-Length"]) < len(response.content)
@@ -0,0 +1,75 @@
+"""Tests for incremental SPARQL JSON parsing (ukhpi.core.streaming)."""
+
+from __future__ import annotations
+
+import json
+
+import pandas as pd
+import pytest
+
+from ukhpi.core.sparql import SparqlQuery
+from ukhpi.core.streaming import iter_sparql_json
+
+
+def _payload(n_rows: int) -> bytes:
+    bindings = [
+        {
+            "averagePrice": {"type": "literal", "value": str(1000 + i)},
+            "refRegion": {"type": "uri", "value": "http://landregistry.data.gov.uk/id/region/england"},
+            "label": {"type": "literal", "value": 'Ünïcode, "quoted" [bracket] {brace}'},
+        }
+        for i in range(n_rows)
+    ]
+    doc = {
+        "head": {"vars": ["averagePrice", "refRegion", "label"]},
+        "results": {"distinct": False, "bindings": bindings},
+    }
+    return json.dumps(doc, indent=1, ensure_ascii=False).encode("utf-8")
+
+
+def _chunked(data: bytes, size: int):
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 4096])
+def test_iter_sparql_json_matches_json_loads_for_any_chunking(chunk):
+    data = _payload(25)
+
+    variables, bindings = iter_sparql_json(_chunked(data, chunk))
+
+    expected = json.loads(data)
+    assert variables == expected["head"]["vars"]
+    assert list(bindings) == expected["results"]["bindings"]
+
+
+def test_iter_sparql_json_handles_empty_bindings():
+    variables, bindings = iter_sparql_json([b'{"head": {"vars": ["x"]}, "results": {"bindings": [ ]}}'])
+    assert variables == ["x"]
+    assert list(bindings) == []
+
+
+def test_iter_sparql_json_requires_head_vars():
+    with pytest.raises(ValueError):
+        iter_sparql_json([b'{"results": {"bindings": []}}'])
+
+
+def test_iter_sparql_frames_yields_bounded_partial_frames(fake_transport):
+    transport = fake_transport(_payload(10), chunk_size=13)
+    sq = SparqlQuery(transport=transport)
+
+    frames = list(sq.iter_sparql_frames("SELECT * {}", chunk_size=4))
+
+    assert [len(f) for f in frames] == [4, 4, 2]
+    assert [r["stream"] for r in transport.requests] == [True]
+    assert transport.responses[0].closed
+    assert frames[0]["average_price"].tolist() == [1000.0, 1001.0, 1002.0, 1003.0]
+
+
+def test_fetch_sparql_frame_streaming_matches_buffered_decode(fake_transport):
+    body = _payload(10)
+    sq = SparqlQuery(transport=fake_transport(body, chunk_size=13), stream_results=True, stream_chunk_size=3)
+
+    streamed = sq.fetch_sparql_frame("SELECT * {}")
+    buffered = SparqlQuery.make_data_from_results(json.loads(body))
+
+    pd.testing.assert_frame_equal(streamed, buffered)
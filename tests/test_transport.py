@@ -0,0 +1,176 @@
+"""Tests for ukhpi.core.transport against a throwaway local HTTP server."""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from ukhpi.core.limiter import AdaptiveLimiter
+from ukhpi.core.sparql import SparqlQuery
+from ukhpi.core.standin import SparqlStandin
+from ukhpi.core.transport import HttpTransport, TransportError
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fail_first = 0
+    calls = 0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        type(self).calls += 1
+        if type(self).calls <= type(self).fail_first:
+            status, body = 503, b"busy"
+        else:
+            status, body = 200, json.dumps({"head": {"vars": ["x"]}, "results": {"bindings": []}}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/sparql-results+json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    _Handler.calls = 0
+    _Handler.fail_first = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/query", _Handler
+    server.shutdown()
+    server.server_close()
+
+
+def test_sequential_requests_reuse_one_connection(local_server):
+    url, _ = local_server
+    transport = HttpTransport(pool_size=2, max_retries=0)
+
+    for _ in range(5):
+        transport.post(url, data={"query": "SELECT * {}"})
+
+    stats = transport.stats
+    assert stats["requests"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 4
+
+
+def test_transient_5xx_is_retried_with_backoff(local_server):
+    url, handler = local_server
+    handler.fail_first = 2
+    transport = HttpTransport(max_retries=3, backoff_factor=0.0)
+
+    response = transport.post(url, data={"query": "SELECT * {}"})
+
+    assert response.status_code == 200
+    assert transport.stats["retries"] == 2
+
+
+def test_exhausted_retries_raise_http_error(local_server):
+    url, handler = local_server
+    handler.fail_first = 10
+    transport = HttpTransport(max_retries=1, backoff_factor=0.0)
+
+    with pytest.raises(requests.HTTPError):
+        transport.post(url, data={"query": "SELECT * {}"})
+    assert transport.stats["failures"] == 1
+
+
+def test_connection_errors_raise_transport_error():
+    transport = HttpTransport(max_retries=1, backoff_factor=0.0, connect_timeout=0.5)
+    with pytest.raises(TransportError):
+        transport.post("http://127.0.0.1:9/query", data={"query": "SELECT * {}"})
+
+
+def test_sparql_query_fetches_through_transport(local_server):
+    url, _ = local_server
+    transport = HttpTransport()
+    sq = SparqlQuery(endpoint_url=url, transport=transport)
+
+    results = sq.fetch_sparql_query("SELECT ?x WHERE { ?x ?y ?z }")
+
+    assert results["head"]["vars"] == ["x"]
+    assert sq.transport_stats["requests"] == 1
+
+
+def test_sparql_query_defaults_to_shared_transport():
+    assert SparqlQuery().transport is SparqlQuery().transport is HttpTransport.shared()
+
+
+def test_throttled_attempts_shrink_the_limiter(local_server):
+    url, handler = local_server
+    handler.fail_first = 1
+    limiter = AdaptiveLimiter(initial_limit=8, rate=1000, burst=1000)
+    transport = HttpTransport(max_retries=1, backoff_factor=0.0)
+
+    transport.post(url, data={"query": "SELECT * {}"}, limiter=limiter)
+
+    stats = limiter.stats
+    assert stats["throttled"] == 1
+    assert stats["ok"] == 1
+    assert stats["in_flight"] == 0
+    assert limiter.limit < 8
+
+
+@pytest.mark.parametrize(
+    "error, raised",
+    [
+        (requests.exceptions.ChunkedEncodingError("connection dropped mid-body"), TransportError),
+        (requests.exceptions.ContentDecodingError("bad gzip body"), requests.exceptions.ContentDecodingError),
+    ],
+)
+def test_failed_requests_give_the_limiter_slot_back(error, raised):
+    limiter = AdaptiveLimiter(initial_limit=2, rate=1000, burst=1000)
+    transport = HttpTransport(max_retries=0)
+
+    def broken_post(*args, **kwargs):
+        raise error
+
+    transport.session.post = broken_post
+    for _ in range(3):
+        with pytest.raises(raised):
+            transport.post("http://127.0.0.1:9/query", data={"query": "SELECT * {}"}, limiter=limiter)
+
+    assert limiter.stats["in_flight"] == 0
+    assert limiter.stats["errors"] == 3
+
+
+def test_bodies_truncated_mid_transfer_are_retried(local_server):
+    url, _ = local_server
+    limiter = AdaptiveLimiter(rate=1000, burst=1000)
+    transport = HttpTransport(max_retries=2, backoff_factor=0.0)
+    post = transport.session.post
+    calls = []
+
+    def flaky_post(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise requests.exceptions.ChunkedEncodingError("connection dropped mid-body")
+        return post(*args, **kwargs)
+
+    transport.session.post = flaky_post
+    response = transport.post(url, data={"query": "SELECT * {}"}, limiter=limiter)
+
+    assert response.status_code == 200
+    assert transport.stats["retries"] == 1
+    assert limiter.stats["in_flight"] == 0
+
+
+def test_stats_count_compressed_wire_bytes_apart_from_decoded_bytes():
+    transport = HttpTransport()
+    with SparqlStandin() as standin:
+        query = SparqlQuery().build_query_for_region("england", 2020, 2023)
+        response = transport.post(standin.url, data={"query": query})
+
+    stats = transport.stats
+    assert stats["bytes_decoded"] == len(response.content)
+    assert 0 < stats["bytes_received"] < stats["bytes_decoded"]
+    assert stats["bytes_received"] == int(response.headers["Content-Length"])